@@ -0,0 +1,294 @@
+""" python 3.12.1
+Headless benchmarks for the framework's hot paths.
+
+    python benchmark.py -o results.json
+    python benchmark.py -o new.json --compare results.json --threshold 0.10
+    python benchmark.py --only particles --budget particles=16.6
+
+Timings are in milliseconds. Each case runs over several sizes and writes
+min/mean/percentiles per size. `--compare` flags any p50 that got slower
+than the baseline by more than `--threshold`, `--budget` flags any p99 over
+a per-case frame budget. Either exits with status 1 so it can gate CI.
+"""
+# pylint: disable=maybe-no-member
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+import pygame
+
+from src.level import Level
+from src.player import Player
+from src.particles import Particles
+from src.font import Font, TextCache
+from src.button import Button
+from src.lighting import get_outline
+from src.tilemap import TileMap, write_level
+
+def percentile(samples:list[float], fraction:float) -> float:
+    """Get percentile of sorted samples using linear interpolation
+
+    :param samples: `sorted samples`
+    :type samples: list[float]
+    :param fraction: `percentile` between 0 and 1
+    :type fraction: float
+    :rtype: float
+    """
+    position = (len(samples)-1)*fraction
+    lower = int(position)
+    upper = min(lower+1, len(samples)-1)
+    return samples[lower] + (samples[upper]-samples[lower])*(position-lower)
+
+def measure(function, repeat:int, warmup:int=3) -> dict[str, float]:
+    """Time repeated calls of a function
+
+    :param function: callable taking no arguments
+    :param repeat: `timed calls`
+    :type repeat: int
+    :param warmup: `untimed calls` first, defaults to 3
+    :type warmup: int, optional
+    :return: summary statistics in milliseconds
+    :rtype: dict[str, float]
+    """
+    for _ in range(warmup):
+        function()
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append((time.perf_counter()-start)*1000)
+
+    samples.sort()
+    return {
+        "min": samples[0],
+        "mean": statistics.fmean(samples),
+        "p50": percentile(samples, 0.50),
+        "p90": percentile(samples, 0.90),
+        "p99": percentile(samples, 0.99),
+        "max": samples[-1],
+        "samples": len(samples),
+    }
+
+def make_level_file(directory:str, width:int, height:int) -> str:
+    """Write a binary level with a floor, walls and random platforms"""
+    random = np.random.default_rng(0)
+    tiles = np.zeros((height, width), dtype=np.uint8)
+    tiles[-4:, :] = ord("D")
+    tiles[-5, :] = ord("G")
+    tiles[:, :2] = ord("D")
+    tiles[:, -2:] = ord("D")
+    platforms = random.random((height-6, width)) < 0.05
+    tiles[:height-6][platforms] = ord("G")
+
+    path = os.path.join(directory, f"level_{width}x{height}.lvl")
+    write_level(path, TileMap(tiles))
+    return path
+
+
+# Cases: each takes a size and returns the callable to time, or a ##################
+# (callable, cleanup) pair when what it built holds shared assets
+
+def bench_level(size:int, directory:str):
+    """Level construction for a `size` x `size/2` map, released after each call"""
+    path = make_level_file(directory, size, size//2)
+
+    def build():
+        Level(path).release()
+    return build
+
+def bench_player(size:int, directory:str):
+    """`Player.update` with collisions on a `size` x `size/2` map"""
+    level = Level(make_level_file(directory, size, size//2))
+    player = Player()
+    player.position.update(100, 100)
+
+    def step():
+        player.update(1/120, level)
+        if player.position.y > level.rect.bottom:
+            player.position.update(100, 100)
+
+    def cleanup():
+        player.kill()
+        level.release()
+    return step, cleanup
+
+def bench_particles(size:int, _directory:str):
+    """`Particles.draw` with `size` live particles"""
+    screen = pygame.display.get_surface()
+    particles = Particles(capacity=size+1)
+    particles.emit((640, 360), size, lifetime=1e9)
+    particles.shrink_rate = 0
+    return lambda: particles.draw((640, 360), screen)
+
+def bench_font(size:int, _directory:str):
+    """`Font.render` of a `size` character string, uncached"""
+    text = ("Score 0123456789 " * (size//17+1))[:size]
+    font = Font(cache=TextCache(max_bytes=0))
+    return lambda: font.render(text, size_factor=2, text_color=(255,255,255))
+
+def bench_button(size:int, _directory:str):
+    """`Button.update` for `size` buttons"""
+    screen = pygame.display.get_surface()
+    buttons = [
+        Button(x=(index%40)*30, y=(index//40)*30, width=28, height=28,
+               text="ok", text_color=(255,255,255), button_color=(60,60,60))
+        for index in range(size)
+    ]
+
+    def update():
+        for button in buttons:
+            button.update(screen)
+    return update
+
+def bench_outline(size:int, _directory:str):
+    """`lighting.get_outline` on a player frame scaled by `size`"""
+    frame = pygame.image.load("assets/images/player/player0.png").convert_alpha()
+    surface = pygame.transform.scale_by(frame, size)
+    return lambda: get_outline(surface)
+
+
+CASES = {
+    "level": (bench_level, [64, 256, 1024]),
+    "player": (bench_player, [64, 1024, 4096]),
+    "particles": (bench_particles, [1000, 10000, 50000]),
+    "font": (bench_font, [8, 64, 256]),
+    "button": (bench_button, [10, 100, 500]),
+    "outline": (bench_outline, [1, 4, 16]),
+}
+#######################################################################################
+
+def run(cases:list[str], repeat:int, sizes:dict[str, list[int]]) -> dict:
+    """Run benchmark cases
+
+    :param cases: `case names` to run
+    :type cases: list[str]
+    :param repeat: `timed calls` per size
+    :type repeat: int
+    :param sizes: `{case: sizes}` overriding the defaults
+    :type sizes: dict[str, list[int]]
+    :return: results document
+    :rtype: dict
+    """
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in cases:
+            function, default_sizes = CASES[name]
+            results["results"][name] = {}
+            for size in sizes.get(name, default_sizes):
+                case = function(size, directory)
+                timed, cleanup = case if isinstance(case, tuple) else (case, None)
+                stats = measure(timed, repeat)
+                if cleanup:
+                    cleanup()
+                results["results"][name][str(size)] = stats
+                print(f"{name:<10} {size:>7}  p50 {stats['p50']:9.3f} ms"
+                      f"  p99 {stats['p99']:9.3f} ms")
+
+    return results
+
+def compare(results:dict, baseline:dict, threshold:float) -> list[str]:
+    """Find cases whose p50 regressed past `threshold` relative to a baseline
+
+    :param results: `new results`
+    :type results: dict
+    :param baseline: `previous results`
+    :type baseline: dict
+    :param threshold: `allowed slowdown`, 0.1 is 10%
+    :type threshold: float
+    :return: regression messages
+    :rtype: list[str]
+    """
+    regressions = []
+    for name, by_size in results["results"].items():
+        for size, stats in by_size.items():
+            old = baseline["results"].get(name, {}).get(size)
+            if not old:
+                continue
+            change = stats["p50"]/old["p50"] - 1 if old["p50"] else 0
+            print(f"{name:<10} {size:>7}  {old['p50']:9.3f} -> {stats['p50']:9.3f} ms"
+                  f"  {change:+.1%}")
+            if change > threshold:
+                regressions.append(f"{name}[{size}] p50 {change:+.1%}")
+    return regressions
+
+def check_budgets(results:dict, budgets:dict[str, float]) -> list[str]:
+    """Find cases whose p99 is over a frame-time budget
+
+    :param results: `results`
+    :type results: dict
+    :param budgets: `{case: milliseconds}`
+    :type budgets: dict[str, float]
+    :return: budget messages
+    :rtype: list[str]
+    """
+    failures = []
+    for name, budget in budgets.items():
+        for size, stats in results["results"].get(name, {}).items():
+            if stats["p99"] > budget:
+                failures.append(f"{name}[{size}] p99 {stats['p99']:.3f} ms > {budget} ms")
+    return failures
+
+def parse_pairs(values:list[str], cast) -> dict:
+    """Parse `name=value` arguments"""
+    pairs = {}
+    for value in values:
+        name, _, data = value.partition("=")
+        pairs[name] = cast(data)
+    return pairs
+
+def main() -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--only", nargs="+", choices=CASES, default=list(CASES),
+                        help="cases to run")
+    parser.add_argument("--repeat", type=int, default=50, help="timed calls per size")
+    parser.add_argument("--sizes", nargs="*", default=[], metavar="CASE=N,N",
+                        help="override sizes, e.g. particles=100,1000")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed p50 slowdown against the baseline")
+    parser.add_argument("--budget", nargs="*", default=[], metavar="CASE=MS",
+                        help="p99 frame-time budget per case")
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((1280, 720))
+
+    sizes = parse_pairs(args.sizes, lambda data: [int(size) for size in data.split(",")])
+    results = run(args.only, args.repeat, sizes)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    failures = check_budgets(results, parse_pairs(args.budget, float))
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            failures += compare(results, json.load(file), args.threshold)
+
+    for failure in failures:
+        print("FAIL", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 """ python 3.12.1 """
 # pylint: disable=maybe-no-member
+import argparse
 import sys
 from random import randint
 import pygame
@@ -7,45 +8,121 @@ from pygame.locals import *
 
 # Game Modules
 from src.shapes import Circle, Rectangle
-from src.deltatime import get_deltatime
-from src.player import Player
-from src.level import Level
+from src.gameloop import GameLoop
+from src.player import Player, PLAYER_FRAMES
+from src.level import Level, TILE_IMAGES
 from src.collisions import check_collision_with_sprite_group
 from src.lighting import get_outline
 from src.particles import Particles
+from src.camera import Camera
+from src.profiler import profiler, ProfilerOverlay
+from src.loader import AssetLoader
+from src.assets import assets
+from src.atlas import get_atlas
+from src.menu import Menu
+from src.editor import Editor
+from src.inputs import InputRecorder, InputReplay, read_keyboard
+from src.events import EventBus
 #from src.curves import mesh
 
+parser = argparse.ArgumentParser()
+parser.add_argument('--record', help='record input ticks to this file')
+parser.add_argument('--replay', help='replay input ticks from this file, then dump timings')
+args = parser.parse_args()
+
 pygame.init()
 
 screen = pygame.display.set_mode((1280,720), DOUBLEBUF|HWSURFACE)
-previous_time = get_deltatime()
+# Images are read from the packed atlas, repacked when assets/images changes
+assets.use_atlas(get_atlas('assets/images', 'assets/atlas'))
+bus = EventBus()
+bus.allow() # only input and window events reach the queue
+loop = GameLoop(step=1/120, max_steps=5, frame_rate=144)
+
+# Replays run at the step they were recorded with so every tick matches
+replay = InputReplay(args.replay) if args.replay else None
+if replay:
+    loop.step = replay.step
+
+# Load in the background while the menu is up ########################################
+loader = AssetLoader()
+level_tilemap = loader.load_tilemap('level.txt')
+splashscreen = loader.load_image('assets/images/background.png', screen.get_size())
+for path in PLAYER_FRAMES:
+    loader.load_image(path, scale_factor=2)
+for path in TILE_IMAGES.values():
+    loader.load_image(path, (36,36))
+
+menu = Menu(screen, bus=bus)
+while not replay and menu.run(loader) == 'editor':
+    Editor(screen, 'level.txt', bus=bus).run()
+    level_tilemap = loader.load_tilemap('level.txt') # pick up saved edits
+loader.wait()
+loader.shutdown()
+#######################################################################################
 
 player = Player()
 player.speed = 500
 
-level_surface = pygame.Surface((1280*2,720*2), SRCALPHA)
-level = Level('level.txt')
-level.draw(level_surface)
+camera = Camera(screen.get_width(), screen.get_height())
+level = Level(level_tilemap.result())
 
-splashscreen = pygame.image.load('assets/images/background.png').convert_alpha()
-splashscreen = pygame.transform.scale(splashscreen, (screen.get_width(), screen.get_height()))
+splashscreen = splashscreen.result()
 
-#pygame.event.set_allowed([QUIT, KEYDOWN, KEYUP]) # allows certain inputs to increase performance
 particles = Particles()
+profiler_overlay = ProfilerOverlay(profiler)
+show_profiler = False
 
-while True:
-    dt, previous_time = get_deltatime(previous_time)
+# Opened once the game starts and closed on every way out of the loop,
+# including quitting and the end of a replay
+recorder = InputRecorder(args.record, loop.step) if args.record else None
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
+try:
+    while True:
+        profiler.begin_frame()
+
+        for event in bus.poll():
+            if event.type == pygame.QUIT or (event.type == KEYDOWN and event.key == K_ESCAPE):
+                pygame.quit()
+                sys.exit()
+
+            if event.type == KEYDOWN:
+                if event.key == K_F3: # toggle timing overlay
+                    show_profiler = not show_profiler
+                if event.key == K_F5: # dump timings for offline analysis
+                    profiler.dump_csv('profile.csv')
+                    profiler.dump_chrome_trace('profile.json')
 
-    player.update(dt,level)
-    screen.blit(splashscreen,(0,0))
+        with profiler.section("update"):
+            for _ in range(loop.advance()):
+                actions = replay.poll() if replay else read_keyboard(bus.keys)
+                if recorder:
+                    recorder.record(actions)
+                player.update(loop.step,level,actions)
 
-    screen.blit(level_surface,(0,0))
+        with profiler.section("draw"):
+            screen.blit(splashscreen,(0,0))
 
-    screen.blit(player.image,player.position)
+            with profiler.section("level"):
+                level.render(screen, camera)
+
+            screen.blit(player.image,camera.to_screen(player.interpolate(loop.alpha)))
+
+            if show_profiler:
+                profiler_overlay.draw(screen)
+
+        with profiler.section("flip"):
+            pygame.display.flip()
+
+        profiler.end_frame()
+
+        if replay and replay.finished: # same session every run, compare the dumps
+            profiler.dump_csv('profile.csv')
+            profiler.dump_chrome_trace('profile.json')
+            pygame.quit()
+            sys.exit()
 
-    pygame.display.flip()
+        loop.limit()
+finally:
+    if recorder:
+        recorder.close()
@@ -0,0 +1,174 @@
+"""Sprite animation with pre-baked, shared frames"""
+from pygame import Surface, transform
+from src.assets import load_image, release_image
+from src.atlas import Atlas
+
+class AnimationSheet:
+    """Frames of one sprite sheet, scaled and flipped once at load time.
+    Sheets are shared through `get_sheet`, so every entity using the same
+    frames points at the same surfaces. Frames and flipped frames are packed
+    into one atlas and handed out as subsurfaces of its page.
+    """
+    def __init__(self, paths:tuple[str, ...], scale_factor:float=None) -> None:
+        """Load and bake frames
+
+        :param paths: `image filepaths`, one per frame
+        :type paths: tuple[str, ...]
+        :param scale_factor: `scale multiplier`, defaults to None
+        :type scale_factor: float, optional
+        """
+        frames = [load_image(path, scale_factor=scale_factor) for path in paths]
+        surfaces = {(index, False): frame for index, frame in enumerate(frames)}
+        surfaces.update({(index, True): transform.flip(frame, True, False)
+                         for index, frame in enumerate(frames)})
+
+        self.atlas = Atlas.from_surfaces(surfaces)
+        self.frames:list[Surface] = [
+            self.atlas.subsurface((index, False)) for index in range(len(frames))
+        ]
+        self.flipped_frames:list[Surface] = [
+            self.atlas.subsurface((index, True)) for index in range(len(frames))
+        ]
+        self.size = (
+            max(frame.get_width() for frame in self.frames),
+            max(frame.get_height() for frame in self.frames)
+        )
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def get_frame(self, index:int, flipped:bool=False) -> Surface:
+        """Get baked frame, do not draw on it
+
+        :param index: `frame index`
+        :type index: int
+        :param flipped: horizontally flipped version, defaults to False
+        :type flipped: bool, optional
+        :rtype: Surface
+        """
+        return self.flipped_frames[index] if flipped else self.frames[index]
+
+
+# Shared sheets: {(paths, scale factor): AnimationSheet}
+sheets:dict[tuple, AnimationSheet] = {}
+
+# Users of each shared sheet: {(paths, scale factor): count}
+sheet_users:dict[tuple, int] = {}
+
+def get_sheet(paths:list[str], scale_factor:float=None) -> AnimationSheet:
+    """Get shared animation sheet, baking it on first use
+
+    :param paths: `image filepaths`, one per frame
+    :type paths: list[str]
+    :param scale_factor: `scale multiplier`, defaults to None
+    :type scale_factor: float, optional
+    :rtype: AnimationSheet
+    """
+    key = (tuple(paths), scale_factor)
+    if key not in sheets:
+        sheets[key] = AnimationSheet(key[0], scale_factor)
+        sheet_users[key] = 0
+    sheet_users[key] += 1
+    return sheets[key]
+
+def release_sheet(paths:list[str], scale_factor:float=None) -> None:
+    """Drop one user of a shared sheet, releasing its images at zero
+
+    :param paths: `image filepaths` it was loaded with
+    :type paths: list[str]
+    :param scale_factor: `scale multiplier` it was loaded with, defaults to None
+    :type scale_factor: float, optional
+    """
+    key = (tuple(paths), scale_factor)
+    if key not in sheet_users:
+        return
+
+    sheet_users[key] -= 1
+    if sheet_users[key] <= 0:
+        del sheet_users[key]
+        del sheets[key]
+        for path in key[0]:
+            release_image(path, scale_factor=scale_factor)
+
+
+class Animation:
+    """Named sequence of sheet frames with per-frame durations"""
+    def __init__(self, frames:list[int], durations:float | list[float]=0.1,
+                 loop:bool=True) -> None:
+        """Create animation
+
+        :param frames: `sheet frame indices` in play order
+        :type frames: list[int]
+        :param durations: `seconds` per frame, one value or one per frame, defaults to 0.1
+        :type durations: float | list[float], optional
+        :param loop: restart after the last frame, defaults to True
+        :type loop: bool, optional
+        """
+        self.frames = list(frames)
+        if isinstance(durations, (int, float)):
+            durations = [durations]*len(self.frames)
+        self.durations = list(durations)
+        self.loop = loop
+
+
+class Animator:
+    """Per-entity playback state over a shared sheet"""
+    def __init__(self, sheet:AnimationSheet, animations:dict[str, Animation],
+                 current:str=None) -> None:
+        """Create animator
+
+        :param sheet: `shared sheet`
+        :type sheet: AnimationSheet
+        :param animations: `{name: Animation}`
+        :type animations: dict[str, Animation]
+        :param current: `animation` to start with, defaults to the first one
+        :type current: str, optional
+        """
+        self.sheet = sheet
+        self.animations = animations
+        self.current = current or next(iter(animations))
+        self.index = 0
+        self.time = 0.0
+        self.flipped = False
+
+    @property
+    def frame(self) -> int:
+        """Sheet frame index being shown"""
+        return self.animations[self.current].frames[self.index]
+
+    @property
+    def image(self) -> Surface:
+        """Baked surface for the current frame and facing"""
+        return self.sheet.get_frame(self.frame, self.flipped)
+
+    def play(self, name:str, restart:bool=False) -> None:
+        """Switch animation, keeps playing if it is already current
+
+        :param name: `animation name`
+        :type name: str
+        :param restart: restart even if already playing, defaults to False
+        :type restart: bool, optional
+        """
+        if name != self.current or restart:
+            self.current = name
+            self.index = 0
+            self.time = 0.0
+
+    def update(self, deltatime:float) -> None:
+        """Advance frames by elapsed time
+
+        :param deltatime: used for frame timing
+        :type deltatime: float
+        """
+        animation = self.animations[self.current]
+        self.time += deltatime
+
+        while 0 < animation.durations[self.index] <= self.time:
+            self.time -= animation.durations[self.index]
+            if self.index+1 < len(animation.frames):
+                self.index += 1
+            elif animation.loop:
+                self.index = 0
+            else:
+                self.time = 0.0
+                break
@@ -0,0 +1,160 @@
+"""Shared image cache for pygame surfaces"""
+from pygame import Surface, image, transform
+from src.atlas import Atlas
+
+class AssetManager:
+    """Keyed, reference-counted cache of loaded and pre-scaled surfaces.
+
+    Every distinct `(path, size, scale_factor)` combination is loaded and
+    converted once. Callers share the returned surface, so it must be
+    treated as read-only (blit from it, copy it before drawing on it).
+
+    With an atlas set (see `use_atlas`), images packed on it are read from
+    its pages instead of their files: unscaled loads are subsurfaces of the
+    shared pages and scaled loads are scaled from them.
+    """
+    def __init__(self) -> None:
+        self.surfaces:dict[tuple, Surface] = {}
+        self.references:dict[tuple, int] = {}
+        self.atlas:Atlas = None # keyed by image filepath
+
+    def load(self, path:str, size:tuple=None, scale_factor:float=None) -> Surface:
+        """Load an image, or return the cached copy
+
+        :param path: `image filepath`
+        :type path: str
+        :param size: `(width, height)` to scale to, defaults to None
+        :type size: tuple, optional
+        :param scale_factor: `scale multiplier`, defaults to None
+        :type scale_factor: float, optional
+        :return: shared, converted surface
+        :rtype: Surface
+        """
+        key = get_key(path, size, scale_factor)
+
+        if key not in self.surfaces:
+            surface = self.get_source(path)
+            if path not in self.atlas_paths:
+                surface = surface.convert_alpha()
+            if size:
+                surface = transform.scale(surface, size)
+            elif scale_factor:
+                surface = transform.scale_by(surface, scale_factor)
+            self.surfaces[key] = surface
+            self.references[key] = 0
+
+        self.references[key] += 1
+        return self.surfaces[key]
+
+    def insert(self, surface:Surface, path:str, size:tuple=None,
+               scale_factor:float=None) -> Surface:
+        """Add an already loaded and converted surface to the cache, e.g. from
+        a background loader, and take one reference to it like `load`. Keeps
+        the existing surface if the key is cached.
+
+        :param surface: `converted surface`
+        :type surface: Surface
+        :param path: `image filepath`
+        :type path: str
+        :param size: `(width, height)` it was scaled to, defaults to None
+        :type size: tuple, optional
+        :param scale_factor: `scale multiplier` it was scaled by, defaults to None
+        :type scale_factor: float, optional
+        :return: cached surface
+        :rtype: Surface
+        """
+        key = get_key(path, size, scale_factor)
+        if key not in self.surfaces:
+            self.surfaces[key] = surface
+            self.references[key] = 0
+        self.references[key] += 1
+        return self.surfaces[key]
+
+    def __contains__(self, key:tuple) -> bool:
+        return key in self.surfaces
+
+    @property
+    def atlas_paths(self) -> dict:
+        """Filepaths packed on the atlas"""
+        return self.atlas.regions if self.atlas else {}
+
+    def use_atlas(self, atlas:Atlas) -> None:
+        """Read packed images from an atlas's pages from now on, e.g. from
+        `atlas.get_atlas("assets/images", "assets/atlas")`. Surfaces already
+        cached are kept.
+
+        :param atlas: atlas keyed by image filepath, with converted pages
+        :type atlas: Atlas
+        """
+        self.atlas = atlas
+
+    def get_source(self, path:str) -> Surface:
+        """Get an image's unscaled pixels: a subsurface of its atlas page if it
+        is packed, otherwise decoded from the file (not converted). Safe to
+        call from loader threads.
+
+        :param path: `image filepath`
+        :type path: str
+        :rtype: Surface
+        """
+        if path in self.atlas_paths:
+            return self.atlas.subsurface(path)
+        return image.load(path)
+
+    def is_packed(self, path:str, size:tuple=None, scale_factor:float=None) -> bool:
+        """Check if a load needs no decoding or scaling, only an atlas lookup"""
+        return not size and not scale_factor and path in self.atlas_paths
+
+    def release(self, path:str, size:tuple=None, scale_factor:float=None) -> None:
+        """Drop one reference to a cached surface, freeing it at zero
+
+        :param path: `image filepath`
+        :type path: str
+        :param size: `(width, height)` it was loaded with, defaults to None
+        :type size: tuple, optional
+        :param scale_factor: `scale multiplier` it was loaded with, defaults to None
+        :type scale_factor: float, optional
+        """
+        key = get_key(path, size, scale_factor)
+        if key not in self.references:
+            return
+
+        self.references[key] -= 1
+        if self.references[key] <= 0:
+            del self.references[key]
+            del self.surfaces[key]
+
+    def clear(self) -> None:
+        """Drop every cached surface"""
+        self.surfaces.clear()
+        self.references.clear()
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+
+def get_key(path:str, size:tuple=None, scale_factor:float=None) -> tuple:
+    """Build cache key for an image load
+
+    :param path: `image filepath`
+    :type path: str
+    :param size: `(width, height)`, defaults to None
+    :type size: tuple, optional
+    :param scale_factor: `scale multiplier`, defaults to None
+    :type scale_factor: float, optional
+    :return: `cache key`
+    :rtype: tuple
+    """
+    return (path, tuple(size) if size else None, scale_factor)
+
+
+# Default cache shared by Level, Player and Font
+assets = AssetManager()
+
+def load_image(path:str, size:tuple=None, scale_factor:float=None) -> Surface:
+    """Load image through the shared asset cache (see `AssetManager.load`)"""
+    return assets.load(path, size, scale_factor)
+
+def release_image(path:str, size:tuple=None, scale_factor:float=None) -> None:
+    """Release image from the shared asset cache (see `AssetManager.release`)"""
+    assets.release(path, size, scale_factor)
@@ -0,0 +1,239 @@
+"""Texture atlases: many small images packed into a few large surfaces
+
+Drawing from an atlas passes the page surface with a source rect, so one
+`Surface.blits` call per page draws any mix of packed images, and images
+drawn together sit next to each other in memory.
+
+A packed atlas can be saved next to a JSON index and loaded again instead
+of the separate image files:
+
+    python -m src.atlas assets/images assets/atlas
+
+Index layout: `pages` (page image filenames), `regions` (`{key: [page, x,
+y, width, height]}`) and `sources` (`{key: modification time}`, used to
+tell when the packed files are stale).
+"""
+import json
+import os
+import sys
+from pygame import Rect, Surface, image
+from pygame.locals import BLEND_RGBA_MAX, SRCALPHA
+
+INDEX = "atlas.json"
+VERSION = 1
+
+def pack(sizes:dict, max_size:int=1024, padding:int=1) -> tuple[dict, list[tuple[int, int]]]:
+    """Pack rects onto pages with shelf packing, tallest first
+
+    :param sizes: `{key: (width, height)}`
+    :type sizes: dict
+    :param max_size: `page side` limit in pixels, defaults to 1024
+    :type max_size: int, optional
+    :param padding: `pixels` left between rects, defaults to 1
+    :type padding: int, optional
+    :raises ValueError: if a rect does not fit on an empty page
+    :return: `{key: (page, x, y)}` and the `(width, height)` used on each page
+    :rtype: tuple[dict, list[tuple[int, int]]]
+    """
+    positions = {}
+    pages = []
+    page = x = y = shelf_height = width = height = 0
+
+    for key in sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0])):
+        item_width, item_height = sizes[key]
+        if item_width > max_size or item_height > max_size:
+            raise ValueError(f"{key} is larger than the {max_size}px atlas page")
+
+        if x+item_width > max_size: # next shelf
+            x, y, shelf_height = 0, y+shelf_height, 0
+        if y+item_height > max_size: # next page
+            pages.append((width, height))
+            page, x, y, shelf_height, width, height = page+1, 0, 0, 0, 0, 0
+
+        positions[key] = (page, x, y)
+        width = max(width, x+item_width)
+        height = max(height, y+item_height)
+        x += item_width+padding
+        shelf_height = max(shelf_height, item_height+padding)
+
+    pages.append((width, height))
+    return positions, pages
+
+
+class Atlas:
+    """Packed images, looked up by key (e.g. a filepath or tile code)"""
+    def __init__(self, pages:list[Surface], regions:dict) -> None:
+        """Create atlas from already packed pages
+
+        :param pages: `page surfaces`
+        :type pages: list[Surface]
+        :param regions: `{key: (page index, Rect)}`
+        :type regions: dict
+        """
+        self.pages = pages
+        self.regions:dict = regions
+
+    @classmethod
+    def from_surfaces(cls, surfaces:dict, max_size:int=1024, padding:int=1) -> "Atlas":
+        """Pack surfaces into a new atlas
+
+        :param surfaces: `{key: Surface}`
+        :type surfaces: dict
+        :param max_size: `page side` limit in pixels, defaults to 1024
+        :type max_size: int, optional
+        :param padding: `pixels` left between images, defaults to 1
+        :type padding: int, optional
+        :rtype: Atlas
+        """
+        positions, page_sizes = pack(
+            {key: surface.get_size() for key, surface in surfaces.items()}, max_size, padding)
+        pages = [Surface((max(width, 1), max(height, 1)), SRCALPHA)
+                 for width, height in page_sizes]
+
+        regions = {}
+        for key, (page, x, y) in positions.items():
+            # Max onto the empty page copies pixels exactly, alpha included
+            pages[page].blit(surfaces[key], (x, y), special_flags=BLEND_RGBA_MAX)
+            regions[key] = (page, Rect((x, y), surfaces[key].get_size()))
+        return cls(pages, regions)
+
+    def __contains__(self, key) -> bool:
+        return key in self.regions
+
+    def __len__(self) -> int:
+        return len(self.regions)
+
+    def get(self, key) -> tuple[Surface, Rect]:
+        """Get `(page surface, source rect)` of a packed image"""
+        page, rect = self.regions[key]
+        return self.pages[page], rect
+
+    def subsurface(self, key) -> Surface:
+        """Get a packed image as a surface sharing the page's pixels, do not draw on it"""
+        page, rect = self.regions[key]
+        return self.pages[page].subsurface(rect)
+
+    def blits(self, surface:Surface, items) -> int:
+        """Draw packed images with one `Surface.blits` call per page
+
+        :param surface: `surface` to draw on
+        :type surface: Surface
+        :param items: `(key, position)` pairs
+        :return: `blits calls` made
+        :rtype: int
+        """
+        per_page:dict[int, list] = {}
+        for key, position in items:
+            page, rect = self.regions[key]
+            per_page.setdefault(page, []).append((self.pages[page], position, rect))
+
+        for blit_list in per_page.values():
+            surface.blits(blit_list, doreturn=False)
+        return len(per_page)
+
+
+# Files ###############################################################################
+
+def find_images(directory:str) -> list[str]:
+    """Get every PNG under a directory, as `/`-separated paths including it"""
+    paths = []
+    for folder, _, filenames in os.walk(directory):
+        for filename in filenames:
+            if filename.lower().endswith(".png"):
+                paths.append(os.path.join(folder, filename).replace(os.sep, "/"))
+    return sorted(paths)
+
+def build_atlas(directory:str, max_size:int=1024) -> Atlas:
+    """Pack every PNG under a directory, keyed by filepath
+
+    :param directory: `image directory`, e.g. "assets/images"
+    :type directory: str
+    :param max_size: `page side` limit in pixels, defaults to 1024
+    :type max_size: int, optional
+    :rtype: Atlas
+    """
+    return Atlas.from_surfaces(
+        {path: image.load(path) for path in find_images(directory)}, max_size)
+
+def save_atlas(atlas:Atlas, directory:str, sources:list[str]=()) -> None:
+    """Write atlas pages and index
+
+    :param atlas: atlas keyed by strings
+    :type atlas: Atlas
+    :param directory: output `directory`, created if missing
+    :type directory: str
+    :param sources: `filepaths` packed, recorded to detect stale atlases, defaults to ()
+    :type sources: list[str], optional
+    """
+    os.makedirs(directory, exist_ok=True)
+    pages = []
+    for index, page in enumerate(atlas.pages):
+        pages.append(f"atlas_{index}.png")
+        image.save(page, os.path.join(directory, pages[-1]))
+
+    with open(os.path.join(directory, INDEX), "w", encoding="utf-8") as file:
+        json.dump({
+            "version": VERSION,
+            "pages": pages,
+            "regions": {key: [page, *rect] for key, (page, rect) in atlas.regions.items()},
+            "sources": {path: os.path.getmtime(path) for path in sources},
+        }, file, indent=1)
+
+def load_atlas(directory:str) -> Atlas:
+    """Load saved atlas. Pages are converted, so a display mode must be set.
+
+    :param directory: `directory` written by `save_atlas`
+    :type directory: str
+    :raises ValueError: if the index has an unsupported version
+    :rtype: Atlas
+    """
+    with open(os.path.join(directory, INDEX), encoding="utf-8") as file:
+        index = json.load(file)
+    if index.get("version") != VERSION:
+        raise ValueError(f"{directory} has unsupported atlas version {index.get('version')}")
+
+    pages = [image.load(os.path.join(directory, page)).convert_alpha()
+             for page in index["pages"]]
+    regions = {key: (page, Rect(x, y, width, height))
+               for key, (page, x, y, width, height) in index["regions"].items()}
+    return Atlas(pages, regions)
+
+def is_stale(image_directory:str, atlas_directory:str) -> bool:
+    """Check if images were added, removed or changed since the atlas was saved"""
+    try:
+        with open(os.path.join(atlas_directory, INDEX), encoding="utf-8") as file:
+            sources = json.load(file).get("sources", {})
+    except (OSError, ValueError):
+        return True
+
+    paths = find_images(image_directory)
+    return (set(paths) != set(sources)
+            or any(os.path.getmtime(path) != sources[path] for path in paths))
+
+def get_atlas(image_directory:str="assets/images", atlas_directory:str=None) -> Atlas:
+    """Get atlas of a directory's images, from the saved atlas when it is up to
+    date, otherwise packed now (and saved, if `atlas_directory` is given)
+
+    :param image_directory: `image directory`, defaults to "assets/images"
+    :type image_directory: str, optional
+    :param atlas_directory: `directory` of the saved atlas, defaults to None
+    :type atlas_directory: str, optional
+    :rtype: Atlas
+    """
+    if atlas_directory and not is_stale(image_directory, atlas_directory):
+        return load_atlas(atlas_directory)
+
+    atlas = build_atlas(image_directory)
+    if atlas_directory:
+        save_atlas(atlas, atlas_directory, find_images(image_directory))
+    atlas.pages = [page.convert_alpha() for page in atlas.pages]
+    return atlas
+
+
+if __name__ == "__main__":
+    # python -m src.atlas assets/images assets/atlas
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m src.atlas <image directory> <atlas directory>")
+    images = find_images(sys.argv[1])
+    save_atlas(build_atlas(sys.argv[1]), sys.argv[2], images)
+    print(f"packed {len(images)} images")
@@ -0,0 +1,110 @@
+"""Autotiling: pick tile variants from each cell's neighbors
+
+Every solid cell gets a 4-bit neighbor mask (north, east, south, west set
+when that neighbor is solid) and its tile code is looked up in a table of
+16 entries. With the project's textures that gives dirt for covered cells,
+grass for exposed tops and the left/right grass corners at platform ends.
+"""
+import numpy as np
+from src.tilemap import EMPTY
+
+NORTH = 1
+EAST = 2
+SOUTH = 4
+WEST = 8
+
+DIRT = ord("D")
+GRASS = ord("G")
+GRASS_LEFT = ord("F")
+GRASS_RIGHT = ord("H")
+
+def build_table() -> np.ndarray:
+    """Build the neighbor mask to tile code lookup table
+
+    :return: `uint8 array` of 16 tile codes indexed by neighbor mask
+    :rtype: np.ndarray
+    """
+    table = np.empty(16, dtype=np.uint8)
+    for mask in range(16):
+        if mask & NORTH:
+            table[mask] = DIRT
+        elif mask & EAST and not mask & WEST:
+            table[mask] = GRASS_LEFT
+        elif mask & WEST and not mask & EAST:
+            table[mask] = GRASS_RIGHT
+        else:
+            table[mask] = GRASS
+    return table
+
+# Neighbor mask -> tile code
+AUTOTILE_TABLE = build_table()
+
+
+def get_neighbor_masks(solid:np.ndarray, border_solid:bool=False) -> np.ndarray:
+    """Get 4-bit neighbor mask of every cell in one vectorized pass
+
+    :param solid: `bool array` of shape (rows, columns)
+    :type solid: np.ndarray
+    :param border_solid: treat cells outside the map as solid, defaults to False
+    :type border_solid: bool, optional
+    :return: `uint8 array` of neighbor masks
+    :rtype: np.ndarray
+    """
+    padded = np.pad(solid, 1, constant_values=border_solid)
+    return (
+        padded[:-2, 1:-1]*NORTH
+        | padded[1:-1, 2:]*EAST
+        | padded[2:, 1:-1]*SOUTH
+        | padded[1:-1, :-2]*WEST
+    ).astype(np.uint8)
+
+def autotile(tiles:np.ndarray, table:np.ndarray=AUTOTILE_TABLE,
+             border_solid:bool=False) -> np.ndarray:
+    """Autotile a whole grid. Any non-empty cell counts as solid.
+
+    :param tiles: `uint8 array` of tile codes
+    :type tiles: np.ndarray
+    :param table: `neighbor mask -> tile code` table, defaults to AUTOTILE_TABLE
+    :type table: np.ndarray, optional
+    :param border_solid: treat cells outside the map as solid, defaults to False
+    :type border_solid: bool, optional
+    :return: new `uint8 array` of tile codes
+    :rtype: np.ndarray
+    """
+    solid = tiles != EMPTY
+    masks = get_neighbor_masks(solid, border_solid)
+    return np.where(solid, table[masks], EMPTY).astype(np.uint8)
+
+def autotile_cell(tiles:np.ndarray, row:int, column:int, table:np.ndarray=AUTOTILE_TABLE,
+                  border_solid:bool=False) -> list[tuple[int, int]]:
+    """Re-autotile the 3x3 neighborhood around one changed cell, in place
+
+    :param tiles: `uint8 array` of tile codes, modified in place
+    :type tiles: np.ndarray
+    :param row: `row` of the changed cell
+    :type row: int
+    :param column: `column` of the changed cell
+    :type column: int
+    :param table: `neighbor mask -> tile code` table, defaults to AUTOTILE_TABLE
+    :type table: np.ndarray, optional
+    :param border_solid: treat cells outside the map as solid, defaults to False
+    :type border_solid: bool, optional
+    :return: `[(row, column)]` of cells whose code changed
+    :rtype: list[tuple[int, int]]
+    """
+    rows, columns = tiles.shape
+    top, bottom = max(row-1, 0), min(row+2, rows)
+    left, right = max(column-1, 0), min(column+2, columns)
+
+    # Neighborhood plus a one cell margin so masks at its edge are correct.
+    # Where the margin is cut off by the map edge, padding stands in for the border.
+    outer_top, outer_bottom = max(top-1, 0), min(bottom+1, rows)
+    outer_left, outer_right = max(left-1, 0), min(right+1, columns)
+    region = tiles[outer_top:outer_bottom, outer_left:outer_right]
+    solid = region != EMPTY
+    new = np.where(solid, table[get_neighbor_masks(solid, border_solid)], EMPTY)
+
+    inner = (slice(top-outer_top, bottom-outer_top), slice(left-outer_left, right-outer_left))
+    changed_rows, changed_columns = np.nonzero(region[inner] != new[inner])
+    region[inner] = new[inner]
+    return [(top+r, left+c) for r, c in zip(changed_rows.tolist(), changed_columns.tolist())]
@@ -1,6 +1,9 @@
 """ python 3.12.1 """
 import pygame
-from font import Font
+from src.font import Font
+from src.profiler import profiler
+
+ANCHORS = ('topleft', 'topright', 'center', 'bottomleft', 'bottomright')
 
 class Button:
     """Simple button class."""
@@ -44,16 +47,43 @@ class Button:
             abs(self.color[1]-10),
             abs(self.color[2]-10)),1
         )
-        self.set_color = self.color
 
         self.text = text
         self.text_size_factor = text_size_factor
 
         self.callback = callback
-        self.button:pygame.Surface = self.create_button(self.color)
 
-    def create_button(self, color:tuple=(0,0,0,0)) -> pygame.Surface:
-        """Create button"""
+        # Pre-rendered surfaces per state and the shared hit mask, see build()
+        self.surfaces:dict[str, pygame.Surface] = {}
+        self.mask:pygame.Mask = None
+        self.rect = pygame.Rect(self.x, self.y, 0, 0)
+        self.state = 'normal'
+        self.pressed = False
+        self.build()
+
+        # Last drawn state, used to skip redrawing unchanged buttons. Cleared by
+        # build() and place() when the surface or position changes
+        self.drawn_state:str = None
+
+    @property
+    def button(self) -> pygame.Surface:
+        """Surface for the current state"""
+        return self.surfaces[self.state]
+
+    @property
+    def set_color(self) -> pygame.Color:
+        """Color for the current state"""
+        return {
+            'normal': self.color,
+            'highlighted': self.highlighted_color,
+            'selected': self.selected_color
+        }[self.state]
+
+    def build(self) -> None:
+        """Pre-render normal, highlighted and selected surfaces and the hit mask.
+        Only needs calling again when geometry or text changes.
+        """
+        text_surface = None
         if self.text:
             text_surface = Font().render(
                 text=self.text,
@@ -61,6 +91,40 @@ class Button:
                 text_color=self.text_color
             )
 
+        self.surfaces = {
+            'normal': self.create_button(self.color, text_surface),
+            'highlighted': self.create_button(self.highlighted_color, text_surface),
+            'selected': self.create_button(self.selected_color, text_surface)
+        }
+        self.mask = get_mask(self.surfaces['normal'])
+        self.rect = self.mask.get_rect(topleft=(self.x,self.y))
+        self.drawn_state = None
+
+    def set_text(self, text:str) -> None:
+        """Change button text and re-render"""
+        if text != self.text:
+            self.text = text
+            self.build()
+
+    def resize(self, width:int, height:int) -> None:
+        """Change button size and re-render"""
+        if (width, height) != (self.width, self.height):
+            self.width, self.height = width, height
+            self.build()
+
+    def create_button(self, color:tuple=(0,0,0,0),
+                      text_surface:pygame.Surface=None) -> pygame.Surface:
+        """Create button surface
+
+        Args:
+            color (tuple, optional): Button color. Defaults to (0,0,0,0).
+            text_surface (pygame.Surface, optional): Rendered text to center on the
+                button. Defaults to None.
+
+        Returns:
+            (pygame.Surface): Button surface
+        """
+        if text_surface:
             text_surface_rect = text_surface.get_rect()
 
             if self.width==1 and self.height==1:
@@ -69,8 +133,7 @@ class Button:
                     text_surface_rect.height+self.text_size_factor*10),
                     pygame.SRCALPHA
                 )
-
-            if self.width!=1 and self.height!=1:
+            else:
                 button_surface = pygame.Surface(
                     (self.width,
                     self.height),
@@ -102,70 +165,119 @@ class Button:
 
         return button_surface
 
-    def update(self, screen:pygame.Surface) -> pygame.Rect:
-        """Update button and draw on screen"""
-        button_mask = get_mask(self.button)
-        button_mask_rect = button_mask.get_rect().move(screen.get_rect().left + self.x,
-                                                       screen.get_rect().top + self.y)
-        mouse_hover = check_mouse_hover(
-            button_mask,
-            button_mask_rect
-        )
-        current_button_color = get_color_from_surface(self.button)
+    def place(self, area:pygame.Rect) -> None:
+        """Move an anchored button to its anchor point in an area. Call once
+        after creating the button and again whenever the area is resized,
+        `update` and `draw` only read the placed rect.
+
+        Args:
+            area (pygame.Rect): Area the anchor refers to, usually the screen rect.
+        """
+        topleft = self.rect.topleft
+        if self.anchor in ANCHORS:
+            setattr(self.rect, self.anchor, getattr(area, self.anchor))
+            self.x, self.y = self.rect.x, self.rect.y
+        else:
+            self.rect.topleft = (self.x, self.y)
+        if self.rect.topleft != topleft:
+            self.drawn_state = None
+
+    def hit(self, position:tuple) -> bool:
+        """Check if a screen position is on the button's shape, not just its rect"""
+        return check_mouse_hover(self.mask, self.rect, position)
+
+    # Event handlers, see src/events.py ###############################################
+    def on_enter(self) -> None:
+        """Pointer moved onto the button"""
+        self.state = 'selected' if self.pressed else 'highlighted'
+
+    def on_leave(self) -> None:
+        """Pointer moved off the button"""
+        if not self.pressed:
+            self.state = 'normal'
+
+    def on_press(self) -> None:
+        """Left button pressed on the button"""
+        self.pressed = True
+        self.state = 'selected'
+
+    def on_release(self, inside:bool) -> None:
+        """Left button released after pressing on the button
+
+        Args:
+            inside (bool): Released over the button, which fires the callback.
+        """
+        self.pressed = False
+        self.state = 'highlighted' if inside else 'normal'
+        if inside and callable(self.callback):
+            self.callback()
+
+    def update(self, screen:pygame.Surface,
+               background:pygame.Surface=None) -> pygame.Rect | None:
+        """Poll the mouse, update button and draw on screen if it changed.
+        Buttons added to an `EventBus` get their state from events instead
+        and only need `draw`. Anchored buttons must be `place`d first.
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            background (pygame.Surface, optional): Clean copy of the screen, blitted
+                under the button before redrawing it. Defaults to None.
+
+        Returns:
+            (pygame.Rect | None): Dirty rect if the button was redrawn, otherwise None
+        """
+        mouse_hover = self.hit(pygame.mouse.get_pos())
         mouse_down = pygame.mouse.get_pressed()[0]
 
         if mouse_hover:
-            if not mouse_down and self.set_color == self.selected_color:
+            if not mouse_down and self.state == 'selected':
+                self.state = 'highlighted'
                 if callable(self.callback):
                     self.callback()
             elif mouse_down:
-                self.set_color = self.selected_color
+                self.state = 'selected'
             else:
-                self.set_color = self.highlighted_color
+                self.state = 'highlighted'
 
         if not mouse_hover:
-            if self.set_color == self.selected_color:
+            if self.state == 'selected':
                 if not mouse_down:
-                    self.set_color = self.color
+                    self.state = 'normal'
             else:
-                self.set_color = self.color
+                self.state = 'normal'
 
-        if self.set_color != current_button_color:
-            self.button = self.create_button(self.set_color)
+        return self.draw(screen, background)
 
-        if self.anchor:
-            screen_rect, button_rect = screen.get_rect(), self.button.get_rect()
+    def draw(self, screen:pygame.Surface,
+             background:pygame.Surface=None) -> pygame.Rect | None:
+        """Draw on screen if the state changed or the button was rebuilt or
+        moved since the last draw
 
-            if self.anchor == 'topleft':
-                button_rect.topleft = screen_rect.topleft
-                self.x, self.y = button_rect.x, button_rect.y
-                return screen.blit(self.button,(self.x,self.y))
-
-            if self.anchor == 'topright':
-                button_rect.topright = screen_rect.topright
-                self.x, self.y = button_rect.x, button_rect.y
-                return screen.blit(self.button,(self.x,self.y))
-
-            if self.anchor == 'center':
-                button_rect.center = screen_rect.center
-                self.x, self.y = button_rect.x, button_rect.y
-                return screen.blit(self.button,(self.x,self.y))
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            background (pygame.Surface, optional): Clean copy of the screen, blitted
+                under the button before redrawing it. Defaults to None.
 
-            if self.anchor == 'bottomleft':
-                button_rect.bottomleft = screen_rect.bottomleft
-                self.x, self.y = button_rect.x, button_rect.y
-                return screen.blit(self.button,(self.x,self.y))
+        Returns:
+            (pygame.Rect | None): Dirty rect if the button was redrawn, otherwise None
+        """
+        if self.state == self.drawn_state:
+            return None
+        self.drawn_state = self.state
+        profiler.count("buttons redrawn")
 
-            if self.anchor == 'bottomright':
-                button_rect.bottomright = screen_rect.bottomright
-                self.x, self.y = button_rect.x, button_rect.y
-                return screen.blit(self.button,(self.x,self.y))
+        if background:
+            screen.blit(background, self.rect, self.rect)
+        return screen.blit(self.button,self.rect)
 
-        return screen.blit(self.button,(self.x,self.y))
+    def mark_dirty(self) -> None:
+        """Force a redraw on the next update"""
+        self.drawn_state = None
 
-def check_mouse_hover(button_mask, button_mask_rect) -> bool:
+def check_mouse_hover(button_mask, button_mask_rect, mouse_position:tuple=None) -> bool:
     """Check if mouse is hovering button"""
-    mouse_position = pygame.mouse.get_pos()
+    if mouse_position is None:
+        mouse_position = pygame.mouse.get_pos()
 
     if button_mask_rect.collidepoint(mouse_position):
         if button_mask.get_at(
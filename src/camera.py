@@ -0,0 +1,62 @@
+"""Camera / viewport for scrolling worlds"""
+from pygame import FRect, Rect, Vector2
+
+class Camera:
+    """Viewport into world space. Only things inside `rect` need drawing."""
+    def __init__(self, width:int, height:int, position:tuple=(0,0)) -> None:
+        """Create new camera
+
+        :param width: `viewport width` in pixels
+        :type width: int
+        :param height: `viewport height` in pixels
+        :type height: int
+        :param position: `world position` of the top-left corner, defaults to (0,0)
+        :type position: tuple, optional
+        """
+        self.rect = FRect(position, (width, height))
+
+    @property
+    def offset(self) -> Vector2:
+        """World position of the viewport's top-left corner"""
+        return Vector2(self.rect.topleft)
+
+    def follow(self, target:Rect, bounds:Rect=None) -> None:
+        """Center camera on a rect, optionally kept inside world bounds
+
+        :param target: `rect` to center on
+        :type target: Rect
+        :param bounds: `world area` the view may not leave, defaults to None
+        :type bounds: Rect, optional
+        """
+        self.rect.center = target.center
+        if bounds:
+            self.rect.clamp_ip(bounds)
+
+    def to_screen(self, position:tuple) -> tuple[float, float]:
+        """Convert world position to screen position
+
+        :param position: `(x,y)` in world space
+        :type position: tuple
+        :return: `(x,y)` in screen space
+        :rtype: tuple[float, float]
+        """
+        return (position[0]-self.rect.x, position[1]-self.rect.y)
+
+    def to_world(self, position:tuple) -> tuple[float, float]:
+        """Convert screen position to world position
+
+        :param position: `(x,y)` in screen space
+        :type position: tuple
+        :return: `(x,y)` in world space
+        :rtype: tuple[float, float]
+        """
+        return (position[0]+self.rect.x, position[1]+self.rect.y)
+
+    def is_visible(self, rect:Rect) -> bool:
+        """Check if a world-space rect is inside the view
+
+        :param rect: `rect` in world space
+        :type rect: Rect
+        :rtype: bool
+        """
+        return self.rect.colliderect(rect)
@@ -1,5 +1,31 @@
 """Python 3.12.1"""
-from pygame import Rect, sprite
+from math import inf
+from typing import NamedTuple
+from pygame import Rect, FRect, sprite
+
+
+class Contact(NamedTuple):
+    """Contact found by a sweep"""
+    sprite: sprite.Sprite # or the `Tile` hit in a `Level`
+    time: float # fraction of the displacement travelled before touching
+    normal: tuple[int, int] # surface normal pointing back at the moving rect
+
+
+def get_colliding_sprites(rect:Rect, group:sprite.Group) -> list[sprite.Sprite]:
+    """Get sprites in group overlapping a rect.
+    Uses the group's spatial index (`group.query`) when it has one,
+    otherwise tests every sprite in the group.
+
+    :param rect: `rect` to test
+    :type rect: Rect
+    :param group: `sprite group`
+    :type group: sprite.Group
+    :return: overlapping sprites
+    :rtype: list[sprite.Sprite]
+    """
+    if hasattr(group, "query"):
+        return group.query(rect)
+    return [group_sprite for group_sprite in group if rect.colliderect(group_sprite.rect)]
 
 def check_collision_with_sprite_group(target:sprite.Sprite, group:sprite.Group) -> dict[str, bool]:
     """Check collisions between a sprite and a group of sprites
@@ -11,7 +37,8 @@ def check_collision_with_sprite_group(target:sprite.Sprite, group:sprite.Group)
     :return: where it has collided
     :rtype: dict[str, bool]
     """
-    collision = sprite.spritecollideany(target,group)
+    colliding = get_colliding_sprites(target.rect, group)
+    collision = colliding[0] if colliding else None
     tolerance = 2
 
     collisions = {
@@ -54,11 +81,7 @@ def intersecting_rect_with_sprite_group(rect:Rect, sprite_group:sprite.Group) ->
     :return: `smallest rect of overlap` if overlapping, otherwise return `None`
     :rtype: Rect | None
     """
-    checklist = []
-
-    for group_sprite in sprite_group:
-        if rect.colliderect(group_sprite.rect):
-            checklist.append(group_sprite.rect)
+    checklist = [group_sprite.rect for group_sprite in get_colliding_sprites(rect, sprite_group)]
 
     if not checklist:
         return None
@@ -69,3 +92,102 @@ def intersecting_rect_with_sprite_group(rect:Rect, sprite_group:sprite.Group) ->
     height = min(min(r.bottom for r in checklist),rect.bottom) - y
 
     return Rect(x,y,width,height)
+
+def sweep_aabb(rect:FRect, displacement:tuple[float, float],
+               other:Rect) -> tuple[float, tuple[int, int]] | None:
+    """Sweep a moving rect against a static rect (slab test).
+    Rects that already overlap at the start are ignored, so a rect can always
+    move out of a tile it is stuck in.
+
+    :param rect: `moving rect` at its start position
+    :type rect: FRect
+    :param displacement: `(dx, dy)` to move this step
+    :type displacement: tuple[float, float]
+    :param other: `static rect`
+    :type other: Rect
+    :return: `(time of impact in [0,1), normal)` or `None` if it is not hit
+    :rtype: tuple[float, tuple[int, int]] | None
+    """
+    dx, dy = displacement
+
+    if dx > 0:
+        x_entry, x_exit = (other.left-rect.right)/dx, (other.right-rect.left)/dx
+    elif dx < 0:
+        x_entry, x_exit = (other.right-rect.left)/dx, (other.left-rect.right)/dx
+    elif rect.right <= other.left or rect.left >= other.right:
+        return None
+    else:
+        x_entry, x_exit = -inf, inf
+
+    if dy > 0:
+        y_entry, y_exit = (other.top-rect.bottom)/dy, (other.bottom-rect.top)/dy
+    elif dy < 0:
+        y_entry, y_exit = (other.bottom-rect.top)/dy, (other.top-rect.bottom)/dy
+    elif rect.bottom <= other.top or rect.top >= other.bottom:
+        return None
+    else:
+        y_entry, y_exit = -inf, inf
+
+    entry = max(x_entry, y_entry)
+    exit_time = min(x_exit, y_exit)
+
+    if entry > exit_time or entry < 0 or entry >= 1 or exit_time <= 0:
+        return None
+
+    if x_entry > y_entry:
+        return entry, (-1 if dx > 0 else 1, 0)
+    return entry, (0, -1 if dy > 0 else 1)
+
+def move_and_collide(rect:FRect, displacement:tuple[float, float], group:sprite.Group,
+                     max_contacts:int=4) -> list[Contact]:
+    """Move a rect through a group, stopping at the first surface hit and
+    sliding along it for the rest of the displacement. Continuous, so fast
+    movement can not tunnel through thin tiles at any frame rate.
+
+    Only sprites under the swept area are tested, found through the group's
+    spatial index when it has one.
+
+    :param rect: `rect` to move, updated in place
+    :type rect: FRect
+    :param displacement: `(dx, dy)` to move this step
+    :type displacement: tuple[float, float]
+    :param group: collideable `sprite group`
+    :type group: sprite.Group
+    :param max_contacts: `contacts` resolved before stopping, defaults to 4
+    :type max_contacts: int, optional
+    :return: contacts in the order they were hit
+    :rtype: list[Contact]
+    """
+    dx, dy = displacement
+    swept = rect.union(rect.move(dx, dy))
+    candidates = get_colliding_sprites(swept, group)
+    contacts = []
+    travelled = 0.0
+
+    for _ in range(max_contacts):
+        if not dx and not dy:
+            break
+
+        nearest = None
+        for candidate in candidates:
+            hit = sweep_aabb(rect, (dx, dy), candidate.rect)
+            if hit and (nearest is None or hit[0] < nearest[0]):
+                nearest = (hit[0], hit[1], candidate)
+
+        if nearest is None:
+            rect.move_ip(dx, dy)
+            return contacts
+
+        time, normal, candidate = nearest
+        rect.move_ip(dx*time, dy*time)
+        travelled += (1-travelled)*time
+        contacts.append(Contact(candidate, travelled, normal))
+
+        # Slide: keep the remaining movement along the surface only
+        dx, dy = dx*(1-time), dy*(1-time)
+        if normal[0]:
+            dx = 0
+        if normal[1]:
+            dy = 0
+
+    return contacts
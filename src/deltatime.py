@@ -9,7 +9,7 @@ def get_deltatime(previous_time:float=None) -> tuple[float, float] | float:
     :return: `(deltatime, new time index)` | `new time index`
     :rtype: tuple[float, float] | float
     """
-    current_time = time.time()
+    current_time = time.perf_counter()
     if previous_time:
         deltatime = current_time - previous_time
         return (deltatime, current_time)
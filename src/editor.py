@@ -1,79 +1,533 @@
+"""Editor"""
+import os
+import sys
+from collections import deque
+from math import floor
+import numpy as np
 import pygame
-from button import Button
-from font import Font
+from src.camera import Camera
+from src.events import EventBus
+from src.font import Font
+from src.level import Level, TILE_IMAGES
+from src.tilemap import (EMPTY, TileMap, is_binary_level, load_tilemap,
+                         write_level, write_text_level)
+from src.widgets import UI, ButtonWidget, HStack, Label, Panel, VStack, Widget
+
+# A stroke is every cell one mouse drag changed: [(column, row, old code, new code)]
+Stroke = list[tuple[int, int, int, int]]
+
+
+class History:
+    """Undo and redo stacks of strokes"""
+    def __init__(self, limit:int=256) -> None:
+        """Create history
+
+        Args:
+            limit (int, optional): Strokes kept for undo. Defaults to 256.
+        """
+        self.undo_stack:deque[Stroke] = deque(maxlen=limit)
+        self.redo_stack:list[Stroke] = []
+
+    def push(self, stroke:Stroke) -> None:
+        """Record a finished stroke, dropping the redo stack"""
+        if stroke:
+            self.undo_stack.append(stroke)
+            self.redo_stack.clear()
+
+    def undo(self) -> Stroke | None:
+        """Get the stroke to revert, if any"""
+        if not self.undo_stack:
+            return None
+        stroke = self.undo_stack.pop()
+        self.redo_stack.append(stroke)
+        return stroke
+
+    def redo(self) -> Stroke | None:
+        """Get the stroke to apply again, if any"""
+        if not self.redo_stack:
+            return None
+        stroke = self.redo_stack.pop()
+        self.undo_stack.append(stroke)
+        return stroke
+
+    def clear(self) -> None:
+        """Drop every stroke"""
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+
+class PaletteTile(Widget):
+    """Palette entry, selects its tile when clicked"""
+    interactive = True
+
+    def __init__(self, editor:"Editor", code:int, size:int) -> None:
+        self.editor = editor
+        self.code = code
+        super().__init__(size=(size+6, size+6))
+
+    def draw(self, surface:pygame.Surface) -> None:
+        surface.blit(self.editor.level.textures[self.code], (3,3))
+        if self.code == self.editor.selected:
+            pygame.draw.rect(surface, (255,255,255), surface.get_rect(), 2)
+
+    def on_release(self, inside:bool) -> None:
+        if inside:
+            self.editor.select(self.code)
+
 
 class Editor:
-    """Game menu"""
-    def __init__(self, surface:pygame.Surface, frame_rate:int=60) -> None:
+    """Level editor for the tile map formats in `src/tilemap.py`.
+
+    Left click paints the selected palette tile, right click erases, middle
+    drag or the arrow keys pan. Every edit goes through `Level.set_tile`,
+    which only re-bakes the chunks of changed cells, so editing cost does not
+    grow with the size of the map.
+    """
+    def __init__(self, surface:pygame.Surface, path:str='level.txt',
+                 frame_rate:int=60, new_size:tuple=(400, 300),
+                 bus:EventBus=None) -> None:
+        """Create editor
+
+        Args:
+            surface (pygame.Surface): Surface to draw on, usually the screen.
+            path (str, optional): Level file opened and saved. Defaults to 'level.txt'.
+            frame_rate (int, optional): Frame rate cap. Defaults to 60.
+            new_size (tuple, optional): (columns, rows) of maps made with "New".
+                Defaults to (400, 300).
+            bus (EventBus, optional): Event bus to read input from. Defaults to a new one.
+        """
         self.screen = surface
-        self.rect = self.screen.get_rect()
+        self.bus = bus if bus is not None else EventBus()
+        self.rect:pygame.Rect = None
         self.clock = pygame.time.Clock()
         self.fps = frame_rate
         self.running = False
         self.background_color = (56,56,56)
+        self.map_color = (30,30,30)
+
+        self.path = path
+        self.new_size = new_size
+        self.pan_speed = 900 # pixels per second
+
+        # Map view right of the options panel, see `layout_view`
+        self.canvas:pygame.Surface = None
+        self.view_rect:pygame.Rect = None
+        self.view:pygame.Surface = None
+        self.camera = Camera(0, 0)
+
+        self.level:Level = None
+        self.history = History()
+        self.palette = list(TILE_IMAGES)
+        self.selected = self.palette[0]
+        self.palette_tiles:list[PaletteTile] = []
+        self.autotile_button:ButtonWidget = None
+        self.buttons:dict[str, ButtonWidget] = {}
+        self.confirming:str = None # button waiting for a second click
+        self.ui:UI = None
+
+        self.stroke:Stroke = []
+        self.stroke_code:int = None
+        self.last_cell:tuple[int, int] = None
+        self.hover_cell:tuple[int, int] = None
+        self.modified = False
+        self.view_changed = True # redraw the whole view
+        self.dirty_cells:set[tuple[int, int]] = set() # or only these cells
+        self.max_dirty_cells = 64 # past this many, redraw the whole view
+
+        self.status_text:str = None
+        self.status:pygame.Surface = None
+        self.status_rect:pygame.Rect = None
+        self.layout_view()
 
     def kill(self) -> None:
+        """Kill main loop"""
         self.running = False
 
-    def run(self):
-        """Run instance"""
-        self.running = True
-        pygame.event.clear() # clear event queue
+    # Files #############################################################################
+    def open(self) -> None:
+        """Load the level file, or start a new map if it does not exist"""
+        if not os.path.exists(self.path):
+            self.new()
+            return
+        self.set_tilemap(load_tilemap(self.path))
 
-        self.screen.fill(self.background_color)
+    def new(self) -> None:
+        """Start an empty map of `new_size`"""
+        columns, rows = self.new_size
+        size = self.level.tile_size if self.level else 36
+        # Margin cells around the map are the text format's frame
+        self.set_tilemap(TileMap(np.zeros((rows+2, columns+3), dtype=np.uint8),
+                                 size, (-size, -size)))
 
-        pixel_text =  Font().render("- Pixel -", size_factor=2,text_color=(255,255,255))
-        editor_text = Font().render("Art Editor", size_factor=2,text_color=(255,255,255))
+    def save(self) -> None:
+        """Write the map in the format of the existing file, text for new files"""
+        if os.path.exists(self.path) and is_binary_level(self.path):
+            write_level(self.path, self.level.tilemap)
+        else:
+            write_text_level(self.path, self.level.tilemap)
+        self.modified = False
+        self.cancel_confirm()
 
-        options_frame = pygame.draw.rect(
-            self.screen,(64,64,64),
-            (10,55,100,
-            self.screen.get_height()-80),
-            border_radius=15
-        )
+    def set_tilemap(self, tilemap:TileMap) -> None:
+        """Start editing a tile map"""
+        autotiled = self.level.autotiled if self.level else False
+        previous, self.level = self.level, Level(tilemap, autotiled=autotiled)
+        if previous: # after loading the new level, so shared textures stay cached
+            previous.release()
+        self.history.clear()
+        self.modified = False
+        self.dirty_cells.clear()
+        self.camera.rect.topleft = self.level.rect.topleft
+        self.view_changed = True
 
-        new_button = Button(
-            x=15,y=60,
-            width=90,height=40,
-            text="New",button_color= (56,56,56),
-            button_highlighted_color=(80,80,80),
-            text_size_factor=2,text_color=(255,255,255),
-            button_border_radius=7,callback=self.kill
-        )
+    def confirm(self, action, name:str) -> None:
+        """Run a button action that replaces the map. With unsaved edits the
+        first click only relabels the button to ask, and a second click runs it,
+        so edits and their undo history are not dropped by a stray click.
 
-        open_button = Button(
-            x=15,y=105,
-            width=90,height=40,
-            text="Open",button_color= (56,56,56),
-            button_highlighted_color=(80,80,80),
-            text_size_factor=2,text_color=(255,255,255),
-            button_border_radius=7,callback=self.kill
+        Args:
+            action: Editor method to run, `new`, `open` or `kill`.
+            name (str): Text of the clicked button, "x" for `kill`.
+        """
+        if self.modified and self.confirming != name:
+            self.cancel_confirm()
+            self.confirming = name
+            self.buttons[name].set_text("Sure?")
+            return
+        self.cancel_confirm()
+        action()
+
+    def cancel_confirm(self) -> None:
+        """Put back the text of a button waiting for confirmation"""
+        if self.confirming:
+            self.buttons[self.confirming].set_text(self.confirming)
+            self.confirming = None
+
+    def toggle_autotile(self) -> None:
+        """Switch autotiling of painted cells on or off"""
+        self.level.autotiled = not self.level.autotiled
+        if self.autotile_button:
+            self.autotile_button.set_text("Auto on" if self.level.autotiled else "Auto off")
+
+    def select(self, code:int) -> None:
+        """Select the palette tile painted with"""
+        self.selected = code
+        for tile in self.palette_tiles:
+            tile.invalidate()
+
+    # Editing ###########################################################################
+    def is_editable(self, column:int, row:int) -> bool:
+        """Check if a cell may hold a tile. The outer rows, first column and
+        last two columns are the text format's frame, see `write_text_level`."""
+        return (1 <= column < self.level.tilemap.width-2
+                and 1 <= row < self.level.tilemap.height-1)
+
+    def paint(self, column:int, row:int, code:int) -> None:
+        """Set one cell and record every cell it changed in the current stroke
+
+        Args:
+            column (int): Grid column.
+            row (int): Grid row.
+            code (int): Tile code, EMPTY to erase.
+        """
+        if not self.is_editable(column, row):
+            return
+
+        # Autotiling can change the 3x3 neighborhood, keep its codes for undo
+        top, left = max(row-1, 0), max(column-1, 0)
+        before = self.level.tiles[top:row+2, left:column+2].copy()
+
+        for changed_column, changed_row in self.level.set_tile(column, row, code):
+            self.stroke.append((
+                changed_column, changed_row,
+                int(before[changed_row-top, changed_column-left]),
+                self.level.get_tile(changed_column, changed_row)
+            ))
+            self.modified = True
+            self.dirty_cells.add((changed_column, changed_row))
+
+    def paint_line(self, start:tuple[int, int], end:tuple[int, int], code:int) -> None:
+        """Paint every cell on the line between two cells, so fast drags leave no gaps"""
+        steps = max(abs(end[0]-start[0]), abs(end[1]-start[1]))
+        for step in range(steps+1):
+            fraction = step/steps if steps else 1
+            self.paint(round(start[0]+(end[0]-start[0])*fraction),
+                       round(start[1]+(end[1]-start[1])*fraction), code)
+
+    def end_stroke(self) -> None:
+        """Finish the current stroke and record it for undo"""
+        if self.stroke: # the map changed since a confirmation was asked for
+            self.cancel_confirm()
+        self.history.push(self.stroke)
+        self.stroke = []
+        self.stroke_code = None
+        self.last_cell = None
+
+    def apply(self, stroke:Stroke, undo:bool) -> None:
+        """Revert or re-apply a recorded stroke, cell by cell
+
+        Args:
+            stroke (Stroke): Recorded stroke.
+            undo (bool): Restore old codes instead of new ones.
+        """
+        for column, row, old, new in reversed(stroke) if undo else stroke:
+            self.level.set_tile(column, row, old if undo else new, retile=False)
+            self.dirty_cells.add((column, row))
+        self.modified = True
+
+    def undo(self) -> None:
+        """Revert the last stroke"""
+        self.end_stroke()
+        stroke = self.history.undo()
+        if stroke:
+            self.apply(stroke, undo=True)
+
+    def redo(self) -> None:
+        """Apply the last undone stroke again"""
+        self.end_stroke()
+        stroke = self.history.redo()
+        if stroke:
+            self.apply(stroke, undo=False)
+
+    # Input #############################################################################
+    def handle_event(self, event:pygame.event.Event) -> None:
+        """Handle keyboard shortcuts"""
+        if event.type == pygame.QUIT:
+            pygame.quit()
+            sys.exit()
+
+        if event.type == pygame.KEYDOWN:
+            ctrl = event.mod & pygame.KMOD_CTRL
+            if event.key == pygame.K_ESCAPE:
+                self.confirm(self.kill, "x")
+            elif ctrl and event.key == pygame.K_z and event.mod & pygame.KMOD_SHIFT:
+                self.redo()
+            elif ctrl and event.key == pygame.K_z:
+                self.undo()
+            elif ctrl and event.key == pygame.K_y:
+                self.redo()
+            elif ctrl and event.key == pygame.K_s:
+                self.save()
+            elif event.key == pygame.K_t:
+                self.toggle_autotile()
+            elif pygame.K_1 <= event.key < pygame.K_1+len(self.palette):
+                self.select(self.palette[event.key-pygame.K_1])
+
+        if event.type == pygame.MOUSEMOTION and event.buttons[1]:
+            self.camera.rect.move_ip(-event.rel[0], -event.rel[1])
+            self.view_changed = True
+
+    def update(self, deltatime:float) -> None:
+        """Pan with the keyboard and paint or erase under the mouse, unless
+        the pointer is over a widget or a widget is being pressed
+
+        Args:
+            deltatime (float): Seconds since the last frame.
+        """
+        keys = self.bus.keys
+        pan = pygame.Vector2(
+            bool(keys & {pygame.K_RIGHT, pygame.K_d}) - bool(keys & {pygame.K_LEFT, pygame.K_a}),
+            bool(keys & {pygame.K_DOWN, pygame.K_s}) - bool(keys & {pygame.K_UP, pygame.K_w})
         )
+        if pan and not keys & {pygame.K_LCTRL, pygame.K_RCTRL}:
+            self.camera.rect.move_ip(pan*self.pan_speed*deltatime)
+            self.view_changed = True
+        # Keep some of the map in view
+        self.camera.rect.clamp_ip(self.level.rect.inflate(self.camera.rect.size))
+
+        mouse_position = self.bus.mouse_position
+        buttons = self.bus.mouse_buttons
+        cell = None
+        if self.view_rect.collidepoint(mouse_position):
+            x, y = self.get_view_origin()
+            cell = self.level.get_cell((mouse_position[0]-self.view_rect.x+x,
+                                        mouse_position[1]-self.view_rect.y+y))
+
+        if cell != self.hover_cell:
+            # Only the old and new hover cells need drawing again
+            self.dirty_cells.update(hover for hover in (self.hover_cell, cell) if hover)
+            self.hover_cell = cell
+
+        code = self.selected if buttons[0] else EMPTY if buttons[2] else None
+        if self.bus.hovered is not None or self.bus.pressed is not None:
+            code = None # clicks and drags on widgets do not reach the map
+        if code is None or cell is None or code != self.stroke_code:
+            self.end_stroke()
+        if code is not None and cell is not None:
+            self.paint_line(self.last_cell or cell, cell, code)
+            self.stroke_code = code
+            self.last_cell = cell
+
+    # Drawing ###########################################################################
+    def layout_view(self) -> None:
+        """Fit the canvas and the map view to the screen, e.g. after a resize.
+        The canvas is a clean copy of the screen under the UI: background and
+        map view. The view is drawn on it and the UI composes over it, so the
+        screen is only written by `UI.draw_tree`."""
+        self.rect = self.screen.get_rect()
+        self.canvas = pygame.Surface(self.rect.size, 0, self.screen)
+        self.canvas.fill(self.background_color)
+        self.view_rect = pygame.Rect(120, 0, max(self.rect.width-120, 0), self.rect.height)
+        self.view = self.canvas.subsurface(self.view_rect)
+        self.camera.rect.size = self.view_rect.size
+        self.status = None # placed from the view height
+        self.status_text = None
+        self.status_rect = None
+        self.view_changed = True
+
+    def get_view_origin(self) -> tuple[int, int]:
+        """Get the world position of the view's top-left pixel. Whole pixels,
+        so partial redraws line up with full ones."""
+        return floor(self.camera.rect.x), floor(self.camera.rect.y)
+
+    def get_cell_area(self, cell:tuple[int, int]) -> pygame.Rect:
+        """Get the view-space rect of a grid cell"""
+        x, y = self.get_view_origin()
+        return pygame.Rect(self.level.get_tile_position(*cell),
+                           (self.level.tile_size, self.level.tile_size)).move(-x, -y)
+
+    def update_status(self) -> pygame.Rect | None:
+        """Render the status line if its text changed
+
+        Returns:
+            pygame.Rect | None: View-space area of the old and new text, None if unchanged
+        """
+        text = f"{self.hover_cell or ''}{' *' if self.modified else ''}"
+        if text == self.status_text:
+            return None
+
+        previous = self.status_rect
+        self.status_text = text
+        self.status = Font().render(text, size_factor=2, text_color=(255,255,255))
+        self.status_rect = self.status.get_rect(bottomleft=(10, self.view_rect.height-10))
+        return self.status_rect.union(previous) if previous else self.status_rect
+
+    def draw_view(self, area:pygame.Rect=None) -> pygame.Rect | None:
+        """Draw the map, the cell under the mouse and the status line, in the
+        whole view or only an area of it
+
+        Args:
+            area (pygame.Rect, optional): View-space area to draw. Defaults to None,
+                the whole view.
+
+        Returns:
+            pygame.Rect | None: Dirty rect, None if the area is outside the view
+        """
+        area = self.view.get_rect().clip(area or self.view.get_rect())
+        if not area:
+            return None
+
+        x, y = self.get_view_origin()
+        self.view.set_clip(area)
+        self.view.fill(self.background_color)
+        self.view.fill(self.map_color, self.level.rect.move(-x, -y))
 
-        exit_button = Button(
-            x=0,y=0,
+        # A camera over just the area, so only the chunks under it are blitted
+        self.level.render(self.view.subsurface(area),
+                          Camera(area.width, area.height, (x+area.x, y+area.y)))
+
+        if self.hover_cell and self.is_editable(*self.hover_cell):
+            pygame.draw.rect(self.view, (255,255,255), self.get_cell_area(self.hover_cell), 1)
+
+        if self.status is None:
+            self.update_status()
+        self.view.blit(self.status, self.status_rect)
+        self.view.set_clip(None)
+        return area.move(self.view_rect.topleft)
+
+    def draw_changes(self) -> list[pygame.Rect]:
+        """Draw what changed in the view since the last call: everything after
+        a pan or a new map, otherwise only changed cells, the old and new hover
+        cells and the status line
+
+        Returns:
+            list[pygame.Rect]: Dirty rects, empty when nothing changed
+        """
+        status_area = self.update_status()
+        if self.view_changed or len(self.dirty_cells) > self.max_dirty_cells:
+            areas = [None]
+        else:
+            areas = [self.get_cell_area(cell) for cell in self.dirty_cells]
+            if status_area:
+                areas.append(status_area)
+
+        self.view_changed = False
+        self.dirty_cells.clear()
+        return [rect for rect in map(self.draw_view, areas) if rect]
+
+    def build_ui(self) -> UI:
+        """Build the options panel, palette and exit button"""
+        button_options = {
+            "width": 90, "height": 40, "button_color": (56,56,56),
+            "button_highlighted_color": (80,80,80), "text_size_factor": 2,
+            "text_color": (255,255,255), "button_border_radius": 7,
+        }
+        buttons = [ButtonWidget(text=text, callback=callback, **button_options)
+                   for text, callback in (
+                       ("New", lambda: self.confirm(self.new, "New")),
+                       ("Open", lambda: self.confirm(self.open, "Open")),
+                       ("Save", self.save), ("Undo", self.undo), ("Redo", self.redo),
+                       ("Auto on" if self.level.autotiled else "Auto off", self.toggle_autotile)
+                   )]
+        close_button = ButtonWidget(
             width=25,height=25,
             text="x",button_color= self.background_color,
             button_highlighted_color=(255,0,0),
             text_size_factor=2,text_color=(255,255,255),
-            callback=self.kill, anchor='topright'
+            callback=lambda: self.confirm(self.kill, "x")
         )
+        self.buttons = {button.button.text: button for button in (*buttons, close_button)}
+        self.confirming = None
+        self.autotile_button = buttons[-1]
+
+        self.palette_tiles = [PaletteTile(self, code, self.level.tile_size)
+                              for code in self.palette]
+        palette = VStack([HStack(self.palette_tiles[index:index+2], spacing=4)
+                          for index in range(0, len(self.palette_tiles), 2)], spacing=4)
+
+        return UI(self.rect.size, [
+            Panel([VStack([Label("- Level -"), Label("Editor")], spacing=6, align='center')],
+                  offset=(15,5)),
+            Panel([VStack([*buttons, palette], spacing=5, align='center')],
+                  offset=(10,55), size=(100,-80), padding=5,
+                  color=(64,64,64), border_radius=15),
+            Panel([close_button], anchor='topright'),
+        ], bus=self.bus)
+
+    def run(self):
+        """Run instance until closed, then release the level's textures"""
+        self.running = True
+        pygame.event.clear() # clear event queue
+
+        if self.level is None:
+            self.open()
+
+        self.bus.clear()
+        self.ui = self.build_ui()
+        self.view_changed = True
 
         while self.running:
-            deltatime = 0
-            last_time = time.time()
-
-            self.screen.blit(pixel_text, (19,self.screen.get_rect().top+5))
-            self.screen.blit(editor_text, (10,self.screen.get_rect().top+25))
-            new_button.update(self.screen)
-            open_button.update(self.screen)
-            exit_button.update(self.screen)
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-
-            pygame.display.flip()
-            deltatime = self.fps - (time.time()-last_time)
-            self.clock.tick(deltatime)
\ No newline at end of file
+            deltatime = self.clock.get_time()/1000
+
+            for event in self.bus.poll():
+                self.handle_event(event)
+
+            if self.ui.handle_window(self.screen.get_size()):
+                self.layout_view()
+
+            self.update(deltatime)
+
+            # Every change of the frame is on the canvas before the one UI
+            # pass copies it to the screen and composes the widgets over it
+            for rect in self.draw_changes():
+                self.ui.mark_dirty(rect)
+            dirty_rects = self.ui.draw_tree(self.screen, self.canvas)
+
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+            self.clock.tick(self.fps)
+
+        self.end_stroke()
+        self.bus.clear()
+        self.level.release()
+        self.level = None # opened again by the next run
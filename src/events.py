@@ -0,0 +1,161 @@
+"""Event bus: one event poll per frame, shared input state and widget dispatch"""
+import pygame
+from pygame import Rect
+from pygame.locals import (QUIT, KEYDOWN, KEYUP, MOUSEMOTION, MOUSEBUTTONDOWN,
+                           MOUSEBUTTONUP, MOUSEWHEEL, VIDEORESIZE, WINDOWRESIZED,
+                           WINDOWEXPOSED, WINDOWFOCUSGAINED, WINDOWFOCUSLOST)
+from src.spatial import SpatialGrid
+
+# Event types let into the SDL queue, everything else is dropped by SDL.
+# Input plus the window events a game has to react to: resizes, exposure
+# (the window contents were lost and need drawing again) and focus.
+DEFAULT_EVENTS = (QUIT, KEYDOWN, KEYUP, MOUSEMOTION, MOUSEBUTTONDOWN,
+                  MOUSEBUTTONUP, MOUSEWHEEL, VIDEORESIZE, WINDOWRESIZED,
+                  WINDOWEXPOSED, WINDOWFOCUSGAINED, WINDOWFOCUSLOST)
+
+
+class EventBus:
+    """Polls SDL once per frame and keeps the mouse and keyboard state.
+
+    Widgets are any objects with a `rect` and the optional handlers
+    `on_enter()`, `on_leave()`, `on_press()` and `on_release(inside)`, plus
+    `hit(position)` for exact hit tests (e.g. masks). They are kept in a
+    spatial grid, so an event only reaches the widget under the pointer and
+    frame cost depends on the number of events, not the number of widgets.
+    """
+    def __init__(self, allowed:tuple=DEFAULT_EVENTS, cell_size:int=64) -> None:
+        """Create event bus
+
+        :param allowed: `event types` let into the queue, defaults to DEFAULT_EVENTS
+        :type allowed: tuple, optional
+        :param cell_size: `grid cell side` for widget lookup, defaults to 64
+        :type cell_size: int, optional
+        """
+        self.allowed = allowed
+
+        # Snapshot built from this and earlier frames' events
+        self.events:list[pygame.event.Event] = []
+        self.mouse_position = pygame.mouse.get_pos()
+        self.mouse_buttons = [False, False, False]
+        self.keys:set[int] = set()
+        self.resized:tuple[int, int] = None # new window size, this frame only
+        self.exposed = False # window needs a full redraw, this frame only
+
+        self.widgets = SpatialGrid(cell_size)
+        self.widget_rects:dict[object, Rect] = {}
+        self.hovered = None
+        self.pressed = None
+
+    def allow(self) -> None:
+        """Block every event type except `allowed` at the SDL queue"""
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self.allowed))
+
+    # Widgets ###########################################################################
+    def add(self, widget) -> None:
+        """Start dispatching to a widget at its current rect"""
+        self.widget_rects[widget] = Rect(widget.rect)
+        self.widgets.insert(widget)
+
+    def remove(self, widget) -> None:
+        """Stop dispatching to a widget"""
+        if widget not in self.widget_rects:
+            return
+        self.widgets.remove(widget, self.widget_rects.pop(widget))
+        if self.hovered is widget:
+            self.hovered = None
+        if self.pressed is widget:
+            self.pressed = None
+
+    def move(self, widget) -> None:
+        """Re-index a widget whose rect changed"""
+        self.remove(widget)
+        self.add(widget)
+
+    def clear(self) -> None:
+        """Remove every widget"""
+        self.widgets.clear()
+        self.widget_rects.clear()
+        self.hovered = None
+        self.pressed = None
+
+    def widget_at(self, position:tuple):
+        """Get the topmost widget under a position, or None"""
+        for widget in reversed(self.widgets.query(Rect(position, (1, 1)))):
+            if not hasattr(widget, "hit") or widget.hit(position):
+                return widget
+        return None
+
+    # Dispatch ##########################################################################
+    def poll(self) -> list[pygame.event.Event]:
+        """Get this frame's events, update the input state and dispatch them.
+        Call once per frame, then read `events` or the state attributes.
+
+        :return: this frame's events
+        :rtype: list[pygame.event.Event]
+        """
+        self.events = pygame.event.get()
+        self.resized = None
+        self.exposed = False
+
+        for event in self.events:
+            if event.type == MOUSEMOTION:
+                self.mouse_position = event.pos
+                self.set_hovered(self.widget_at(event.pos))
+
+            elif event.type == MOUSEBUTTONDOWN and event.button <= 3:
+                self.mouse_position = event.pos
+                self.mouse_buttons[event.button-1] = True
+                if event.button == 1:
+                    self.set_hovered(self.widget_at(event.pos))
+                    self.pressed = self.hovered
+                    call(self.pressed, "on_press")
+
+            elif event.type == MOUSEBUTTONUP and event.button <= 3:
+                self.mouse_position = event.pos
+                self.mouse_buttons[event.button-1] = False
+                if event.button == 1 and self.pressed is not None:
+                    pressed, self.pressed = self.pressed, None
+                    call(pressed, "on_release", pressed is self.widget_at(event.pos))
+
+            elif event.type == KEYDOWN:
+                self.keys.add(event.key)
+
+            elif event.type == KEYUP:
+                self.keys.discard(event.key)
+
+            elif event.type == WINDOWFOCUSLOST: # key ups go to the other window
+                self.keys.clear()
+                self.mouse_buttons = [False, False, False]
+
+            elif event.type == WINDOWRESIZED:
+                self.resized = (event.x, event.y)
+                self.exposed = True
+
+            elif event.type == VIDEORESIZE:
+                self.resized = tuple(event.size)
+                self.exposed = True
+
+            elif event.type == WINDOWEXPOSED:
+                self.exposed = True
+
+        return self.events
+
+    def update_hover(self) -> None:
+        """Find the widget under the pointer again, e.g. after adding widgets"""
+        self.set_hovered(self.widget_at(self.mouse_position))
+
+    def set_hovered(self, widget) -> None:
+        """Send leave and enter events when the widget under the pointer changes"""
+        if widget is self.hovered:
+            return
+        call(self.hovered, "on_leave")
+        self.hovered = widget
+        call(widget, "on_enter")
+
+
+def call(widget, handler:str, *args) -> None:
+    """Call a widget's event handler if it has one"""
+    method = getattr(widget, handler, None)
+    if method:
+        method(*args)
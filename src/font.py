@@ -1,46 +1,91 @@
 """ python 3.12.1 """
+from collections import OrderedDict
 import pygame
+from src.assets import load_image
+from src.atlas import Atlas
+
+CHARACTER_MAP = [
+    "A","B","C","D","E","F","G","H","I",
+    "J","K","L","M","N","O","P","Q","R",
+    "S","T","U","V","W","X","Y","Z","a",
+    "b","c","d","e","f","g","h","i","j",
+    "k","l","m","n","o","p","q","r","s",
+    "t","u","v","w","x","y","z","1","2",
+    "3","4","5","6","7","8","9","0","?",
+    "/","!",".",",",":",";","\"","(",")",
+    "[","]","<",">","-","+","=","%","@",
+    "#","_","$","'","&","*"
+]
+
+# Parsed glyph tables, shared by every Font: {font path: {character: Surface}}
+glyph_tables:dict[str, dict[str, pygame.Surface]] = {}
+
+# Pre-scaled glyphs: {(font path, size factor): {character: Surface}}
+scaled_glyph_tables:dict[tuple[str, float], dict[str, pygame.Surface]] = {}
+
+# Pre-scaled glyphs packed for text rendering: {(font path, size factor): Atlas}
+glyph_atlases:dict[tuple[str, float], Atlas] = {}
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces with a memory limit in bytes"""
+    def __init__(self, max_bytes:int=8*1024*1024) -> None:
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.surfaces:OrderedDict[tuple, pygame.Surface] = OrderedDict()
+
+    def get(self, key:tuple) -> pygame.Surface | None:
+        """Get cached surface and mark it recently used"""
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def put(self, key:tuple, surface:pygame.Surface) -> None:
+        """Cache surface, evicting least recently used ones past `max_bytes`"""
+        size = get_surface_bytes(surface)
+        if size > self.max_bytes:
+            return
+
+        if key in self.surfaces:
+            self.used_bytes -= get_surface_bytes(self.surfaces.pop(key))
+
+        self.surfaces[key] = surface
+        self.used_bytes += size
+
+        while self.used_bytes > self.max_bytes:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.used_bytes -= get_surface_bytes(evicted)
+
+    def clear(self) -> None:
+        """Drop every cached surface"""
+        self.surfaces.clear()
+        self.used_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.surfaces)
+
+
+# Default rendered-text cache shared by every Font
+text_cache = TextCache()
+
 
 class Font:
     """Custom font generator from a png image"""
-    def __init__(self, font_path:str='assets/font.png') -> None:
-        self.character_spacing = 1
-        current_character_width = 0
-        character_clip_count = 0
-
-        font_image = pygame.image.load(font_path).convert_alpha()
-
-        self.characters = {}
-
-        self.character_map = [
-            "A","B","C","D","E","F","G","H","I",
-            "J","K","L","M","N","O","P","Q","R",
-            "S","T","U","V","W","X","Y","Z","a",
-            "b","c","d","e","f","g","h","i","j",
-            "k","l","m","n","o","p","q","r","s",
-            "t","u","v","w","x","y","z","1","2",
-            "3","4","5","6","7","8","9","0","?",
-            "/","!",".",",",":",";","\"","(",")",
-            "[","]","<",">","-","+","=","%","@",
-            "#","_","$","'","&","*"
-        ]
-
-        for pixel in range(font_image.get_width()):
-            pixel_color = font_image.get_at((pixel,0)) # Returns color of pixel
-            if pixel_color == (255,0,0):
-
-                clipped_character_image = clip(
-                    font_image, (pixel-current_character_width), 0,
-                    current_character_width, font_image.get_height()
-                )
-
-                self.characters[self.character_map[character_clip_count]] = clipped_character_image
-                character_clip_count += 1
-                current_character_width = 0
-            else:
-                current_character_width += 1
+    def __init__(self, font_path:str='assets/font.png', cache:TextCache=None) -> None:
+        """Create font. The glyph table is parsed once per font file and shared.
 
+        Args:
+            font_path (str, optional): Font sheet path. Defaults to 'assets/font.png'.
+            cache (TextCache, optional): Rendered text cache. Defaults to the shared
+                module-level `text_cache`.
+        """
+        self.font_path = font_path
+        self.character_spacing = 1
+        self.character_map = CHARACTER_MAP
+        self.characters = get_glyphs(font_path)
         self.character_space_width = self.characters["!"].get_width()
+        self.cache = cache if cache is not None else text_cache
 
     def __str__(self) -> str:
         return f'{self.characters}'
@@ -49,7 +94,8 @@ class Font:
                location:tuple=(0,0),
                size_factor:float=1,
                text_color:pygame.Color=None) -> pygame.Surface:
-        """Renders text to pygame surface using loaded font
+        """Renders text to pygame surface using loaded font.
+        Results are cached, so the returned surface is shared and must not be drawn on.
 
         Args:
             text (str): Text to render
@@ -61,52 +107,115 @@ class Font:
         Returns:
             (pygame.Surface): Pygame surface with rendered text
         """
+        key = (self.font_path, text, tuple(location), size_factor,
+               tuple(pygame.Color(text_color)) if text_color else None)
+        text_surface = self.cache.get(key)
+        if text_surface is not None:
+            return text_surface
+
+        atlas = get_glyph_atlas(self.font_path, size_factor)
         x_offset = 0
         text_surface_list = []
 
         for character in text:
             if character != " ":
-
-                text_surface_list.append(
-                    (self.characters[character],
-                    (location[0]+x_offset,location[1]))
-                )
-
+                text_surface_list.append((character, (location[0]+x_offset,location[1])))
                 x_offset += (self.characters[character].get_width()+1)*size_factor
             else:
                 x_offset += 4*size_factor
 
-        if size_factor > 1:
-            for index,character in enumerate(text_surface_list):
-                character_surface = character[0]
-
-                text_surface_list[index] = (
-                    pygame.transform.scale_by(character_surface,size_factor),
-                    text_surface_list[index][1]
-                )
-
         text_surface = pygame.Surface(
-            (x_offset-size_factor,
-            text_surface_list[-1][0].get_height()),
+            (max(x_offset-size_factor, 0),
+            atlas.regions["!"][1].height),
             pygame.SRCALPHA
         )
 
-        text_surface.blits(text_surface_list)
-        text_surface_rect = text_surface.get_bounding_rect()
-
-        text_surface = clip(
-            text_surface,
-            text_surface_rect.x,
-            text_surface_rect.y,
-            text_surface_rect.width,
-            text_surface_rect.height
-        )
+        atlas.blits(text_surface, text_surface_list)
+        text_surface = text_surface.subsurface(text_surface.get_bounding_rect()).copy()
 
         if text_color:
             text_surface.fill(text_color,special_flags=pygame.BLEND_RGB_MAX)
-            return text_surface
+
+        self.cache.put(key, text_surface)
         return text_surface
 
+
+def get_glyphs(font_path:str) -> dict[str, pygame.Surface]:
+    """Get glyph table for a font sheet, parsing it on first use.
+    Glyphs are separated by red (255,0,0) pixels in the top row.
+
+    Args:
+        font_path (str): Font sheet path
+
+    Returns:
+        dict[str, pygame.Surface]: {character: glyph surface}
+    """
+    if font_path in glyph_tables:
+        return glyph_tables[font_path]
+
+    current_character_width = 0
+    character_clip_count = 0
+    font_image = load_image(font_path)
+    characters = {}
+
+    for pixel in range(font_image.get_width()):
+        pixel_color = font_image.get_at((pixel,0)) # Returns color of pixel
+        if pixel_color == (255,0,0):
+
+            clipped_character_image = clip(
+                font_image, (pixel-current_character_width), 0,
+                current_character_width, font_image.get_height()
+            )
+
+            characters[CHARACTER_MAP[character_clip_count]] = clipped_character_image
+            character_clip_count += 1
+            current_character_width = 0
+        else:
+            current_character_width += 1
+
+    glyph_tables[font_path] = characters
+    return characters
+
+def get_scaled_glyphs(font_path:str, size_factor:float) -> dict[str, pygame.Surface]:
+    """Get glyph table scaled by `size_factor`, scaling it on first use
+
+    Args:
+        font_path (str): Font sheet path
+        size_factor (float): Text size multiplier
+
+    Returns:
+        dict[str, pygame.Surface]: {character: scaled glyph surface}
+    """
+    key = (font_path, size_factor)
+    if key not in scaled_glyph_tables:
+        characters = get_glyphs(font_path)
+        if size_factor > 1:
+            characters = {
+                character: pygame.transform.scale_by(glyph, size_factor)
+                for character, glyph in characters.items()
+            }
+        scaled_glyph_tables[key] = characters
+    return scaled_glyph_tables[key]
+
+def get_glyph_atlas(font_path:str, size_factor:float) -> Atlas:
+    """Get scaled glyphs packed into an atlas keyed by character, packing it on first use
+
+    Args:
+        font_path (str): Font sheet path
+        size_factor (float): Text size multiplier
+
+    Returns:
+        Atlas: {character: glyph region}
+    """
+    key = (font_path, size_factor)
+    if key not in glyph_atlases:
+        glyph_atlases[key] = Atlas.from_surfaces(get_scaled_glyphs(font_path, size_factor))
+    return glyph_atlases[key]
+
+def get_surface_bytes(surface:pygame.Surface) -> int:
+    """Get approximate pixel memory of a surface in bytes"""
+    return surface.get_width()*surface.get_height()*surface.get_bytesize()
+
 def clip(surface:pygame.Surface, x:int, y:int, width:int, height:int) -> pygame.Surface:
     """Clipping function for pygame surfaces
 
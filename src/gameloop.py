@@ -0,0 +1,66 @@
+"""Fixed-timestep game loop driver"""
+import time
+
+class GameLoop:
+    """Fixed physics step with an accumulator and render interpolation.
+
+    Each frame call `advance()` and run the returned number of physics
+    updates with `step` as deltatime, then render using `alpha` to blend
+    between the previous and current physics state.
+    """
+    def __init__(self, step:float=1/120, max_steps:int=5, frame_rate:int=None) -> None:
+        """Create new game loop driver
+
+        :param step: `physics step` in seconds, defaults to 1/120
+        :type step: float, optional
+        :param max_steps: `max physics steps` per frame, extra time is dropped, defaults to 5
+        :type max_steps: int, optional
+        :param frame_rate: `frame cap` used by `limit()`, defaults to None (uncapped)
+        :type frame_rate: int, optional
+        """
+        self.step = step
+        self.max_steps = max_steps
+        self.frame_rate = frame_rate
+
+        self.accumulator = 0.0
+        self.alpha = 0.0
+        self.frame_time = 0.0
+        self.previous_time = time.perf_counter()
+        self.frame_start = self.previous_time
+
+    def advance(self) -> int:
+        """Add elapsed time to the accumulator and get steps to simulate
+
+        :return: `number of physics steps` to run this frame
+        :rtype: int
+        """
+        current_time = time.perf_counter()
+        self.frame_time = current_time - self.previous_time
+        self.previous_time = current_time
+        self.frame_start = current_time
+
+        self.accumulator += self.frame_time
+        steps = int(self.accumulator // self.step)
+
+        if steps > self.max_steps:
+            # Too far behind, drop the time we can't catch up on
+            steps = self.max_steps
+            self.accumulator = steps*self.step
+
+        self.accumulator -= steps*self.step
+        self.alpha = self.accumulator/self.step
+        return steps
+
+    def limit(self) -> None:
+        """Sleep off the rest of the frame to hold `frame_rate`"""
+        if not self.frame_rate:
+            return
+
+        remaining = 1/self.frame_rate - (time.perf_counter()-self.frame_start)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    @property
+    def fps(self) -> float:
+        """Frame rate measured on the last `advance()`"""
+        return 1/self.frame_time if self.frame_time else 0.0
@@ -0,0 +1,127 @@
+"""Player input as per-tick action bitfields, with recording and replay
+
+Each physics tick's input is one byte of action bits, so gameplay can be
+recorded to a file and replayed tick for tick. Replaying the same file at
+the recorded step against the same level gives bit-identical results.
+
+Recording layout (little endian):
+    header: magic `INP1`, uint16 version, float64 step in seconds
+    body:   one uint8 of action bits per tick
+"""
+import struct
+from pygame import key
+from pygame.locals import K_w, K_a, K_s, K_d
+
+MAGIC = b"INP1"
+VERSION = 1
+HEADER = struct.Struct("<4sHd")
+
+UP = 1
+DOWN = 2
+LEFT = 4
+RIGHT = 8
+
+# Action bit -> key constant
+ACTION_KEYS = {UP: K_w, DOWN: K_s, LEFT: K_a, RIGHT: K_d}
+
+# Script key name -> action bit, see `get_actions`
+ACTION_NAMES = {"w": UP, "s": DOWN, "a": LEFT, "d": RIGHT}
+
+
+def read_keyboard(held:set[int]=None, pressed=None) -> int:
+    """Get action bits of the keys held right now
+
+    :param held: `key constants` held, e.g. `EventBus.keys`, defaults to None
+        (poll the keyboard)
+    :type held: set[int], optional
+    :param pressed: `key.get_pressed()` state already read this tick, used
+        instead of polling again, defaults to None
+    :type pressed: ScancodeWrapper, optional
+    :return: action bits
+    :rtype: int
+    """
+    if held is None:
+        if pressed is None:
+            pressed = key.get_pressed()
+        held = {key_code for key_code in ACTION_KEYS.values() if pressed[key_code]}
+
+    actions = 0
+    for action, key_code in ACTION_KEYS.items():
+        if key_code in held:
+            actions |= action
+    return actions
+
+def get_actions(names:str) -> int:
+    """Get action bits from key names, e.g. `"dw"` is `RIGHT | UP`"""
+    actions = 0
+    for name in names:
+        actions |= ACTION_NAMES[name]
+    return actions
+
+
+class InputRecorder:
+    """Writes one byte of action bits per tick to a recording file"""
+    def __init__(self, path:str, step:float) -> None:
+        """Create recording
+
+        :param path: output `filepath`
+        :type path: str
+        :param step: `physics step` in seconds the ticks are run at
+        :type step: float
+        """
+        self.file = open(path, "wb") # pylint: disable=consider-using-with
+        self.file.write(HEADER.pack(MAGIC, VERSION, step))
+        self.ticks = 0
+
+    def record(self, actions:int) -> None:
+        """Append one tick"""
+        self.file.write(bytes((actions,)))
+        self.ticks += 1
+
+    def close(self) -> None:
+        """Flush and close the file"""
+        self.file.close()
+
+    def __enter__(self) -> "InputRecorder":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class InputReplay:
+    """Feeds recorded ticks back, one `poll()` per tick"""
+    def __init__(self, path:str) -> None:
+        """Load recording
+
+        :param path: `filepath` of recording
+        :type path: str
+        :raises ValueError: if the file is not an input recording
+        """
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size or header[:4] != MAGIC:
+                raise ValueError(f"{path} is not an input recording")
+
+            _, version, self.step = HEADER.unpack(header)
+            if version != VERSION:
+                raise ValueError(f"{path} has unsupported recording version {version}")
+            self.ticks = file.read()
+
+        self.tick = 0
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    @property
+    def finished(self) -> bool:
+        """Every tick has been polled"""
+        return self.tick >= len(self.ticks)
+
+    def poll(self) -> int:
+        """Get the next tick's action bits, no input once finished"""
+        if self.finished:
+            return 0
+        actions = self.ticks[self.tick]
+        self.tick += 1
+        return actions
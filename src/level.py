@@ -1,79 +1,347 @@
 """Level loader"""
-from pygame import sprite, Surface, image, transform
+from collections import OrderedDict
+from math import floor
+from typing import NamedTuple
+import numpy as np
+from pygame import sprite, Rect, Surface
 from pygame.locals import SRCALPHA
+from src.assets import load_image, release_image
+from src.atlas import Atlas
+from src.spatial import SpatialGrid
+from src.camera import Camera
+from src.tilemap import EMPTY, TileMap, load_tilemap
+from src.autotile import autotile, autotile_cell
+from src.profiler import profiler
 
-class Dirt(sprite.Sprite):
-    """Dirt sprite"""
-    def __init__(self) -> None:
-        super().__init__()
-        __scale = (36,36)
-        __path = "assets/images/dirt.png"
-        self.image = Surface(__scale,SRCALPHA)
-        self.dirt = transform.scale(image.load(__path).convert_alpha(), __scale)
-        self.image.blit(self.dirt,(0,0))
-        self.rect = self.image.get_bounding_rect()
+# Tile code -> texture path
+TILE_IMAGES = {
+    ord("D"): "assets/images/dirt.png",
+    ord("G"): "assets/images/grass.png",
+    ord("F"): "assets/images/grass_left.png",
+    ord("H"): "assets/images/grass_right.png",
+}
 
+# Tile textures packed for chunk baking, shared by every Level:
+# {(tile images, tile size): Atlas}
+tile_atlases:dict[tuple, Atlas] = {}
+
+# Levels using each shared atlas: {(tile images, tile size): count}
+tile_atlas_users:dict[tuple, int] = {}
+
+def get_tile_atlas(textures:dict[int, Surface], tile_size:int) -> Atlas:
+    """Get the shared atlas of `TILE_IMAGES` at a tile size, packing it on first use
+
+    :param textures: `scaled tile textures` keyed by tile code, packed if
+        the atlas does not exist yet
+    :type textures: dict[int, Surface]
+    :param tile_size: `tile side` in pixels the textures were scaled to
+    :type tile_size: int
+    :rtype: Atlas
+    """
+    key = (tuple(TILE_IMAGES.items()), tile_size)
+    if key not in tile_atlases:
+        tile_atlases[key] = Atlas.from_surfaces(textures)
+        tile_atlas_users[key] = 0
+    tile_atlas_users[key] += 1
+    return tile_atlases[key]
+
+def release_tile_atlas(tile_size:int) -> None:
+    """Drop one user of a shared tile atlas, freeing its page at zero
+
+    :param tile_size: `tile side` it was packed at
+    :type tile_size: int
+    """
+    key = (tuple(TILE_IMAGES.items()), tile_size)
+    if key not in tile_atlas_users:
+        return
+
+    tile_atlas_users[key] -= 1
+    if tile_atlas_users[key] <= 0:
+        del tile_atlas_users[key]
+        del tile_atlases[key]
 
-class Grass(sprite.Sprite):
-    """Grass sprite"""
-    def __init__(self, type:str=None) -> None:
-        super().__init__()
-        __scale = (36,36)
-        __path = "assets/images/grass.png"
-        if type == 'left':
-            __path = "assets/images/grass_left.png"
-        if type == 'right':
-            __path = "assets/images/grass_right.png"
-        self.image = Surface(__scale,SRCALPHA)
-        self.grass = transform.scale(image.load(__path).convert_alpha(), __scale)
-        self.image.blit(self.grass,(0,0))
-        self.rect = self.image.get_bounding_rect()
+
+class Tile(NamedTuple):
+    """Tile found by `Level.query`. Not a sprite, tiles only exist as codes
+    in the level's grid, so this is just the code and its world rect."""
+    code: int
+    rect: Rect
 
 
 class Level(sprite.Group):
-    """Main level class"""
-    def __init__(self, mapfilepath:str) -> None:
+    """Main level class.
+
+    Tiles are stored as a grid of tile codes (see `src/tilemap.py`), not as
+    one sprite per cell. Other sprites added to the group are indexed in
+    `grid` and are collided and rendered along with the tiles.
+
+    Because tiles are not sprites, iterating the group, `len()` and
+    `sprites()` only see added sprites. Use `get_tiles` or `query` for
+    tiles, and `render` (or `draw`) to draw both.
+    """
+    def __init__(self, mapfilepath:str | TileMap, chunk_size:int=8, max_chunks:int=64,
+                 autotiled:bool=False) -> None:
         """Create new level instance
 
-        :param mapfilepath: `filepath` for level map
-        :type mapfilepath: str
+        :param mapfilepath: `filepath` for level map, text or binary format,
+            or an already loaded `TileMap`
+        :type mapfilepath: str | TileMap
+        :param chunk_size: `tiles per chunk side` for cached rendering, defaults to 8
+        :type chunk_size: int, optional
+        :param max_chunks: `chunk surfaces` kept before the least recently
+            drawn one is dropped, raised by `render` to twice the chunks in
+            view, defaults to 64
+        :type max_chunks: int, optional
+        :param autotiled: pick tile variants from neighbors (see `src/autotile.py`),
+            on load and on every `set_tile`, defaults to False
+        :type autotiled: bool, optional
         """
         super().__init__()
 
         # Read level map file ###########################
-        with open(mapfilepath, encoding="utf-8") as file:
-            __tilemap = list(file)
+        if isinstance(mapfilepath, TileMap):
+            self.tilemap = mapfilepath
+        else:
+            self.tilemap = load_tilemap(mapfilepath)
+        self.autotiled = autotiled
+        if autotiled:
+            self.tilemap.tiles = autotile(self.tilemap.tiles)
+        self.tiles = self.tilemap.tiles
+        self.tile_size = self.tilemap.tile_size
+        self.origin = self.tilemap.origin
         #################################################
 
-        for row_index, row in enumerate(__tilemap):
-            for col_index, cell in enumerate(row):
-                if cell == "D":
-                    dirt = Dirt()
-                    dirt.rect.topleft = (
-                        -36+int(col_index*36),
-                        -36+int(row_index*36))
-                    self.add(dirt)
-
-                if cell == "G":
-                    grass = Grass()
-                    grass.rect.topleft = (
-                        -36+int(col_index*36),
-                        -36+int(row_index*36))
-                    self.add(grass)
-
-                if cell == "F":
-                    grass = Grass('left')
-                    grass.rect.topleft = (
-                        -36+int(col_index*36),
-                        -36+int(row_index*36))
-                    self.add(grass)
-
-                if cell == "H":
-                    grass = Grass('right')
-                    grass.rect.topleft = (
-                        -36+int(col_index*36),
-                        -36+int(row_index*36))
-                    self.add(grass)
-
-                if cell == " ":
-                    pass
+        __scale = (self.tile_size, self.tile_size)
+        self.textures = {code: load_image(path, __scale) for code, path in TILE_IMAGES.items()}
+
+        # Chunks are baked from one shared atlas page: {code: (page, source rect)}
+        self.atlas = get_tile_atlas(self.textures, self.tile_size)
+        self.texture_regions = {code: self.atlas.get(code) for code in self.textures}
+
+        self.grid = SpatialGrid(self.tile_size)
+
+        # Lazily baked render chunks: {(chunk x, chunk y): Surface}, empty ones are not kept
+        self.chunk_pixels = chunk_size*self.tile_size
+        self.max_chunks = max_chunks
+        self.chunks:OrderedDict[tuple[int, int], Surface] = OrderedDict()
+
+    def release(self) -> None:
+        """Drop this level's references to its cached textures and chunks.
+        Call once when the level is discarded."""
+        if not self.textures:
+            return
+        for path in TILE_IMAGES.values():
+            release_image(path, (self.tile_size, self.tile_size))
+        release_tile_atlas(self.tile_size)
+        self.textures = {}
+        self.chunks.clear()
+
+    @property
+    def rect(self) -> Rect:
+        """World-space bounds of the tile grid"""
+        return Rect(self.origin,
+                    (self.tilemap.width*self.tile_size, self.tilemap.height*self.tile_size))
+
+    def tile_range(self, rect:Rect) -> tuple[range, range]:
+        """Get grid column and row ranges covered by a rect, clamped to the map
+
+        :param rect: `area` in world space
+        :type rect: Rect
+        :return: `(columns, rows)`
+        :rtype: tuple[range, range]
+        """
+        size = self.tile_size
+        left = max(floor((rect.left-self.origin[0])/size), 0)
+        right = min(floor((rect.right-self.origin[0])/size)+1, self.tilemap.width)
+        top = max(floor((rect.top-self.origin[1])/size), 0)
+        bottom = min(floor((rect.bottom-self.origin[1])/size)+1, self.tilemap.height)
+        return range(left, max(right, left)), range(top, max(bottom, top))
+
+    def get_tile_position(self, column:int, row:int) -> tuple[int, int]:
+        """Get world position of a grid cell's top-left corner"""
+        return (self.origin[0]+column*self.tile_size, self.origin[1]+row*self.tile_size)
+
+    def get_cell(self, position:tuple) -> tuple[int, int]:
+        """Get `(column, row)` of the grid cell containing a world position"""
+        return (floor((position[0]-self.origin[0])/self.tile_size),
+                floor((position[1]-self.origin[1])/self.tile_size))
+
+    def get_tile(self, column:int, row:int) -> int:
+        """Get tile code of a grid cell, `EMPTY` outside the map"""
+        if 0 <= row < self.tilemap.height and 0 <= column < self.tilemap.width:
+            return int(self.tiles[row, column])
+        return EMPTY
+
+    def set_tile(self, column:int, row:int, code:int,
+                 retile:bool=True) -> list[tuple[int, int]]:
+        """Change one grid cell, re-autotiling its neighborhood if enabled.
+        Only the render chunks of changed cells are invalidated.
+
+        :param column: `grid column`
+        :type column: int
+        :param row: `grid row`
+        :type row: int
+        :param code: `tile code`, `EMPTY` to erase
+        :type code: int
+        :param retile: re-autotile the neighborhood of autotiled levels, pass
+            False to write the code as is (e.g. when undoing), defaults to True
+        :type retile: bool, optional
+        :return: `[(column, row)]` of every cell that changed
+        :rtype: list[tuple[int, int]]
+        """
+        if not (0 <= row < self.tilemap.height and 0 <= column < self.tilemap.width):
+            return []
+        if not self.tiles.flags.writeable: # memory-mapped levels are read-only
+            self.tilemap.tiles = self.tiles = np.array(self.tiles)
+
+        changed = []
+        if self.tiles[row, column] != code:
+            self.tiles[row, column] = code
+            changed.append((column, row))
+        if self.autotiled and retile:
+            changed += [(changed_column, changed_row) for changed_row, changed_column
+                        in autotile_cell(self.tiles, row, column)
+                        if (changed_column, changed_row) != (column, row)]
+
+        for changed_column, changed_row in changed:
+            self.invalidate(Rect(self.get_tile_position(changed_column, changed_row),
+                                 (self.tile_size-1, self.tile_size-1)))
+        return changed
+
+    def get_tiles(self, rect:Rect) -> list[tuple[int, int, int]]:
+        """Get non-empty grid cells under a rect
+
+        :param rect: `area` in world space
+        :type rect: Rect
+        :return: `[(column, row, code)]`
+        :rtype: list[tuple[int, int, int]]
+        """
+        columns, rows = self.tile_range(rect)
+        if not columns or not rows:
+            return []
+
+        cells = self.tiles[rows.start:rows.stop, columns.start:columns.stop]
+        found_rows, found_columns = np.nonzero(cells)
+        return [
+            (columns.start+column, rows.start+row, int(cells[row, column]))
+            for row, column in zip(found_rows.tolist(), found_columns.tolist())
+        ]
+
+    def add_internal(self, sprite, layer=None) -> None:
+        super().add_internal(sprite, layer)
+        self.grid.insert(sprite)
+        self.invalidate(sprite.rect)
+
+    def remove_internal(self, sprite) -> None:
+        self.grid.remove(sprite)
+        self.invalidate(sprite.rect)
+        super().remove_internal(sprite)
+
+    def query(self, rect:Rect) -> list[Tile | sprite.Sprite]:
+        """Get tiles and sprites overlapping a rect.
+        Only the grid cells under the rect are visited.
+
+        :param rect: `area` to search
+        :type rect: Rect
+        :return: overlapping tiles, as `Tile(code, rect)`, then sprites
+        :rtype: list[Tile | sprite.Sprite]
+        """
+        size = self.tile_size
+        found = []
+        for column, row, code in self.get_tiles(rect):
+            tile_rect = Rect(self.get_tile_position(column, row), (size, size))
+            if rect.colliderect(tile_rect):
+                found.append(Tile(code, tile_rect))
+        return found + self.grid.query(rect)
+
+    def get_chunk(self, chunk_x:int, chunk_y:int) -> Surface | None:
+        """Get baked chunk surface, rendering it on first use. Empty chunks
+        are not cached, so they never push drawn chunks out of the cache.
+
+        :param chunk_x: `chunk column`
+        :type chunk_x: int
+        :param chunk_y: `chunk row`
+        :type chunk_y: int
+        :return: chunk surface, or `None` if the chunk has no tiles
+        :rtype: Surface | None
+        """
+        key = (chunk_x, chunk_y)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+
+        size = self.chunk_pixels
+        chunk_rect = Rect(chunk_x*size, chunk_y*size, size, size)
+        blit_list = []
+
+        for column, row, code in self.get_tiles(chunk_rect):
+            x, y = self.get_tile_position(column, row)
+            page, area = self.texture_regions[code]
+            blit_list.append((page, (x-chunk_rect.x, y-chunk_rect.y), area))
+
+        for item in self.grid.query(chunk_rect):
+            blit_list.append((item.image, item.rect.move(-chunk_rect.x, -chunk_rect.y)))
+
+        if not blit_list:
+            return None
+
+        chunk = Surface((size, size), SRCALPHA)
+        chunk.blits(blit_list, doreturn=False)
+
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def invalidate(self, rect:Rect=None) -> None:
+        """Drop baked chunks so they are re-rendered on next draw
+
+        :param rect: `world area` that changed, defaults to None (every chunk)
+        :type rect: Rect, optional
+        """
+        if rect is None:
+            self.chunks.clear()
+            return
+
+        size = self.chunk_pixels
+        for chunk_y in range(floor(rect.top/size), floor(rect.bottom/size)+1):
+            for chunk_x in range(floor(rect.left/size), floor(rect.right/size)+1):
+                self.chunks.pop((chunk_x, chunk_y), None)
+
+    def draw(self, surface:Surface, camera:Camera=None) -> None: # pylint: disable=arguments-differ
+        """Draw tiles and sprites, replaces `Group.draw` which would only draw
+        the added sprites
+
+        :param surface: `surface` to draw on
+        :type surface: Surface
+        :param camera: `camera` whose view is drawn, defaults to None (world
+            positions, like `Group.draw`)
+        :type camera: Camera, optional
+        """
+        self.render(surface, camera or Camera(*surface.get_size()))
+
+    def render(self, surface:Surface, camera:Camera) -> None:
+        """Draw the chunks visible to the camera
+
+        :param surface: `surface` to draw on, usually the screen
+        :type surface: Surface
+        :param camera: `camera` whose view is drawn
+        :type camera: Camera
+        """
+        size = self.chunk_pixels
+        view = camera.rect
+        blit_list = []
+
+        chunk_columns = range(floor(view.left/size), floor((view.right-1)/size)+1)
+        chunk_rows = range(floor(view.top/size), floor((view.bottom-1)/size)+1)
+        # Keep every visible chunk plus room for scrolling, or each frame evicts the last
+        self.max_chunks = max(self.max_chunks, 2*len(chunk_columns)*len(chunk_rows))
+
+        for chunk_y in chunk_rows:
+            for chunk_x in chunk_columns:
+                chunk = self.get_chunk(chunk_x, chunk_y)
+                if chunk:
+                    blit_list.append((chunk, (chunk_x*size-view.x, chunk_y*size-view.y)))
+
+        surface.blits(blit_list, doreturn=False)
+        profiler.count("chunks drawn", len(blit_list))
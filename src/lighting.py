@@ -1,14 +1,18 @@
 """Module for lighting and various visual effects in pygame"""
-from pygame import Surface, mask, draw
-from random import randint
-from pygame.locals import SRCALPHA
+from hashlib import blake2b
+from weakref import WeakKeyDictionary
+import numpy as np
+from pygame import Surface, Rect, Vector2, Color, mask, draw, image, transform, surfarray
+from pygame.locals import SRCALPHA, BLEND_RGB_ADD, BLEND_RGB_MULT
 
-def get_outline(surface:Surface) -> Surface:
+def get_outline(surface:Surface, color:tuple=(255,255,255,255)) -> Surface:
     """Get outline of surface using pygame masks.
-    Draws outline as a white line (1 pixel wide).
+    Draws outline as a 1 pixel wide line in `color`, white by default.
 
     :param surface: `Surface to outline`
     :type surface: Surface
+    :param color: `line color`, defaults to (255,255,255,255)
+    :type color: tuple, optional
     :return: `new surface` with outline drawn
     :rtype: Surface
     """
@@ -18,6 +22,301 @@ def get_outline(surface:Surface) -> Surface:
 
     for partial_mask in outline_masks:
         points = partial_mask.outline()
-        draw.lines(outline, (255,255,255,255), True, points)
+        if len(points) > 1:
+            draw.lines(outline, color, True, points)
+        elif points:
+            outline.set_at(points[0], color)
 
     return outline
+
+def get_content_hash(surface:Surface) -> bytes:
+    """Hash a surface's size and pixels
+
+    :param surface: `surface` to hash
+    :type surface: Surface
+    :return: `digest`
+    :rtype: bytes
+    """
+    digest = blake2b(digest_size=16)
+    digest.update(repr(surface.get_size()).encode())
+    digest.update(image.tobytes(surface, "RGBA"))
+    return digest.digest()
+
+
+class OutlineCache:
+    """Precomputed outlines keyed by surface content and flip state.
+
+    Outlines are looked up by content hash, so identical frames share one
+    outline. The hash of each source surface is remembered by identity, so a
+    repeat lookup of the same surface does not rehash its pixels. Call
+    `invalidate` after drawing on a surface that was already looked up.
+    """
+    def __init__(self) -> None:
+        self.outlines:dict[tuple, Surface] = {}
+        self.hashes:WeakKeyDictionary[Surface, bytes] = WeakKeyDictionary()
+
+    def get(self, surface:Surface, flip_x:bool=False, flip_y:bool=False,
+            color:tuple=(255,255,255,255)) -> Surface:
+        """Get cached outline of a surface, generating it on first use
+
+        :param surface: `surface` to outline
+        :type surface: Surface
+        :param flip_x: outline of the horizontally flipped surface, defaults to False
+        :type flip_x: bool, optional
+        :param flip_y: outline of the vertically flipped surface, defaults to False
+        :type flip_y: bool, optional
+        :param color: `line color`, defaults to (255,255,255,255)
+        :type color: tuple, optional
+        :return: shared outline surface, do not draw on
+        :rtype: Surface
+        """
+        content_hash = self.hashes.get(surface)
+        if content_hash is None:
+            content_hash = get_content_hash(surface)
+            self.hashes[surface] = content_hash
+
+        color = tuple(color)
+        key = (content_hash, flip_x, flip_y, color)
+        outline = self.outlines.get(key)
+        if outline is None:
+            if flip_x or flip_y:
+                outline = transform.flip(self.get(surface, color=color), flip_x, flip_y)
+            else:
+                outline = get_outline(surface, color)
+            self.outlines[key] = outline
+        return outline
+
+    def build(self, surfaces:list[Surface],
+              flips:tuple=((False, False), (True, False)),
+              color:tuple=(255,255,255,255)) -> list[dict[tuple[bool, bool], Surface]]:
+        """Generate outlines for a whole sprite sheet up front, e.g. at load time
+
+        :param surfaces: `frames` to outline
+        :type surfaces: list[Surface]
+        :param flips: `(flip_x, flip_y)` states to generate,
+            defaults to unflipped and horizontally flipped
+        :type flips: tuple, optional
+        :param color: `line color`, defaults to (255,255,255,255)
+        :type color: tuple, optional
+        :return: `[{(flip_x, flip_y): outline}]` in frame order
+        :rtype: list[dict[tuple[bool, bool], Surface]]
+        """
+        return [
+            {flip: self.get(surface, flip[0], flip[1], color) for flip in flips}
+            for surface in surfaces
+        ]
+
+    def invalidate(self, surface:Surface=None) -> None:
+        """Forget a surface's remembered hash, or everything if no surface is given
+
+        :param surface: `surface` whose pixels changed, defaults to None
+        :type surface: Surface, optional
+        """
+        if surface is None:
+            self.outlines.clear()
+            self.hashes.clear()
+            return
+        self.hashes.pop(surface, None)
+
+    def __len__(self) -> int:
+        return len(self.outlines)
+
+
+# Default outline cache
+outlines = OutlineCache()
+
+
+# Light textures: {(radius, falloff, color): Surface}
+light_textures:dict[tuple, Surface] = {}
+
+def get_light_texture(radius:int, falloff:float=2.0, color:tuple=(255,255,255)) -> Surface:
+    """Get radial light gradient, generated once per radius, falloff and color.
+    Intensity at distance `d` is `(1 - d/radius) ** falloff`.
+
+    :param radius: `radius` in pixels
+    :type radius: int
+    :param falloff: `falloff exponent`, higher is a tighter light, defaults to 2.0
+    :type falloff: float, optional
+    :param color: `light color`, defaults to (255,255,255)
+    :type color: tuple, optional
+    :return: shared `(radius*2, radius*2)` surface, do not draw on
+    :rtype: Surface
+    """
+    radius = max(int(radius), 1)
+    key = (radius, falloff, tuple(color))
+    if key not in light_textures:
+        axis = np.arange(radius*2) - radius + 0.5
+        distance = np.hypot(axis[:, None], axis[None, :])
+        intensity = np.clip(1 - distance/radius, 0, 1) ** falloff
+        pixels = intensity[:, :, None] * np.array(color[:3], dtype=np.float64)
+        light_textures[key] = surfarray.make_surface(pixels.astype(np.uint8)).convert()
+    return light_textures[key]
+
+
+class Light:
+    """Point light in world space"""
+    def __init__(self, position:tuple, radius:float=200,
+                 color:tuple=(255,255,255), falloff:float=2.0,
+                 casts_shadows:bool=True) -> None:
+        """Create point light
+
+        :param position: `(x,y)` in world space
+        :type position: tuple
+        :param radius: `reach` in pixels, defaults to 200
+        :type radius: float, optional
+        :param color: `light color`, defaults to (255,255,255)
+        :type color: tuple, optional
+        :param falloff: `falloff exponent`, defaults to 2.0
+        :type falloff: float, optional
+        :param casts_shadows: occlude with level tiles, defaults to True
+        :type casts_shadows: bool, optional
+        """
+        self.position = Vector2(position)
+        self.radius = radius
+        self.color = Color(color)
+        self.falloff = falloff
+        self.casts_shadows = casts_shadows
+
+    @property
+    def rect(self) -> Rect:
+        """World-space area the light can reach"""
+        return Rect(self.position.x-self.radius, self.position.y-self.radius,
+                    self.radius*2, self.radius*2)
+
+
+class LightMap:
+    """Low resolution light map composited over the screen with a multiply blend.
+
+    Each frame the map is filled with the ambient color, every visible light
+    adds its cached gradient (with tile shadows cut out), and the result is
+    scaled up and multiplied onto the screen.
+    """
+    def __init__(self, size:tuple, scale:int=4, ambient:tuple=(40,40,60), level=None) -> None:
+        """Create light map
+
+        :param size: `(width, height)` of the screen it covers
+        :type size: tuple
+        :param scale: `screen pixels` per light map pixel, defaults to 4
+        :type scale: int, optional
+        :param ambient: `unlit color`, defaults to (40,40,60)
+        :type ambient: tuple, optional
+        :param level: `Level` whose tiles occlude light, defaults to None
+        :type level: Level, optional
+        """
+        self.size = (int(size[0]), int(size[1]))
+        self.scale = scale
+        self.ambient = Color(ambient)
+        self.level = level
+        self.lights:list[Light] = []
+        self.surface = Surface(
+            (-(-self.size[0]//scale), -(-self.size[1]//scale))).convert()
+        self.scaled = Surface(self.size).convert()
+
+    def add(self, light:Light) -> Light:
+        """Add light and return it"""
+        self.lights.append(light)
+        return light
+
+    def remove(self, light:Light) -> None:
+        """Remove light"""
+        self.lights.remove(light)
+
+    def get_shadow_polygons(self, light:Light) -> list[list[tuple[float, float]]]:
+        """Get shadow quads cast by level tiles within the light's radius.
+        Only edges that face the light and border an empty cell cast shadows.
+
+        :param light: `light` to cast from
+        :type light: Light
+        :return: polygons in world space
+        :rtype: list[list[tuple[float, float]]]
+        """
+        level = self.level
+        tiles = level.tiles
+        rows, columns = tiles.shape
+        size = level.tile_size
+        light_x, light_y = light.position
+        reach = light.radius*2
+        polygons = []
+
+        for column, row, _ in level.get_tiles(light.rect):
+            left, top = level.get_tile_position(column, row)
+            right, bottom = left+size, top+size
+
+            # (edge start, edge end, faces light, neighbor cell is empty)
+            edges = (
+                ((left, top), (right, top), light_y < top,
+                 row == 0 or not tiles[row-1, column]),
+                ((right, bottom), (left, bottom), light_y > bottom,
+                 row == rows-1 or not tiles[row+1, column]),
+                ((left, bottom), (left, top), light_x < left,
+                 column == 0 or not tiles[row, column-1]),
+                ((right, top), (right, bottom), light_x > right,
+                 column == columns-1 or not tiles[row, column+1]),
+            )
+
+            for start, end, faces_light, exposed in edges:
+                if not (faces_light and exposed):
+                    continue
+                polygons.append([
+                    start, end,
+                    project(end, light.position, reach),
+                    project(start, light.position, reach),
+                ])
+
+        return polygons
+
+    def render(self, screen:Surface, camera=None) -> None:
+        """Build the light map and multiply it onto the screen
+
+        :param screen: `surface` to light
+        :type screen: Surface
+        :param camera: `camera` for world to screen offset, defaults to None
+        :type camera: Camera, optional
+        """
+        scale = self.scale
+        view = camera.rect if camera else Rect((0,0), self.size)
+        self.surface.fill(self.ambient)
+        blit_list = []
+
+        for light in self.lights:
+            if not view.colliderect(light.rect):
+                continue
+
+            radius = max(int(light.radius/scale), 1)
+            texture = get_light_texture(radius, light.falloff, light.color)
+            topleft = (light.position.x-radius*scale, light.position.y-radius*scale)
+
+            if light.casts_shadows and self.level is not None:
+                polygons = self.get_shadow_polygons(light)
+                if polygons:
+                    texture = texture.copy()
+                    for polygon in polygons:
+                        draw.polygon(texture, (0,0,0), [
+                            ((x-topleft[0])/scale, (y-topleft[1])/scale) for x, y in polygon
+                        ])
+
+            blit_list.append((texture, ((topleft[0]-view.x)/scale, (topleft[1]-view.y)/scale)))
+
+        for texture, position in blit_list:
+            self.surface.blit(texture, position, special_flags=BLEND_RGB_ADD)
+
+        transform.smoothscale(self.surface, self.scaled.get_size(), self.scaled)
+        screen.blit(self.scaled, (0,0), special_flags=BLEND_RGB_MULT)
+
+
+def project(point:tuple, origin:Vector2, distance:float) -> tuple[float, float]:
+    """Push point away from origin by `distance`
+
+    :param point: `(x,y)` to project
+    :type point: tuple
+    :param origin: `light position`
+    :type origin: Vector2
+    :param distance: `distance` to push
+    :type distance: float
+    :return: projected point
+    :rtype: tuple[float, float]
+    """
+    direction = Vector2(point) - origin
+    if direction.length_squared():
+        direction.scale_to_length(distance)
+    return (point[0]+direction.x, point[1]+direction.y)
@@ -0,0 +1,165 @@
+"""Background asset loading on a thread pool"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, SimpleQueue
+import time
+from pygame import Surface, transform
+from src.assets import AssetManager, assets, get_key
+from src.tilemap import load_tilemap
+
+class AssetLoader:
+    """Decodes images and reads tile maps on worker threads.
+
+    Every request returns a `Future`. Images are decoded and scaled on a
+    worker, then `process()` (called from the main thread, e.g. once per
+    frame) runs `convert_alpha`, which SDL only allows on the main thread,
+    stores the surface in the asset cache and completes the future.
+    """
+    def __init__(self, max_workers:int=4, cache:AssetManager=None) -> None:
+        """Create loader
+
+        :param max_workers: `worker threads`, defaults to 4
+        :type max_workers: int, optional
+        :param cache: `asset cache` to fill, defaults to the shared one
+        :type cache: AssetManager, optional
+        """
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="asset-loader")
+        self.cache = cache if cache is not None else assets
+        self.finished:SimpleQueue = SimpleQueue()
+        # Images being loaded: {cache key: [future, requests for it]}
+        self.loading:dict[tuple, list] = {}
+        self.total = 0
+        self.completed = 0
+
+    @property
+    def pending(self) -> int:
+        """Requests not completed yet"""
+        return self.total - self.completed
+
+    @property
+    def progress(self) -> float:
+        """Fraction of requests completed, 1.0 when idle"""
+        return self.completed/self.total if self.total else 1.0
+
+    def submit(self, work, finish=None) -> Future:
+        """Run `work()` on a worker, then `finish(result)` on the main thread
+
+        :param work: callable run on a worker thread
+        :param finish: callable run by `process()`, defaults to None (pass through)
+        :return: future completed with the finished result
+        :rtype: Future
+        """
+        future = Future()
+        self.total += 1
+
+        def run() -> None:
+            try:
+                self.finished.put((future, work(), finish, None))
+            except Exception as error: # pylint: disable=broad-except
+                self.finished.put((future, None, None, error))
+
+        self.executor.submit(run)
+        return future
+
+    def load_image(self, path:str, size:tuple=None, scale_factor:float=None) -> Future:
+        """Decode and scale an image in the background. Every request takes
+        one reference in the asset cache, and requests for an image that is
+        already loading share its future.
+
+        :param path: `image filepath`
+        :type path: str
+        :param size: `(width, height)` to scale to, defaults to None
+        :type size: tuple, optional
+        :param scale_factor: `scale multiplier`, defaults to None
+        :type scale_factor: float, optional
+        :return: future of the cached, converted surface
+        :rtype: Future
+        """
+        key = get_key(path, size, scale_factor)
+        if key in self.cache or self.cache.is_packed(path, size, scale_factor):
+            future = Future()
+            future.set_result(self.cache.load(path, size, scale_factor))
+            return future
+        if key in self.loading:
+            self.loading[key][1] += 1
+            return self.loading[key][0]
+
+        def decode() -> Surface:
+            surface = self.cache.get_source(path)
+            if size:
+                surface = transform.scale(surface, size)
+            elif scale_factor:
+                surface = transform.scale_by(surface, scale_factor)
+            return surface
+
+        def convert(surface:Surface) -> Surface:
+            requests = self.loading.pop(key)[1]
+            surface = self.cache.insert(surface.convert_alpha(), path, size, scale_factor)
+            for _ in range(requests-1): # shared requests take their references too
+                self.cache.load(path, size, scale_factor)
+            return surface
+
+        future = self.submit(decode, convert)
+        self.loading[key] = [future, 1]
+        future.add_done_callback(lambda _: self.loading.pop(key, None)) # also on errors
+        return future
+
+    def load_tilemap(self, path:str) -> Future:
+        """Read a level's tile map in the background
+
+        :param path: `filepath` of text or binary level
+        :type path: str
+        :return: future of the `TileMap`
+        :rtype: Future
+        """
+        return self.submit(lambda: load_tilemap(path))
+
+    def process(self, time_budget:float=None) -> int:
+        """Finish loaded requests on the main thread
+
+        :param time_budget: `seconds` to spend, defaults to None (everything ready)
+        :type time_budget: float, optional
+        :return: `requests completed`
+        :rtype: int
+        """
+        start = time.perf_counter()
+        count = 0
+
+        while time_budget is None or time.perf_counter()-start < time_budget:
+            try:
+                self.finish(self.finished.get_nowait())
+            except Empty:
+                break
+            count += 1
+
+        return count
+
+    def finish(self, request:tuple) -> None:
+        """Run a finished request's main-thread step and complete its future"""
+        future, result, finish, error = request
+
+        if error is None and finish:
+            try:
+                result = finish(result)
+            except Exception as finish_error: # pylint: disable=broad-except
+                error = finish_error
+
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
+        self.completed += 1
+
+    def wait(self, on_progress=None) -> None:
+        """Block until every request is completed
+
+        :param on_progress: called with `progress` after each request, defaults to None
+        """
+        while self.pending:
+            self.finish(self.finished.get())
+            if on_progress:
+                on_progress(self.progress)
+
+    def shutdown(self) -> None:
+        """Stop worker threads"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
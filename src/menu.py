@@ -1,69 +1,132 @@
 """Menu"""
 import sys
 import pygame
-from button import Button
-from font import Font
+from src.events import EventBus
+from src.font import Font
+from src.loader import AssetLoader
+from src.widgets import UI, ButtonWidget, Label, Panel, VStack
 
 
 class Menu:
     """Game menu"""
-    def __init__(self, surface:pygame.Surface, frame_rate:int=60) -> None:
+    def __init__(self, surface:pygame.Surface, frame_rate:int=60,
+                 bus:EventBus=None) -> None:
         self.screen = surface
+        self.bus = bus if bus is not None else EventBus()
         self.rect = self.screen.get_rect()
         self.clock = pygame.time.Clock()
         self.fps = frame_rate
         self.running = False
         self.background_color = (56,56,56)
+        self.choice = 'play'
 
     def kill(self) -> None:
         """Kill main loop"""
         self.running = False
 
-    def run(self) -> None:
-        """Run instance"""
-        self.running = True
-        pygame.event.clear() # clear event queue
+    def choose(self, choice:str) -> None:
+        """Close the menu, returning `choice` from `run`"""
+        self.choice = choice
+        self.kill()
 
-        menu_title = Font().render("Game", size_factor=2,text_color=(255,255,255))
+    def draw_progress(self, progress:float, background:pygame.Surface) -> pygame.Rect:
+        """Draw loading bar in the bottom-right corner
 
-        play_button = Button(
-            text="Play",x=25,y=self.screen.get_height()-120,
-            width=90, height=60,button_color =(65,65,65),text_size_factor=3,
-            button_highlighted_color=(95,95,95),
-            text_color=(255,255,255), button_border_radius=4,
-            callback=self.kill
-        )
+        Args:
+            progress (float): Fraction loaded, 0 to 1
+            background (pygame.Surface): Clean copy of the screen to draw over
 
-        editor_button = Button(
-            text="Editor",x=25,y=self.screen.get_height()-50,
-            width=90, height=35,
-            button_color =(55,55,55),text_size_factor=2,
-            button_highlighted_color=(95,95,95),
-            text_color=(255,255,255), button_border_radius=7,
-            callback=self.kill
+        Returns:
+            pygame.Rect: Dirty rect
+        """
+        bar_rect = pygame.Rect(0, 0, 200, 8)
+        bar_rect.bottomright = (self.rect.right-15, self.rect.bottom-15)
+        label = Font().render(
+            f"Loading {progress:.0%}" if progress < 1 else "Ready",
+            size_factor=2, text_color=(255,255,255)
         )
+        area = bar_rect.union(label.get_rect(bottomleft=(bar_rect.x, bar_rect.y-6)))
 
-        exit_button = Button(
-            width=25,height=25,
-            text="x",button_color= self.background_color,
-            button_highlighted_color=(255,0,0),
-            text_size_factor=2,text_color=(255,255,255),
-            callback=self.kill, anchor='topright'
+        self.screen.blit(background, area, area)
+        self.screen.blit(label, label.get_rect(bottomleft=(bar_rect.x, bar_rect.y-6)))
+        pygame.draw.rect(self.screen, (65,65,65), bar_rect, border_radius=4)
+        pygame.draw.rect(
+            self.screen, (255,255,255),
+            (bar_rect.x, bar_rect.y, int(bar_rect.width*progress), bar_rect.height),
+            border_radius=4
         )
+        return area
+
+    def run(self, loader:AssetLoader=None) -> str:
+        """Run instance
+
+        Args:
+            loader (AssetLoader, optional): Background loader to finish requests for
+                and show progress of while the menu is open. Defaults to None.
+
+        Returns:
+            str: Chosen option, 'play' or 'editor'
+        """
+        self.running = True
+        self.choice = 'play'
+        pygame.event.clear() # clear event queue
 
+        ui = UI(self.rect.size, [
+            Panel([Label("Game")], offset=(5,7)),
+            Panel([VStack([
+                ButtonWidget(
+                    text="Play", width=90, height=60,button_color =(65,65,65),
+                    text_size_factor=3, button_highlighted_color=(95,95,95),
+                    text_color=(255,255,255), button_border_radius=4,
+                    callback=self.kill
+                ),
+                ButtonWidget(
+                    text="Editor", width=90, height=35,
+                    button_color =(55,55,55),text_size_factor=2,
+                    button_highlighted_color=(95,95,95),
+                    text_color=(255,255,255), button_border_radius=7,
+                    callback=lambda: self.choose('editor')
+                ),
+            ], spacing=10)], anchor='bottomleft', offset=(25,-15)),
+            Panel([ButtonWidget(
+                width=25,height=25,
+                text="x",button_color= self.background_color,
+                button_highlighted_color=(255,0,0),
+                text_size_factor=2,text_color=(255,255,255),
+                callback=self.kill
+            )], anchor='topright'),
+        ], bus=self.bus)
+
+        # Background the UI and loading bar are redrawn over
         self.screen.fill(self.background_color)
+        background = self.screen.copy()
+        self.bus.clear()
 
-        while self.running:
-            
-            self.screen.blit(menu_title, (5,7))
-            exit_button.update(self.screen)
-            play_button.update(self.screen)
-            editor_button.update(self.screen)
+        shown_progress = None
 
-            for event in pygame.event.get():
+        while self.running:
+            for event in self.bus.poll():
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     sys.exit()
 
-            pygame.display.flip()
+            if ui.handle_window(self.screen.get_size()):
+                self.rect = self.screen.get_rect()
+                self.screen.fill(self.background_color)
+                background = self.screen.copy()
+                shown_progress = None # the loading bar was drawn over
+
+            dirty_rects = ui.draw_tree(self.screen, background)
+
+            if loader:
+                loader.process(time_budget=0.004)
+                if loader.progress != shown_progress:
+                    shown_progress = loader.progress
+                    dirty_rects.append(self.draw_progress(shown_progress, background))
+
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
             self.clock.tick(self.fps)
+
+        self.bus.clear()
+        return self.choice
@@ -1,36 +1,182 @@
 """Module for particle effects in pygame"""
-from random import uniform, randint
-from math import pi, cos, sin
-from pygame import Surface, sprite, draw, Vector2
+from itertools import repeat
+import numpy as np
+from pygame import Surface, draw, Color
 from pygame.locals import SRCALPHA
-from src.shapes import Circle
+from src.atlas import Atlas
+from src.profiler import profiler
 
 class Particles():
-    """Particle class for the use of particles in pygame"""
-    def __init__(self) -> None:
-        """Create new particle(s)."""
-        self.particles = []
-
-    def draw(self, position:tuple, screen:Surface):
-        """Draw particles
-        
-        General list structure for the particle data is:
-        [(x,y), (dx,dy), radius]
-
-        :param particles: 
-        :type particles: list
+    """Particle class for the use of particles in pygame.
+
+    Particle data lives in preallocated NumPy arrays with a fixed capacity:
+    positions `(x,y)`, velocities `(dx,dy)`, radius and remaining lifetime.
+    Live particles are always packed at the front of the arrays.
+    """
+    def __init__(self, capacity:int=50000,
+                 color:tuple=(255,255,255),
+                 radius_range:tuple=(3,9),
+                 spread:float=20,
+                 jitter:float=30,
+                 shrink_rate:float=1.2) -> None:
+        """Create new particle system.
+
+        :param capacity: `maximum live particles`, defaults to 50000
+        :type capacity: int, optional
+        :param color: `particle color`, defaults to (255,255,255)
+        :type color: tuple, optional
+        :param radius_range: `(min, max)` starting radius, defaults to (3,9)
+        :type radius_range: tuple, optional
+        :param spread: `max starting speed` in pixels per second, defaults to 20
+        :type spread: float, optional
+        :param jitter: `random acceleration` in pixels per second², defaults to 30
+        :type jitter: float, optional
+        :param shrink_rate: `radius lost` per second, defaults to 1.2
+        :type shrink_rate: float, optional
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.color = Color(color)
+        self.radius_range = radius_range
+        self.spread = spread
+        self.jitter = jitter
+        self.shrink_rate = shrink_rate
+
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocities = np.zeros((capacity, 2), dtype=np.float32)
+        self.radii = np.zeros(capacity, dtype=np.float32)
+        self.lifetimes = np.zeros(capacity, dtype=np.float32)
+
+        self.random = np.random.default_rng()
+
+        # Pre-drawn circle per integer radius, index 0 is never drawn
+        self.circle_sprites = [
+            get_circle_sprite(radius, self.color)
+            for radius in range(int(radius_range[1])+1)
+        ]
+
+        # Circles packed into one atlas, drawn by source rect per radius
+        self.atlas = Atlas.from_surfaces(dict(enumerate(self.circle_sprites)))
+        regions = [self.atlas.regions[radius] for radius in range(len(self.circle_sprites))]
+        self.circle_pages = np.array([page for page, _ in regions])
+        self.circle_areas = [area for _, area in regions]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def emit(self, position:tuple, amount:int=1, lifetime:float=None) -> None:
+        """Spawn particles at a position. Extra particles past capacity are dropped.
+
+        :param position: `(x,y)` spawn point
+        :type position: tuple
+        :param amount: `number of particles`, defaults to 1
+        :type amount: int, optional
+        :param lifetime: `seconds` to live, defaults to None (until shrunk away)
+        :type lifetime: float, optional
+        """
+        amount = min(amount, self.capacity-self.count)
+        if amount <= 0:
+            return
+
+        new = slice(self.count, self.count+amount)
+        self.positions[new] = position
+        self.velocities[new] = self.random.uniform(-self.spread, self.spread, (amount, 2))
+        self.radii[new] = self.random.integers(
+            self.radius_range[0], self.radius_range[1], amount, endpoint=True)
+        if lifetime is not None:
+            self.lifetimes[new] = lifetime
+        elif self.shrink_rate:
+            self.lifetimes[new] = self.radii[new]/self.shrink_rate
+        else:
+            self.lifetimes[new] = np.inf
+        self.count += amount
+
+    def update(self, deltatime:float) -> None:
+        """Move, shrink and age every live particle, then drop the dead ones
+
+        :param deltatime: used for smooth motion
+        :type deltatime: float
+        """
+        count = self.count
+        if not count:
+            return
+
+        positions = self.positions[:count]
+        velocities = self.velocities[:count]
+        radii = self.radii[:count]
+        lifetimes = self.lifetimes[:count]
+
+        velocities += self.random.uniform(
+            -self.jitter*deltatime, self.jitter*deltatime, (count, 2)).astype(np.float32)
+        positions += velocities*deltatime
+        radii -= self.shrink_rate*deltatime
+        lifetimes -= deltatime
+
+        alive = (radii >= 1) & (lifetimes > 0)
+        live_count = int(np.count_nonzero(alive))
+
+        if live_count != count:
+            positions[:live_count] = positions[alive]
+            velocities[:live_count] = velocities[alive]
+            radii[:live_count] = radii[alive]
+            lifetimes[:live_count] = lifetimes[alive]
+            self.count = live_count
+
+    def render(self, screen:Surface, offset:tuple=(0,0)) -> None:
+        """Blit every live particle, one `Surface.blits` call per atlas page
+
+        :param screen: `surface` to draw on
+        :type screen: Surface
+        :param offset: `(x,y)` subtracted from positions (camera), defaults to (0,0)
+        :type offset: tuple, optional
         """
-        self.particles.append([position, [randint(-2,2)/900, randint(-2,2)/900], randint(3, 9)])
-        for particle in self.particles:
-            particle[0][0] += particle[1][0]
-            particle[0][1] += particle[1][1]
-            particle[2] -= 0.02
-
-            particle[1][0] += randint(-1,1)/450
-            particle[1][1] += randint(-1,1)/450
-
-            draw.circle(
-                screen, (255, 255, 255,10),
-                [int(particle[0][0]),int(particle[0][1])],
-                int(particle[2])
-            )
\ No newline at end of file
+        count = self.count
+        profiler.count("particles", count)
+        if not count:
+            return
+
+        radii = self.radii[:count].astype(np.intp)
+        topleft = (self.positions[:count] - radii[:, None] - offset).astype(np.intp)
+
+        for index, page in enumerate(self.atlas.pages):
+            if len(self.atlas.pages) > 1: # only this page's radii
+                on_page = self.circle_pages[radii] == index
+                page_radii, page_topleft = radii[on_page], topleft[on_page]
+            else:
+                page_radii, page_topleft = radii, topleft
+
+            screen.blits(
+                zip(repeat(page), page_topleft.tolist(),
+                    map(self.circle_areas.__getitem__, page_radii.tolist())),
+                doreturn=False
+            )
+
+    def draw(self, position:tuple, screen:Surface, deltatime:float=1/60) -> None:
+        """Emit one particle at `position`, update and render the system
+
+        :param position: `(x,y)` spawn point
+        :type position: tuple
+        :param screen: `surface` to draw on
+        :type screen: Surface
+        :param deltatime: used for smooth motion, defaults to 1/60
+        :type deltatime: float, optional
+        """
+        self.emit(position)
+        self.update(deltatime)
+        self.render(screen)
+
+
+def get_circle_sprite(radius:int, color:Color) -> Surface:
+    """Draw a filled circle on its own surface
+
+    :param radius: `circle radius`
+    :type radius: int
+    :param color: `fill color`
+    :type color: Color
+    :return: `surface` of size `radius*2`
+    :rtype: Surface
+    """
+    surface = Surface((radius*2, radius*2), SRCALPHA)
+    if radius:
+        draw.circle(surface, color, (radius, radius), radius)
+    return surface
@@ -1,6 +1,17 @@
 """Python 3.12.1"""
-from pygame import sprite, Vector2, transform, image, Surface, key, quit
+from pygame import sprite, Vector2, Surface, key, quit
 from pygame.locals import *
+from src.animation import Animation, Animator, get_sheet, release_sheet
+from src.collisions import move_and_collide
+from src.inputs import UP, DOWN, LEFT, RIGHT, read_keyboard
+
+PLAYER_FRAMES = ['assets/images/player/player'+str(i)+'.png' for i in range(6)]
+
+PLAYER_ANIMATIONS = {
+    "idle": Animation([0], 1),
+    "move": Animation([0,1,2,3,4], 0.08),
+    "jump": Animation([5], 1),
+}
 
 class Player(sprite.Sprite):
     def __init__(self, *groups) -> None:
@@ -10,49 +21,48 @@ class Player(sprite.Sprite):
         self.touching_ground = False
         self.facing_left = False
 
-        # Build sprite list: #############################################################
-        # {Sprite Number: (Image, Rect)}
-        self.player_sprites = []
-        __surface_width = 0
-        __surface_height = 0
-
-        for i in range(6):
-            img = transform.scale_by(
-                image.load('assets/images/player/player'+str(i)+'.png').convert_alpha(),2)
-            self.player_sprites.append(img)
+        # Shared, pre-flipped frames and per-player playback state
+        self.sheet = get_sheet(PLAYER_FRAMES, scale_factor=2)
+        self.animator = Animator(self.sheet, PLAYER_ANIMATIONS)
+        self.player_sprites = self.sheet.frames
 
-            rect = img.get_rect()
-
-            if rect.width > __surface_width:
-                __surface_width = rect.width
-            if rect.height > __surface_height:
-                __surface_height = rect.height
-        ###################################################################################
-
-        self.image = Surface((__surface_width, __surface_height), SRCALPHA)
+        self.image = Surface(self.sheet.size, SRCALPHA)
         self.rect = self.image.get_frect()
         self.old_rect = None
 
         self.position = Vector2(0,0)
+        self.previous_position = Vector2(0,0)
         self.direction = Vector2()
         self.velocity = Vector2(0,20)
 
 
-    def input(self) -> None:
-        """Get keyboard input"""
-        keys = key.get_pressed()
+    def kill(self) -> None:
+        """Remove from every group and release the shared frames"""
+        super().kill()
+        if self.sheet is not None:
+            release_sheet(PLAYER_FRAMES, scale_factor=2)
+            self.sheet = None
+
+    def input(self, actions:int=None) -> None:
+        """Get input
 
-        if keys[K_ESCAPE]:
-            quit()
-            exit()
+        :param actions: action bits for this update (see `src/inputs.py`),
+            defaults to None (read the keyboard)
+        :type actions: int, optional
+        """
+        if actions is None:
+            pressed = key.get_pressed() # once per tick, shared with read_keyboard
+            if pressed[K_ESCAPE]:
+                quit()
+                exit()
+            actions = read_keyboard(pressed=pressed)
 
         # VERTICAL ################
-        if keys[K_w]:
+        if actions & UP:
             self.touching_ground = False
             self.direction.y = -1
-            self.sprite_number = 5
 
-        elif keys[K_s]:
+        elif actions & DOWN:
             self.direction.y = 1
 
         else:
@@ -60,11 +70,11 @@ class Player(sprite.Sprite):
         ###########################
 
         # HORIZONTAL ################
-        if keys[K_d]:
+        if actions & RIGHT:
             self.direction.x = 1
             self.facing_left = False
 
-        elif keys[K_a]:
+        elif actions & LEFT:
             self.direction.x = -1
             self.facing_left = True
 
@@ -72,66 +82,67 @@ class Player(sprite.Sprite):
             self.direction.x = 0
         #############################
 
-    def collision(self,axis:str,group:sprite.Group) -> None:
-        """Checks if player is colliding with sprite group
-
-        :param axis: axis to check `(x or y)`
-        :type axis: str
-        :param group: collideable sprite group
-        :type group: sprite.Group
-        """
-        collisions = sprite.spritecollide(self,group,False)
-        if collisions:
-            # Check x direction
-            if axis == "x":
-                for s in collisions:
-                    if self.rect.right >= s.rect.left and self.old_rect.right <= s.rect.left:
-                        self.rect.right = s.rect.left
-                        self.position.x = self.rect.x
-                    elif self.rect.left <= s.rect.right and self.old_rect.left >= s.rect.right:
-                        self.rect.left = s.rect.right
-                        self.position.x = self.rect.x
-
-            # Check y direction
-            if axis == "y":
-                for s in collisions:
-                    if self.rect.top <= s.rect.bottom and self.old_rect.top >= s.rect.bottom:
-                        self.rect.top = s.rect.bottom
-                        self.position.y = self.rect.y
-                    elif self.rect.bottom >= s.rect.top and self.old_rect.bottom <= s.rect.top:
-                        self.rect.bottom = s.rect.top
-                        self.position.y = self.rect.y
-                        self.touching_ground = True
-
-
-    def update(self, deltatime:float, group:sprite.Group) -> None:
+    def update(self, deltatime:float, group:sprite.Group, actions:int=None) -> None:
         """Rectangle update method 
 
         :param deltatime: used for smooth motion
         :type deltatime: float
+        :param group: `level` to collide with
+        :type group: sprite.Group
+        :param actions: action bits for this update (see `input`), defaults to None
+        :type actions: int, optional
         """
 
         if not self.touching_ground:
             self.velocity.y += 1
 
-        self.image = self.player_sprites[self.sprite_number]
-
-        if self.facing_left:
-            self.image = transform.flip(
-                self.player_sprites[self.sprite_number], self.facing_left, False)
-
         self.old_rect = self.rect.copy()
-        self.input()
+        self.previous_position.update(self.position)
+        self.input(actions)
 
         if self.direction.magnitude() != 0:
             self.direction = self.direction.normalize()
 
-        # Horizontal Collision
-        self.position.x += (self.direction.x*self.velocity.x*deltatime)
-        self.rect.x = self.position.x
-        self.collision("x", group)
+        # Continuous collision: sweep the whole step against the level
+        self.rect.topleft = self.position
+        contacts = move_and_collide(
+            self.rect,
+            (self.direction.x*self.velocity.x*deltatime,
+             self.direction.y*self.velocity.y*deltatime),
+            group
+        )
+        self.position.update(self.rect.topleft)
+
+        for contact in contacts:
+            if contact.normal[1] < 0:
+                self.touching_ground = True
+
+        self.animate(deltatime)
 
-        # Vertical Collision
-        self.position.y += (self.direction.y*self.velocity.y*deltatime)
-        self.rect.y = self.position.y
-        self.collision("y", group)
+    def animate(self, deltatime:float) -> None:
+        """Pick animation from movement and advance it
+
+        :param deltatime: used for frame timing
+        :type deltatime: float
+        """
+        if self.direction.y < 0:
+            self.animator.play("jump")
+        elif self.direction.x:
+            self.animator.play("move")
+        else:
+            self.animator.play("idle")
+
+        self.animator.flipped = self.facing_left
+        self.animator.update(deltatime)
+        self.sprite_number = self.animator.frame
+        self.image = self.animator.image
+
+    def interpolate(self, alpha:float) -> Vector2:
+        """Get render position between the last two updates
+
+        :param alpha: `blend factor` from previous (0) to current (1) position
+        :type alpha: float
+        :return: interpolated position
+        :rtype: Vector2
+        """
+        return self.previous_position.lerp(self.position, max(0.0, min(alpha, 1.0)))
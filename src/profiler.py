@@ -0,0 +1,251 @@
+"""Frame profiler: named scoped timers, counters and a timing overlay"""
+import csv
+import json
+import time
+from collections import deque
+from pygame import Surface
+from src.font import Font
+
+class Section:
+    """Context manager timing one named section into a profiler"""
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler:"Profiler", name:str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "Section":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.profiler.add_time(self.name, self.start, time.perf_counter())
+
+
+class Profiler:
+    """Collects per-frame section timings and counters over a rolling window.
+
+    Usage::
+
+        profiler.begin_frame()
+        with profiler.section("update"):
+            ...
+        profiler.count("particles", len(particles))
+        profiler.end_frame()
+    """
+    def __init__(self, window:int=120, enabled:bool=True, max_events:int=4096,
+                 max_names:int=256) -> None:
+        """Create new profiler
+
+        :param window: `frames` kept for averages and dumps, defaults to 120
+        :type window: int, optional
+        :param enabled: record anything at all, defaults to True
+        :type enabled: bool, optional
+        :param max_events: `timed spans` kept per frame for traces, oldest
+            dropped first, defaults to 4096
+        :type max_events: int, optional
+        :param max_names: `section and counter names` per frame, later new
+            names are ignored, defaults to 256
+        :type max_names: int, optional
+        """
+        self.enabled = enabled
+        self.frames:deque[dict] = deque(maxlen=window)
+        self.epoch = time.perf_counter()
+        self.max_events = max_events
+        self.max_names = max_names
+
+        self.frame_start = time.perf_counter()
+        self.times:dict[str, float] = {}
+        self.counts:dict[str, float] = {}
+        self.events:deque[tuple[str, float, float]] = deque(maxlen=max_events)
+
+    def begin_frame(self) -> None:
+        """Start collecting a new frame"""
+        self.frame_start = time.perf_counter()
+        self.times = {}
+        self.counts = {}
+        self.events = deque(maxlen=self.max_events)
+
+    def end_frame(self) -> None:
+        """Store the current frame in the rolling window and start the next
+        one, so a missing `begin_frame` never lets a frame grow forever"""
+        if not self.enabled:
+            return
+        end = time.perf_counter()
+        self.frames.append({
+            "start": self.frame_start,
+            "frame": (end-self.frame_start)*1000,
+            "times": self.times,
+            "counts": self.counts,
+            "events": self.events,
+        })
+        self.begin_frame()
+        self.frame_start = end
+
+    def section(self, name:str) -> Section:
+        """Get context manager timing a named section of the current frame
+
+        :param name: `section name`, repeated sections add up
+        :type name: str
+        :return: timer context manager
+        :rtype: Section
+        """
+        return Section(self, name)
+
+    def add_time(self, name:str, start:float, end:float) -> None:
+        """Record a timed span in the current frame
+
+        :param name: `section name`
+        :type name: str
+        :param start: `perf_counter()` at start
+        :type start: float
+        :param end: `perf_counter()` at end
+        :type end: float
+        """
+        if not self.enabled or (name not in self.times and len(self.times) >= self.max_names):
+            return
+        self.times[name] = self.times.get(name, 0.0) + (end-start)*1000
+        self.events.append((name, start, end))
+
+    def count(self, name:str, amount:float=1) -> None:
+        """Add to a named counter of the current frame
+
+        :param name: `counter name`
+        :type name: str
+        :param amount: `amount to add`, defaults to 1
+        :type amount: float, optional
+        """
+        if not self.enabled or (name not in self.counts and len(self.counts) >= self.max_names):
+            return
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def averages(self) -> tuple[dict[str, float], dict[str, float]]:
+        """Get mean section milliseconds and counts over the window
+
+        :return: `({section: ms}, {counter: count})`, frame time under "frame"
+        :rtype: tuple[dict[str, float], dict[str, float]]
+        """
+        times, counts = {}, {}
+        frames = len(self.frames)
+        if not frames:
+            return times, counts
+
+        for frame in self.frames:
+            times["frame"] = times.get("frame", 0.0) + frame["frame"]
+            for name, value in frame["times"].items():
+                times[name] = times.get(name, 0.0) + value
+            for name, value in frame["counts"].items():
+                counts[name] = counts.get(name, 0) + value
+
+        return ({name: value/frames for name, value in times.items()},
+                {name: value/frames for name, value in counts.items()})
+
+    def dump_csv(self, path:str) -> None:
+        """Write one row per frame with every section and counter as a column
+
+        :param path: output `filepath`
+        :type path: str
+        """
+        sections = sorted({name for frame in self.frames for name in frame["times"]})
+        counters = sorted({name for frame in self.frames for name in frame["counts"]})
+
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame_ms", *(f"{name}_ms" for name in sections), *counters])
+            for frame in self.frames:
+                writer.writerow([
+                    f"{frame['frame']:.4f}",
+                    *(f"{frame['times'].get(name, 0.0):.4f}" for name in sections),
+                    *(frame["counts"].get(name, 0) for name in counters)
+                ])
+
+    def dump_chrome_trace(self, path:str) -> None:
+        """Write the window as a Chrome trace (open in chrome://tracing or Perfetto)
+
+        :param path: output `filepath`
+        :type path: str
+        """
+        events = []
+        for frame in self.frames:
+            events.append({
+                "name": "frame", "ph": "X", "pid": 0, "tid": 0,
+                "ts": (frame["start"]-self.epoch)*1e6, "dur": frame["frame"]*1000,
+            })
+            for name, start, end in frame["events"]:
+                events.append({
+                    "name": name, "ph": "X", "pid": 0, "tid": 0,
+                    "ts": (start-self.epoch)*1e6, "dur": (end-start)*1e6,
+                })
+            for name, value in frame["counts"].items():
+                events.append({
+                    "name": name, "ph": "C", "pid": 0,
+                    "ts": (frame["start"]-self.epoch)*1e6, "args": {name: value},
+                })
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+class ProfilerOverlay:
+    """Draws a profiler's averages with the project's bitmap font"""
+    def __init__(self, profiler:"Profiler", size_factor:int=2,
+                 text_color:tuple=(255,255,255), refresh_frames:int=15) -> None:
+        """Create overlay
+
+        :param profiler: `profiler` to display
+        :type profiler: Profiler
+        :param size_factor: `text size multiplier`, defaults to 2
+        :type size_factor: int, optional
+        :param text_color: `text color`, defaults to (255,255,255)
+        :type text_color: tuple, optional
+        :param refresh_frames: `frames` between text refreshes, defaults to 15
+        :type refresh_frames: int, optional
+        """
+        self.profiler = profiler
+        self.size_factor = size_factor
+        self.text_color = text_color
+        self.refresh_frames = refresh_frames
+        self.font = Font()
+        self.lines:list[Surface] = []
+        self.frames_until_refresh = 0
+
+    def refresh(self) -> None:
+        """Re-render the overlay text from current averages"""
+        times, counts = self.profiler.averages()
+        text = [f"{name}: {value:.2f} ms" for name, value in times.items()]
+        text += [f"{name}: {value:.0f}" for name, value in counts.items()]
+        self.lines = [
+            self.font.render(self.printable(line), size_factor=self.size_factor,
+                             text_color=self.text_color)
+            for line in text
+        ]
+
+    def printable(self, text:str) -> str:
+        """Drop characters the bitmap font has no glyph for"""
+        return "".join(character for character in text
+                       if character == " " or character in self.font.characters)
+
+    def draw(self, surface:Surface, position:tuple=(5,5)) -> None:
+        """Draw overlay, refreshing its text every `refresh_frames` frames
+
+        :param surface: `surface` to draw on
+        :type surface: Surface
+        :param position: `(x,y)` of the first line, defaults to (5,5)
+        :type position: tuple, optional
+        """
+        if self.frames_until_refresh <= 0:
+            self.refresh()
+            self.frames_until_refresh = self.refresh_frames
+        self.frames_until_refresh -= 1
+
+        x, y = position
+        blit_list = []
+        for line in self.lines:
+            blit_list.append((line, (x, y)))
+            y += line.get_height() + 2*self.size_factor
+        surface.blits(blit_list, doreturn=False)
+
+
+# Default profiler the engine's modules report into
+profiler = Profiler()
@@ -1,53 +1,280 @@
 """Python 3.12.1"""
-from pygame import Vector2, draw, sprite, Color, Surface
+import numpy as np
+from pygame import Vector2, FRect, draw, sprite, Color, Surface
 from pygame.locals import *
 
-class Circle(sprite.Sprite):
-    """Simple circle shape class for pygame"""
-    def __init__(self,radius=1,color:tuple=(255,255,255),outline_width=0) -> None:
-        super().__init__()
-        self.image = Surface([radius*2,radius*2],SRCALPHA)
-        self.rect = self.image.get_frect()
-        self.position = Vector2(self.rect.topleft)
-        self.direction = Vector2(1,0)
-        self.speed = 400
-        self.color = Color(color[0],color[1],color[2])
-        self.radius = radius
-        self.outline_width = outline_width
-        # Draw circle on self.image
-        draw.circle(self.image, self.color, self.position, self.radius, self.outline_width)
+CIRCLE = 0
+RECTANGLE = 1
+
+# Shared shape images: {(kind, width, height, color, outline width): Surface}
+shape_images:dict[tuple, Surface] = {}
+
+def get_shape_image(kind:int, size:tuple, color:tuple, outline_width:int=0) -> Surface:
+    """Get shared image for a shape, drawing it on first use
+
+    :param kind: `CIRCLE` or `RECTANGLE`
+    :type kind: int
+    :param size: `(width, height)`
+    :type size: tuple
+    :param color: `fill color`
+    :type color: tuple
+    :param outline_width: circle line width, 0 fills, defaults to 0
+    :type outline_width: int, optional
+    :return: shared surface, do not draw on
+    :rtype: Surface
+    """
+    key = (kind, int(size[0]), int(size[1]), tuple(color), outline_width)
+    if key not in shape_images:
+        image = Surface(key[1:3], SRCALPHA)
+        if kind == CIRCLE:
+            radius = key[1]//2
+            draw.circle(image, color, (radius, radius), radius, outline_width)
+        else:
+            draw.rect(image, color, image.get_rect())
+        shape_images[key] = image
+    return shape_images[key]
+
+
+class ShapeStore:
+    """Structure-of-arrays storage for moving shapes.
+
+    Positions, directions, speeds, sizes and colors live in NumPy arrays, so
+    `update` moves every shape in one vectorized step and `draw` blits them
+    all in one `Surface.fblits` (or `Surface.blits`) call from shared
+    per-shape images.
+    """
+    def __init__(self, capacity:int=1024) -> None:
+        """Create store
+
+        :param capacity: `initial capacity`, grows as needed, defaults to 1024
+        :type capacity: int, optional
+        """
+        self.count = 0
+        self.positions = np.zeros((capacity, 2), dtype=np.float32)
+        self.directions = np.zeros((capacity, 2), dtype=np.float32)
+        self.speeds = np.zeros(capacity, dtype=np.float32)
+        self.sizes = np.zeros((capacity, 2), dtype=np.float32)
+        self.colors = np.zeros((capacity, 4), dtype=np.uint8)
+        self.kinds = np.zeros(capacity, dtype=np.uint8)
+        self.images:list[Surface] = []
+        self.views:list["Shape | None"] = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def grow(self, capacity:int) -> None:
+        """Resize arrays to hold at least `capacity` shapes"""
+        for name in ("positions", "directions", "speeds", "sizes", "colors", "kinds"):
+            array = getattr(self, name)
+            grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+
+    def add(self, kind:int, size:tuple, color:tuple=(255,255,255),
+            position:tuple=(0,0), direction:tuple=(1,0), speed:float=400,
+            outline_width:int=0) -> int:
+        """Add shape and get its index
+
+        :param kind: `CIRCLE` or `RECTANGLE`
+        :type kind: int
+        :param size: `(width, height)`
+        :type size: tuple
+        :param color: `fill color`, defaults to (255,255,255)
+        :type color: tuple, optional
+        :param position: `(x,y)` top-left, defaults to (0,0)
+        :type position: tuple, optional
+        :param direction: `(x,y)` direction of travel, defaults to (1,0)
+        :type direction: tuple, optional
+        :param speed: `pixels per second`, defaults to 400
+        :type speed: float, optional
+        :param outline_width: circle line width, 0 fills, defaults to 0
+        :type outline_width: int, optional
+        :return: `index` into the arrays, changes if another shape is removed
+        :rtype: int
+        """
+        if self.count == len(self.positions):
+            self.grow(max(len(self.positions)*2, 1))
+
+        index = self.count
+        color = Color(color)
+        self.positions[index] = position
+        self.directions[index] = direction
+        self.speeds[index] = speed
+        self.sizes[index] = size
+        self.colors[index] = tuple(color)
+        self.kinds[index] = kind
+        self.images.append(get_shape_image(kind, size, color, outline_width))
+        self.views.append(None)
+        self.count += 1
+        return index
+
+    def remove(self, index:int) -> None:
+        """Remove shape by moving the last shape into its slot
+
+        :param index: `shape index`
+        :type index: int
+        """
+        last = self.count-1
+        if index != last:
+            for array in (self.positions, self.directions, self.speeds,
+                          self.sizes, self.colors, self.kinds):
+                array[index] = array[last]
+            self.images[index] = self.images[last]
+            self.views[index] = self.views[last]
+            if self.views[index] is not None:
+                self.views[index].index = index
+
+        self.images.pop()
+        self.views.pop()
+        self.count = last
 
     def update(self, deltatime:float) -> None:
-        """Circle update method 
+        """Move every shape along its direction
 
         :param deltatime: used for smooth motion
         :type deltatime: float
         """
-        self.position += (self.direction*self.speed*deltatime)
-        #self.position.x -= self.radius
-        #self.position.y -= self.radius
-        self.rect.topleft = self.position.x, self.position.y
+        count = self.count
+        self.positions[:count] += (
+            self.directions[:count] * (self.speeds[:count]*deltatime)[:, None])
 
+    def draw(self, surface:Surface, offset:tuple=(0,0)) -> None:
+        """Blit every shape in one call
 
-class Rectangle(sprite.Sprite):
-    """Simple rectangle shape class for pygame"""
-    def __init__(self,dimensions:tuple=(10,10),
-                 color:tuple=(255,255,255)) -> None:
+        :param surface: `surface` to draw on
+        :type surface: Surface
+        :param offset: `(x,y)` subtracted from positions (camera), defaults to (0,0)
+        :type offset: tuple, optional
+        """
+        positions = (self.positions[:self.count] - offset).astype(np.intp).tolist()
+        if hasattr(surface, "fblits"): # pygame-ce fast path
+            surface.fblits(zip(self.images, positions))
+        else:
+            surface.blits(zip(self.images, positions), doreturn=False)
+
+
+# Default store used by Circle and Rectangle
+shapes = ShapeStore()
+
+
+class Shape(sprite.Sprite):
+    """Sprite view over one row of a `ShapeStore`.
+
+    The row is freed only by `destroy()` or `kill()`, so a shape can leave
+    its groups and be added to others while it keeps moving in the store.
+    Using the view after it was freed raises `RuntimeError`.
+
+    `position`, `direction`, `rect` and `center` return copies of the stored
+    values, so assign the whole value to change it: `shape.position += offset`
+    and `shape.center = (x, y)` work, `shape.position.x = 0` and
+    `shape.rect.center = (x, y)` only change the copy.
+    """
+    def __init__(self, kind:int, size:tuple, color:tuple, outline_width:int=0,
+                 store:ShapeStore=None) -> None:
         super().__init__()
-        self.image = Surface(dimensions,SRCALPHA)
-        self.rect = self.image.get_frect()
-        self.position = Vector2(self.rect.topleft)
-        self.direction = Vector2(1,0)
-        self.speed = 400
+        self.store = store if store is not None else shapes
         self.color = Color(color[0],color[1],color[2])
-        # Draw rectangle on self.image
-        draw.rect(self.image, self.color, self.rect)
+        self.index = self.store.add(kind, size, self.color, outline_width=outline_width)
+        self.store.views[self.index] = self
+
+    @property
+    def row(self) -> int:
+        """Index of this shape in the store's arrays
+
+        :raises RuntimeError: if the shape was destroyed
+        """
+        if self.index is None:
+            raise RuntimeError("shape was destroyed")
+        return self.index
+
+    @property
+    def image(self) -> Surface:
+        """Shared shape image"""
+        return self.store.images[self.row]
+
+    @property
+    def position(self) -> Vector2:
+        """Copy of the top-left position"""
+        return Vector2(self.store.positions[self.row].tolist())
+
+    @position.setter
+    def position(self, value:tuple) -> None:
+        self.store.positions[self.row] = tuple(value)
+
+    @property
+    def direction(self) -> Vector2:
+        """Copy of the direction of travel"""
+        return Vector2(self.store.directions[self.row].tolist())
+
+    @direction.setter
+    def direction(self, value:tuple) -> None:
+        self.store.directions[self.row] = tuple(value)
+
+    @property
+    def speed(self) -> float:
+        """Speed in pixels per second"""
+        return float(self.store.speeds[self.row])
+
+    @speed.setter
+    def speed(self, value:float) -> None:
+        self.store.speeds[self.row] = value
+
+    @property
+    def rect(self) -> FRect:
+        """Copy of the current bounds. Assigning a rect moves the shape to
+        its top-left, the shape's size does not change."""
+        return FRect(self.store.positions[self.row].tolist(),
+                     self.store.sizes[self.row].tolist())
+
+    @rect.setter
+    def rect(self, value:FRect) -> None:
+        self.store.positions[self.row] = FRect(value).topleft
+
+    @property
+    def center(self) -> tuple[float, float]:
+        """Center of the current bounds"""
+        return self.rect.center
+
+    @center.setter
+    def center(self, value:tuple) -> None:
+        row = self.row
+        self.store.positions[row] = (value[0]-self.store.sizes[row, 0]/2,
+                                     value[1]-self.store.sizes[row, 1]/2)
 
     def update(self, deltatime:float) -> None:
-        """Rectangle update method 
+        """Shape update method. Prefer `ShapeStore.update` for many shapes.
 
         :param deltatime: used for smooth motion
         :type deltatime: float
         """
-        self.position += (self.direction*self.speed*deltatime)
-        self.rect.topleft = self.position.x, self.position.y
+        store, row = self.store, self.row
+        store.positions[row] += store.directions[row]*store.speeds[row]*deltatime
+
+    def destroy(self) -> None:
+        """Free this shape's row in its store and leave every sprite group.
+        Calling it again does nothing."""
+        if self.index is None:
+            return
+        index, self.index = self.index, None
+        self.store.remove(index)
+        super().kill()
+
+    def kill(self) -> None:
+        """Leave every sprite group and free the row, see `destroy`"""
+        self.destroy()
+
+
+class Circle(Shape):
+    """Simple circle shape class for pygame"""
+    def __init__(self,radius=1,color:tuple=(255,255,255),outline_width=0,
+                 store:ShapeStore=None) -> None:
+        super().__init__(CIRCLE, (radius*2, radius*2), color, outline_width, store)
+        self.radius = radius
+        self.outline_width = outline_width
+
+
+class Rectangle(Shape):
+    """Simple rectangle shape class for pygame"""
+    def __init__(self,dimensions:tuple=(10,10),
+                 color:tuple=(255,255,255), store:ShapeStore=None) -> None:
+        super().__init__(RECTANGLE, dimensions, color, store=store)
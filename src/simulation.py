@@ -0,0 +1,224 @@
+"""Headless simulation: steps `Player` against a `Level` without a window
+
+Input comes from a script or an input recording (see `src/inputs.py`)
+instead of the keyboard. A script is a list of
+`(steps, keys)` segments, e.g. `[(120, "d"), (30, "dw"), (60, "")]` holds
+`d` for 120 steps, then `d` and `w` for 30, then nothing for 60. Script
+files hold one segment per line, `120 d`.
+
+    python -m src.simulation level.txt --steps 100000 --runs 8 --workers 4
+    python -m src.simulation level.txt --script input.txt --record input.rec
+    python -m src.simulation level.txt --replay input.rec
+
+Runs are independent, so many of them (e.g. random scripts for fuzzing
+physics) can be spread over a process pool. Throughput is reported in
+simulation steps per second.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pygame
+from src.inputs import ACTION_NAMES, InputRecorder, InputReplay, get_actions
+from src.level import Level
+from src.player import Player
+
+def iter_script(script:list[tuple[int, str]]):
+    """Yield the action bits of every step of a script"""
+    for steps, keys in script:
+        actions = get_actions(keys)
+        for _ in range(steps):
+            yield actions
+
+def read_script(path:str) -> list[tuple[int, str]]:
+    """Read script file, one `steps keys` segment per line
+
+    :param path: `filepath` of script
+    :type path: str
+    :return: script
+    :rtype: list[tuple[int, str]]
+    """
+    script = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            parts = line.split()
+            if parts and not parts[0].startswith("#"):
+                script.append((int(parts[0]), parts[1] if len(parts) > 1 else ""))
+    return script
+
+def random_script(seed:int, steps:int, hold:tuple=(5, 120)) -> list[tuple[int, str]]:
+    """Generate a random script, e.g. to fuzz physics
+
+    :param seed: `random seed`, the same seed gives the same script
+    :type seed: int
+    :param steps: `total steps`
+    :type steps: int
+    :param hold: `(min, max) steps` each key combination is held, defaults to (5, 120)
+    :type hold: tuple, optional
+    :return: script
+    :rtype: list[tuple[int, str]]
+    """
+    generator = random.Random(seed)
+    script = []
+    while steps > 0:
+        length = min(generator.randint(*hold), steps)
+        script.append((length, "".join(name for name in ACTION_NAMES if generator.random() < 0.3)))
+        steps -= length
+    return script
+
+
+def init_headless() -> None:
+    """Set up pygame without a window. Images still need a display surface
+    for `convert_alpha`, so a 1x1 one is made on the dummy video driver."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+# Levels loaded by this process: {level path: Level}
+levels:dict[str, Level] = {}
+
+def run_simulation(level_path:str, script:list[tuple[int, str]]=(), ticks:bytes=None,
+                   step:float=1/120, start:tuple=(100, 100), record:str=None) -> dict:
+    """Step a player through a script or recorded ticks as fast as possible
+
+    :param level_path: `filepath` of level, loaded once per process
+    :type level_path: str
+    :param script: input script, defaults to ()
+    :type script: list[tuple[int, str]], optional
+    :param ticks: action bits per step, e.g. `InputReplay.ticks`, used instead
+        of the script, defaults to None
+    :type ticks: bytes, optional
+    :param step: `physics step` in seconds, defaults to 1/120
+    :type step: float, optional
+    :param start: `(x,y)` player start, also used after falling out, defaults to (100, 100)
+    :type start: tuple, optional
+    :param record: `filepath` to record the run's input to, defaults to None
+    :type record: str, optional
+    :return: `steps`, `seconds`, `steps_per_second`, final `position`, `overlaps`
+        (steps ending inside a tile) and `fell_out` (times the player left the level)
+    :rtype: dict
+    """
+    init_headless()
+    if level_path not in levels:
+        levels[level_path] = Level(level_path)
+    level = levels[level_path]
+
+    player = Player()
+    player.position.update(start)
+    bottom = level.rect.bottom
+    steps = overlaps = fell_out = 0
+
+    inputs = ticks if ticks is not None else iter_script(script)
+    recorder = InputRecorder(record, step) if record else None
+
+    start_time = time.perf_counter()
+    for actions in inputs:
+        player.update(step, level, actions)
+        steps += 1
+        if recorder:
+            recorder.record(actions)
+
+        if level.query(player.rect):
+            overlaps += 1
+        if player.position.y > bottom:
+            fell_out += 1
+            player.position.update(start)
+    seconds = time.perf_counter()-start_time
+
+    if recorder:
+        recorder.close()
+
+    return {
+        "steps": steps,
+        "seconds": seconds,
+        "steps_per_second": steps/seconds if seconds else 0.0,
+        "position": (player.position.x, player.position.y),
+        "overlaps": overlaps,
+        "fell_out": fell_out,
+    }
+
+def run_job(job:dict) -> dict:
+    """Run one simulation from keyword arguments, for process pools"""
+    return run_simulation(**job)
+
+def run_batch(jobs:list[dict], workers:int=None) -> dict:
+    """Run simulations in parallel over a process pool
+
+    :param jobs: keyword arguments of `run_simulation`, one dict per run
+    :type jobs: list[dict]
+    :param workers: `processes`, defaults to None (one per CPU)
+    :type workers: int, optional
+    :return: `runs` (per-run results in job order), total `steps`, wall-clock
+        `seconds` and overall `steps_per_second`
+    :rtype: dict
+    """
+    start_time = time.perf_counter()
+    with ProcessPoolExecutor(workers, initializer=init_headless) as executor:
+        runs = list(executor.map(run_job, jobs))
+    seconds = time.perf_counter()-start_time
+
+    steps = sum(run["steps"] for run in runs)
+    return {
+        "runs": runs,
+        "steps": steps,
+        "seconds": seconds,
+        "steps_per_second": steps/seconds if seconds else 0.0,
+    }
+
+
+def main() -> int:
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument("level", help="level file to simulate in")
+    parser.add_argument("--script", help="script file, defaults to random scripts")
+    parser.add_argument("--replay", help="input recording to run instead of a script")
+    parser.add_argument("--record", help="record the input of a single run here")
+    parser.add_argument("--steps", type=int, default=10000, help="steps per random script")
+    parser.add_argument("--runs", type=int, default=1, help="simulations to run")
+    parser.add_argument("--workers", type=int, help="processes, defaults to one per CPU")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first random script")
+    parser.add_argument("-o", "--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    if args.replay:
+        replay = InputReplay(args.replay)
+        jobs = [{"level_path": args.level, "ticks": replay.ticks, "step": replay.step}
+                for _ in range(args.runs)]
+    else:
+        jobs = [{
+            "level_path": args.level,
+            "script": read_script(args.script) if args.script
+                      else random_script(args.seed+run, args.steps),
+        } for run in range(args.runs)]
+
+    if args.record:
+        if args.runs != 1:
+            parser.error("--record needs a single run")
+        jobs[0]["record"] = args.record
+
+    if args.runs == 1:
+        run = run_simulation(**jobs[0])
+        results = {**run, "runs": [run]}
+    else:
+        results = run_batch(jobs, args.workers)
+
+    for index, run in enumerate(results["runs"]):
+        print(f"run {index}: {run['steps']} steps, {run['steps_per_second']:.0f} steps/s, "
+              f"{run['overlaps']} overlaps, fell out {run['fell_out']} times, "
+              f"ended at {run['position']}")
+    print(f"total: {results['steps']} steps in {results['seconds']:.2f} s, "
+          f"{results['steps_per_second']:.0f} steps/s")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
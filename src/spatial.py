@@ -0,0 +1,76 @@
+"""Uniform-grid spatial index for sprites"""
+from math import floor
+from pygame import Rect, sprite
+
+class SpatialGrid:
+    """Spatial hash that buckets sprites into fixed-size square cells.
+
+    Lookups only visit the cells a rect overlaps, so query cost depends on
+    the size of the rect, not on how many sprites are stored.
+    """
+    def __init__(self, cell_size:int=36) -> None:
+        self.cell_size = cell_size
+        self.cells:dict[tuple[int, int], list[sprite.Sprite]] = {}
+
+    def cell_range(self, rect:Rect) -> tuple[range, range]:
+        """Get column and row ranges covered by a rect
+
+        :param rect: `area` to cover
+        :type rect: Rect
+        :return: `(columns, rows)`
+        :rtype: tuple[range, range]
+        """
+        size = self.cell_size
+        columns = range(floor(rect.left/size), floor(rect.right/size)+1)
+        rows = range(floor(rect.top/size), floor(rect.bottom/size)+1)
+        return columns, rows
+
+    def insert(self, item:sprite.Sprite) -> None:
+        """Add sprite to every cell its rect touches
+
+        :param item: sprite with a `rect`
+        :type item: sprite.Sprite
+        """
+        columns, rows = self.cell_range(item.rect)
+        for row in rows:
+            for column in columns:
+                self.cells.setdefault((column, row), []).append(item)
+
+    def remove(self, item:sprite.Sprite, rect:Rect=None) -> None:
+        """Remove sprite from the cells its rect touches
+
+        :param item: sprite previously inserted
+        :type item: sprite.Sprite
+        :param rect: `rect` it was inserted with, if it moved since, defaults to None
+        :type rect: Rect, optional
+        """
+        columns, rows = self.cell_range(rect or item.rect)
+        for row in rows:
+            for column in columns:
+                cell = self.cells.get((column, row))
+                if cell and item in cell:
+                    cell.remove(item)
+                    if not cell:
+                        del self.cells[(column, row)]
+
+    def query(self, rect:Rect) -> list[sprite.Sprite]:
+        """Get sprites whose rect overlaps `rect`
+
+        :param rect: `area` to search
+        :type rect: Rect
+        :return: overlapping sprites, each listed once
+        :rtype: list[sprite.Sprite]
+        """
+        # Keyed by sprite for constant-time dedupe, in first-seen order
+        found:dict[sprite.Sprite, None] = {}
+        columns, rows = self.cell_range(rect)
+        for row in rows:
+            for column in columns:
+                for item in self.cells.get((column, row), ()):
+                    if item not in found and rect.colliderect(item.rect):
+                        found[item] = None
+        return list(found)
+
+    def clear(self) -> None:
+        """Remove every sprite"""
+        self.cells.clear()
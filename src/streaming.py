@@ -0,0 +1,233 @@
+"""Streaming world: regions load and unload around the camera
+
+A streamed world is a directory holding `world.json` and one binary level
+file per non-empty region (see `src/tilemap.py`). Regions can also come from
+a generator function for procedural worlds.
+"""
+import json
+import logging
+import os
+import sys
+from collections import OrderedDict
+from concurrent.futures import Future
+from math import floor
+from pygame import Rect, Surface, sprite
+from src.camera import Camera
+from src.level import Level, Tile
+from src.loader import AssetLoader
+from src.tilemap import TileMap, load_tilemap, read_level, write_level
+
+MANIFEST = "world.json"
+
+logger = logging.getLogger(__name__)
+
+def get_region_path(directory:str, region_x:int, region_y:int) -> str:
+    """Get filepath of a region's level file"""
+    return os.path.join(directory, f"{region_x}_{region_y}.lvl")
+
+def split_level(tilemap:TileMap, directory:str, region_size:int=64) -> int:
+    """Split a tile map into region files for streaming
+
+    :param tilemap: `tile map` to split
+    :type tilemap: TileMap
+    :param directory: output `directory`, created if missing
+    :type directory: str
+    :param region_size: `tiles per region side`, defaults to 64
+    :type region_size: int, optional
+    :return: `regions written`, empty regions are skipped
+    :rtype: int
+    """
+    os.makedirs(directory, exist_ok=True)
+    size = tilemap.tile_size
+    regions = []
+
+    # Regions are aligned to the world grid, not to the map's origin
+    first_column = floor(tilemap.origin[0]/size)
+    first_row = floor(tilemap.origin[1]/size)
+
+    for region_y in range(floor(first_row/region_size),
+                          floor((first_row+tilemap.height-1)/region_size)+1):
+        for region_x in range(floor(first_column/region_size),
+                              floor((first_column+tilemap.width-1)/region_size)+1):
+            top = region_y*region_size - first_row
+            left = region_x*region_size - first_column
+            tiles = tilemap.tiles[max(top, 0):max(top+region_size, 0),
+                                  max(left, 0):max(left+region_size, 0)]
+            if not tiles.any():
+                continue
+
+            origin = ((first_column+max(left, 0))*size, (first_row+max(top, 0))*size)
+            write_level(get_region_path(directory, region_x, region_y),
+                        TileMap(tiles.copy(), size, origin))
+            regions.append([region_x, region_y])
+
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump({"tile_size": size, "region_size": region_size, "regions": regions}, file)
+    return len(regions)
+
+
+class StreamingLevel:
+    """World made of regions, each loaded as its own `Level` on demand.
+
+    Call `update(camera)` once per frame: regions within `radius` of the
+    camera are requested from a background worker, finished loads become
+    `Level`s on the main thread, and regions beyond `max_regions` are evicted
+    least recently used first. `query` and `render` only see loaded regions,
+    so it can be used anywhere a `Level` is used for collision and drawing.
+    """
+    def __init__(self, directory:str=None, generator=None, radius:int=1,
+                 max_regions:int=16, region_size:int=64, tile_size:int=36,
+                 loader:AssetLoader=None) -> None:
+        """Create streaming level
+
+        :param directory: `world directory` written by `split_level`, defaults to None
+        :type directory: str, optional
+        :param generator: `generator(region_x, region_y) -> TileMap | None` used
+            instead of a directory, runs on the worker thread, defaults to None
+        :param radius: `regions` around the camera's to keep loaded, defaults to 1
+        :type radius: int, optional
+        :param max_regions: `loaded regions` kept before evicting, defaults to 16
+        :type max_regions: int, optional
+        :param region_size: `tiles per region side` for generators, defaults to 64
+        :type region_size: int, optional
+        :param tile_size: `tile side` for generators, defaults to 36
+        :type tile_size: int, optional
+        :param loader: `background loader`, defaults to a new single-worker loader
+        :type loader: AssetLoader, optional
+        """
+        self.directory = directory
+        self.generator = generator
+        self.radius = radius
+        self.max_regions = max_regions
+        self.loader = loader or AssetLoader(max_workers=1)
+        self.available = None
+
+        if directory:
+            with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+                manifest = json.load(file)
+            region_size = manifest["region_size"]
+            tile_size = manifest["tile_size"]
+            self.available = {tuple(region) for region in manifest["regions"]}
+
+        self.region_size = region_size
+        self.tile_size = tile_size
+        self.region_pixels = region_size*tile_size
+
+        # {(region x, region y): Level | None}, None for loaded empty regions
+        self.regions:OrderedDict[tuple[int, int], Level | None] = OrderedDict()
+        self.requested:set[tuple[int, int]] = set()
+
+    def region_range(self, rect:Rect) -> tuple[range, range]:
+        """Get region column and row ranges covered by a rect"""
+        size = self.region_pixels
+        return (range(floor(rect.left/size), floor(rect.right/size)+1),
+                range(floor(rect.top/size), floor(rect.bottom/size)+1))
+
+    def load_region(self, region:tuple[int, int]) -> TileMap | None:
+        """Read or generate one region's tile map. Runs on the worker thread."""
+        if self.generator:
+            return self.generator(*region)
+        if region not in self.available:
+            return None
+        return read_level(get_region_path(self.directory, *region), memory_map=False)
+
+    def request(self, region:tuple[int, int]) -> None:
+        """Queue region for background loading if it is not loaded or queued.
+        A region that fails to load or build is logged and requested again
+        the next time it is wanted."""
+        if region in self.regions or region in self.requested:
+            return
+        self.requested.add(region)
+
+        def finish(tilemap:TileMap | None) -> None:
+            self.regions[region] = Level(tilemap) if tilemap is not None else None
+
+        def done(future:Future) -> None:
+            self.requested.discard(region)
+            if future.exception() is not None:
+                logger.error("failed to load region %s", region, exc_info=future.exception())
+
+        future = self.loader.submit(lambda: self.load_region(region), finish)
+        future.add_done_callback(done)
+
+    def update(self, camera:Camera, time_budget:float=0.004) -> None:
+        """Stream regions around the camera
+
+        :param camera: `camera` to stream around
+        :type camera: Camera
+        :param time_budget: `seconds` to spend building finished regions, defaults to 0.004
+        :type time_budget: float, optional
+        """
+        center_x = floor(camera.rect.centerx/self.region_pixels)
+        center_y = floor(camera.rect.centery/self.region_pixels)
+        wanted = set()
+
+        # Visible regions first, then the rest of the radius
+        visible_columns, visible_rows = self.region_range(camera.rect)
+        for region_y in visible_rows:
+            for region_x in visible_columns:
+                wanted.add((region_x, region_y))
+                self.request((region_x, region_y))
+
+        for region_y in range(center_y-self.radius, center_y+self.radius+1):
+            for region_x in range(center_x-self.radius, center_x+self.radius+1):
+                wanted.add((region_x, region_y))
+                self.request((region_x, region_y))
+
+        self.loader.process(time_budget)
+
+        for region in wanted:
+            if region in self.regions:
+                self.regions.move_to_end(region)
+
+        # Evict least recently wanted regions over budget, never wanted ones
+        for region in list(self.regions):
+            if len(self.regions) <= self.max_regions:
+                break
+            if region not in wanted:
+                level = self.regions.pop(region)
+                if level is not None:
+                    level.release()
+
+    def loaded_levels(self, rect:Rect) -> list[Level]:
+        """Get loaded region levels overlapping a rect"""
+        columns, rows = self.region_range(rect)
+        levels = []
+        for region_y in rows:
+            for region_x in columns:
+                level = self.regions.get((region_x, region_y))
+                if level is not None:
+                    levels.append(level)
+        return levels
+
+    def query(self, rect:Rect) -> list[Tile | sprite.Sprite]:
+        """Get tiles overlapping a rect in loaded regions
+
+        :param rect: `area` to search
+        :type rect: Rect
+        :return: overlapping tiles, see `Level.query`
+        :rtype: list[Tile | sprite.Sprite]
+        """
+        found = []
+        for level in self.loaded_levels(rect):
+            found += level.query(rect)
+        return found
+
+    def render(self, surface:Surface, camera:Camera) -> None:
+        """Draw loaded regions visible to the camera
+
+        :param surface: `surface` to draw on, usually the screen
+        :type surface: Surface
+        :param camera: `camera` whose view is drawn
+        :type camera: Camera
+        """
+        for level in self.loaded_levels(camera.rect):
+            level.render(surface, camera)
+
+
+if __name__ == "__main__":
+    # python -m src.streaming level.txt world/ 64
+    if len(sys.argv) not in (3, 4):
+        sys.exit("usage: python -m src.streaming <level> <world directory> [region size]")
+    split_level(load_tilemap(sys.argv[1]), sys.argv[2],
+                int(sys.argv[3]) if len(sys.argv) == 4 else 64)
@@ -0,0 +1,195 @@
+"""Tile map formats: the text `level.txt` format and a compact binary format
+
+Binary layout (little endian):
+    header: magic `LVL1`, uint16 version, uint16 tile size,
+            uint32 width, uint32 height, int32 origin x, int32 origin y
+    body:   `height*width` uint8 tile codes, row major, 0 for empty cells
+
+Tile codes are the ASCII codes of the map characters (`D`, `G`, ...), so a
+binary level and its text source describe the same tiles.
+"""
+import struct
+import sys
+import numpy as np
+
+MAGIC = b"LVL1"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIii")
+EMPTY = 0
+
+# Characters that are tiles in the text format, everything else is empty
+TILE_CHARACTERS = "DGFH"
+
+
+class TileMap:
+    """Grid of tile codes with its placement in world space"""
+    def __init__(self, tiles:np.ndarray, tile_size:int=36, origin:tuple=(0,0)) -> None:
+        """Create tile map
+
+        :param tiles: `uint8 array` of shape (rows, columns)
+        :type tiles: np.ndarray
+        :param tile_size: `tile side` in pixels, defaults to 36
+        :type tile_size: int, optional
+        :param origin: `world position` of cell (0,0), defaults to (0,0)
+        :type origin: tuple, optional
+        """
+        self.tiles = tiles
+        self.tile_size = tile_size
+        self.origin = (int(origin[0]), int(origin[1]))
+
+    @property
+    def height(self) -> int:
+        """Number of rows"""
+        return self.tiles.shape[0]
+
+    @property
+    def width(self) -> int:
+        """Number of columns"""
+        return self.tiles.shape[1]
+
+
+def read_text_level(path:str, tile_size:int=36) -> TileMap:
+    """Read the text level format.
+    Cell (row, column) is character `column` of line `row`, placed one tile
+    up and left of the world origin so the surrounding `[`, quotes and commas
+    of the file land outside the map.
+
+    :param path: `filepath` of text level
+    :type path: str
+    :param tile_size: `tile side` in pixels, defaults to 36
+    :type tile_size: int, optional
+    :return: tile map
+    :rtype: TileMap
+    """
+    with open(path, encoding="utf-8") as file:
+        rows = file.read().split("\n")
+
+    width = max((len(row) for row in rows), default=0)
+    text = np.frombuffer(
+        "".join(row.ljust(width) for row in rows).encode("ascii", "replace"),
+        dtype=np.uint8
+    ).reshape(len(rows), width)
+
+    tiles = np.where(np.isin(text, np.frombuffer(TILE_CHARACTERS.encode(), np.uint8)), text, EMPTY)
+    return TileMap(tiles.astype(np.uint8), tile_size, (-tile_size, -tile_size))
+
+def write_text_level(path:str, tilemap:TileMap) -> None:
+    """Write tile map in the text level format, the inverse of `read_text_level`.
+    The first and last lines hold the `[` and `]` of the file and every line
+    between is a quoted row padded to the map's width, so reading it back
+    gives the same grid size.
+
+    :param path: output `filepath`
+    :type path: str
+    :param tilemap: tile map to write
+    :type tilemap: TileMap
+    :raises ValueError: if tiles lie outside the quotes of the rows
+    """
+    size = tilemap.tile_size
+    top = tilemap.origin[1]//size + 1 # line of grid row 0
+    left = tilemap.origin[0]//size + 1 # character of grid column 0
+    lines = max(top+tilemap.height, 2)
+    width = max(left+tilemap.width, 3)
+
+    # Quoted characters of a line are 1 to width-3, the rest is `"` `",`
+    rows, columns = np.nonzero(tilemap.tiles)
+    if len(rows) and (top+rows.min() < 1 or top+rows.max() > lines-2
+                      or left+columns.min() < 1 or left+columns.max() > width-3):
+        raise ValueError("tiles outside the quoted rows can not be written as text")
+
+    text = np.full((lines, width), ord(" "), dtype=np.uint8)
+    text[top+rows, left+columns] = tilemap.tiles[rows, columns]
+
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("[\n")
+        for row in text[1:-1, 1:width-2]:
+            file.write(f'"{row.tobytes().decode("ascii")}",\n')
+        file.write("]")
+
+def write_level(path:str, tilemap:TileMap) -> None:
+    """Write tile map in the binary level format
+
+    :param path: output `filepath`
+    :type path: str
+    :param tilemap: tile map to write
+    :type tilemap: TileMap
+    """
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(
+            MAGIC, VERSION, tilemap.tile_size,
+            tilemap.width, tilemap.height,
+            tilemap.origin[0], tilemap.origin[1]
+        ))
+        file.write(np.ascontiguousarray(tilemap.tiles, dtype=np.uint8).tobytes())
+
+def read_level(path:str, memory_map:bool=True) -> TileMap:
+    """Read binary level. With `memory_map` the tile array is paged in from
+    disk on access instead of read up front.
+
+    :param path: `filepath` of binary level
+    :type path: str
+    :param memory_map: map the file instead of reading it, defaults to True
+    :type memory_map: bool, optional
+    :raises ValueError: if the file is not a binary level
+    :return: tile map
+    :rtype: TileMap
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+
+    if len(header) < HEADER.size or header[:4] != MAGIC:
+        raise ValueError(f"{path} is not a binary level")
+
+    _, version, tile_size, width, height, origin_x, origin_y = HEADER.unpack(header)
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported level version {version}")
+
+    if memory_map and width and height:
+        tiles = np.memmap(path, np.uint8, "r", HEADER.size, (height, width))
+    else:
+        tiles = np.fromfile(path, np.uint8, width*height, offset=HEADER.size)
+        tiles = tiles.reshape(height, width)
+
+    return TileMap(tiles, tile_size, (origin_x, origin_y))
+
+def is_binary_level(path:str) -> bool:
+    """Check if file starts with the binary level magic"""
+    with open(path, "rb") as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+def load_tilemap(path:str, tile_size:int=36) -> TileMap:
+    """Load either level format, detected from the file's first bytes
+
+    :param path: `filepath` of text or binary level
+    :type path: str
+    :param tile_size: `tile side` for text levels, defaults to 36
+    :type tile_size: int, optional
+    :return: tile map
+    :rtype: TileMap
+    """
+    if is_binary_level(path):
+        return read_level(path)
+    return read_text_level(path, tile_size)
+
+def compile_level(text_path:str, binary_path:str, tile_size:int=36) -> TileMap:
+    """Convert text level to the binary format
+
+    :param text_path: `filepath` of text level
+    :type text_path: str
+    :param binary_path: output `filepath`
+    :type binary_path: str
+    :param tile_size: `tile side` in pixels, defaults to 36
+    :type tile_size: int, optional
+    :return: converted tile map
+    :rtype: TileMap
+    """
+    tilemap = read_text_level(text_path, tile_size)
+    write_level(binary_path, tilemap)
+    return tilemap
+
+
+if __name__ == "__main__":
+    # python -m src.tilemap level.txt level.lvl
+    if len(sys.argv) != 3:
+        sys.exit("usage: python -m src.tilemap <level.txt> <level.lvl>")
+    compile_level(sys.argv[1], sys.argv[2])
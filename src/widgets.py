@@ -0,0 +1,468 @@
+"""Retained UI: widget tree with cached layout and cached subtree surfaces"""
+import pygame
+from src.button import Button
+from src.events import EventBus
+from src.font import Font
+from src.profiler import profiler
+
+
+class Widget:
+    """Node of a widget tree.
+
+    Sizes are measured and rects arranged once, then kept until
+    `invalidate_layout` (e.g. after a text change or resize). Every widget
+    renders its subtree to a cached surface, so after `invalidate` only the
+    widget and its ancestors are composed again, and an unchanged tree costs
+    nothing to draw. Rects are in screen space.
+    """
+    def __init__(self, children:list["Widget"]=None, size:tuple=(0,0)) -> None:
+        """Create widget
+
+        Args:
+            children (list[Widget], optional): Child widgets. Defaults to None.
+            size (tuple, optional): Preferred (width, height). Defaults to (0,0).
+        """
+        self.parent:Widget = None
+        self.children:list[Widget] = []
+        self.size = tuple(size)
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+        self.measured:tuple = None # cached preferred size
+        self.surface:pygame.Surface = None # cached render of the subtree
+        self.dirty = True
+
+        for child in children or ():
+            self.add(child)
+
+    def add(self, child:"Widget") -> "Widget":
+        """Append child widget
+
+        Args:
+            child (Widget): Widget to add.
+
+        Returns:
+            Widget: The added child
+        """
+        child.parent = self
+        self.children.append(child)
+        self.invalidate_layout()
+        return child
+
+    def remove(self, child:"Widget") -> None:
+        """Remove child widget"""
+        self.children.remove(child)
+        child.parent = None
+        self.invalidate_layout()
+
+    def walk(self):
+        """Yield this widget and every descendant, parents first"""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    @property
+    def root(self) -> "Widget":
+        """Topmost ancestor"""
+        widget = self
+        while widget.parent:
+            widget = widget.parent
+        return widget
+
+    # Layout ############################################################################
+    def measure(self) -> tuple[int, int]:
+        """Get preferred (width, height), cached until the layout is invalidated"""
+        if self.measured is None:
+            self.measured = self.get_size()
+        return self.measured
+
+    def get_size(self) -> tuple[int, int]:
+        """Work out the preferred size. Containers size themselves from children."""
+        return self.size
+
+    def arrange(self, rect:pygame.Rect) -> None:
+        """Place widget and lay out its children inside `rect`
+
+        Args:
+            rect (pygame.Rect): Area given by the parent.
+        """
+        self.rect = pygame.Rect(rect)
+        for child in self.children:
+            child.arrange(pygame.Rect(self.rect.topleft, child.measure()))
+        self.dirty = True
+
+    def invalidate_layout(self) -> None:
+        """Drop cached sizes up to the root, which lays out again on next draw"""
+        widget = self
+        while widget:
+            widget.measured = None
+            widget = widget.parent
+        self.root.layout_changed()
+
+    def layout_changed(self) -> None:
+        """Called on the root when any layout in the tree is invalidated"""
+
+    # Rendering #########################################################################
+    def invalidate(self) -> None:
+        """Mark widget for redrawing, its ancestors compose it in again"""
+        widget = self
+        while widget and not widget.dirty:
+            widget.dirty = True
+            widget = widget.parent
+        self.root.mark_dirty(self.rect)
+
+    def mark_dirty(self, rect:pygame.Rect) -> None:
+        """Called on the root with the screen area of an invalidated widget"""
+
+    def draw(self, surface:pygame.Surface) -> None:
+        """Draw the widget's own visuals, children are drawn over it
+
+        Args:
+            surface (pygame.Surface): Surface the size of the widget.
+        """
+
+    def render(self) -> pygame.Surface:
+        """Get cached render of the subtree, drawing it again if dirty"""
+        if self.dirty or self.surface is None:
+            if self.surface is None or self.surface.get_size() != self.rect.size:
+                self.surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+            else:
+                self.surface.fill((0,0,0,0))
+
+            self.draw(self.surface)
+            self.surface.blits([
+                (child.render(), (child.rect.x-self.rect.x, child.rect.y-self.rect.y))
+                for child in self.children
+            ], doreturn=False)
+            self.dirty = False
+            profiler.count("widgets rendered")
+        return self.surface
+
+
+class Stack(Widget):
+    """Lays children out in a row or column"""
+    def __init__(self, children:list[Widget]=None, vertical:bool=True, spacing:int=5,
+                 padding:int=0, align:str='start', color:tuple=None,
+                 border_radius:int=0) -> None:
+        """Create stack
+
+        Args:
+            children (list[Widget], optional): Child widgets. Defaults to None.
+            vertical (bool, optional): Column instead of row. Defaults to True.
+            spacing (int, optional): Gap between children. Defaults to 5.
+            padding (int, optional): Gap around the children. Defaults to 0.
+            align (str, optional): Cross-axis placement, 'start', 'center' or
+                'end'. Defaults to 'start'.
+            color (tuple, optional): Background color. Defaults to None.
+            border_radius (int, optional): Background corner radius. Defaults to 0.
+        """
+        self.vertical = vertical
+        self.spacing = spacing
+        self.padding = padding
+        self.align = align
+        self.color = color
+        self.border_radius = border_radius
+        super().__init__(children)
+
+    @property
+    def axes(self) -> tuple[int, int]:
+        """Size indices of the (main, cross) axes"""
+        return (1, 0) if self.vertical else (0, 1)
+
+    def get_size(self) -> tuple[int, int]:
+        main_axis, cross_axis = self.axes
+        sizes = [child.measure() for child in self.children]
+        main = sum(size[main_axis] for size in sizes)
+        main += self.spacing*max(len(sizes)-1, 0)
+        cross = max((size[cross_axis] for size in sizes), default=0)
+        main, cross = main+self.padding*2, cross+self.padding*2
+        return (cross, main) if self.vertical else (main, cross)
+
+    def arrange(self, rect:pygame.Rect) -> None:
+        self.rect = pygame.Rect(rect)
+        main_axis, cross_axis = self.axes
+        position = self.padding
+        cross_space = self.rect.size[cross_axis] - self.padding*2
+
+        for child in self.children:
+            size = child.measure()
+            cross = self.padding + {
+                'start': 0,
+                'center': (cross_space-size[cross_axis])//2,
+                'end': cross_space-size[cross_axis],
+            }[self.align]
+            offset = (cross, position) if self.vertical else (position, cross)
+            child.arrange(pygame.Rect(
+                (self.rect.x+offset[0], self.rect.y+offset[1]), size))
+            position += size[main_axis] + self.spacing
+        self.dirty = True
+
+    def draw(self, surface:pygame.Surface) -> None:
+        if self.color:
+            pygame.draw.rect(surface, self.color, surface.get_rect(),
+                             border_radius=self.border_radius)
+
+
+class VStack(Stack):
+    """Column of widgets"""
+    def __init__(self, children:list[Widget]=None, **options) -> None:
+        super().__init__(children, vertical=True, **options)
+
+
+class HStack(Stack):
+    """Row of widgets"""
+    def __init__(self, children:list[Widget]=None, **options) -> None:
+        super().__init__(children, vertical=False, **options)
+
+
+class Panel(Widget):
+    """Widget anchored to a point of its parent, e.g. a screen corner"""
+    def __init__(self, children:list[Widget]=None, anchor:str='topleft',
+                 offset:tuple=(0,0), size:tuple=None, padding:int=0,
+                 color:tuple=None, border_radius:int=0) -> None:
+        """Create panel
+
+        Args:
+            children (list[Widget], optional): Child widgets, laid over each other
+                at the panel's top-left. Defaults to None.
+            anchor (str, optional): Rect attribute of the panel pinned to the same
+                point of the parent, e.g. 'bottomright'. Defaults to 'topleft'.
+            offset (tuple, optional): (x, y) moved from the anchor. Defaults to (0,0).
+            size (tuple, optional): Fixed (width, height), a negative value is
+                that much less than the parent. Defaults to None (fit children).
+            padding (int, optional): Gap around the children. Defaults to 0.
+            color (tuple, optional): Background color. Defaults to None.
+            border_radius (int, optional): Background corner radius. Defaults to 0.
+        """
+        self.anchor = anchor
+        self.offset = offset
+        self.fixed_size = size
+        self.padding = padding
+        self.color = color
+        self.border_radius = border_radius
+        super().__init__(children)
+
+    def get_size(self) -> tuple[int, int]:
+        sizes = [child.measure() for child in self.children]
+        return (max((size[0] for size in sizes), default=0) + self.padding*2,
+                max((size[1] for size in sizes), default=0) + self.padding*2)
+
+    def arrange(self, rect:pygame.Rect) -> None:
+        width, height = self.measure()
+        if self.fixed_size:
+            width, height = (value if value >= 0 else area+value
+                             for value, area in zip(self.fixed_size, rect.size))
+
+        self.rect = pygame.Rect(0, 0, width, height)
+        setattr(self.rect, self.anchor, getattr(rect, self.anchor))
+        self.rect.move_ip(self.offset)
+
+        for child in self.children:
+            child.arrange(pygame.Rect(
+                (self.rect.x+self.padding, self.rect.y+self.padding), child.measure()))
+        self.dirty = True
+
+    def draw(self, surface:pygame.Surface) -> None:
+        if self.color:
+            pygame.draw.rect(surface, self.color, surface.get_rect(),
+                             border_radius=self.border_radius)
+
+
+class Label(Widget):
+    """Line of text"""
+    def __init__(self, text:str, size_factor:int=2, color:tuple=(255,255,255)) -> None:
+        """Create label
+
+        Args:
+            text (str): Text.
+            size_factor (int, optional): Text size multiplier. Defaults to 2.
+            color (tuple, optional): Text color. Defaults to (255,255,255).
+        """
+        self.text = text
+        self.size_factor = size_factor
+        self.color = color
+        super().__init__()
+
+    def set_text(self, text:str) -> None:
+        """Change text, laying out again if it changed"""
+        if text != self.text:
+            self.text = text
+            self.invalidate_layout()
+
+    def get_size(self) -> tuple[int, int]:
+        return self.render_text().get_size()
+
+    def render_text(self) -> pygame.Surface:
+        """Render text through the shared text cache"""
+        return Font().render(self.text, size_factor=self.size_factor, text_color=self.color)
+
+    def draw(self, surface:pygame.Surface) -> None:
+        surface.blit(self.render_text(), (0,0))
+
+
+class ButtonWidget(Widget):
+    """`Button` as a leaf of a widget tree, driven by an `EventBus`"""
+    interactive = True
+
+    def __init__(self, **options) -> None:
+        """Create button widget
+
+        Args:
+            **options: `Button` arguments, position and anchor are set by layout.
+        """
+        self.button = Button(**options)
+        super().__init__()
+
+    def get_size(self) -> tuple[int, int]:
+        return self.button.rect.size
+
+    def arrange(self, rect:pygame.Rect) -> None:
+        super().arrange(rect)
+        self.button.x, self.button.y = self.rect.topleft
+        self.button.rect.topleft = self.rect.topleft
+
+    def set_text(self, text:str) -> None:
+        """Change button text"""
+        if text != self.button.text:
+            self.button.set_text(text)
+            self.invalidate_layout()
+
+    def hit(self, position:tuple) -> bool:
+        """Check if a screen position is on the button's shape"""
+        return self.button.hit(position)
+
+    def draw(self, surface:pygame.Surface) -> None:
+        surface.blit(self.button.button, (0,0))
+
+    # Event handlers, see src/events.py, redraw only on state changes
+    def on_enter(self) -> None:
+        self.dispatch(self.button.on_enter)
+
+    def on_leave(self) -> None:
+        self.dispatch(self.button.on_leave)
+
+    def on_press(self) -> None:
+        self.dispatch(self.button.on_press)
+
+    def on_release(self, inside:bool) -> None:
+        self.dispatch(self.button.on_release, inside)
+
+    def dispatch(self, handler, *args) -> None:
+        """Run a button handler and redraw if its state changed"""
+        state = self.button.state
+        handler(*args)
+        if self.button.state != state:
+            self.invalidate()
+
+
+class UI(Widget):
+    """Root of a widget tree covering a screen area.
+
+    Lays the tree out on first draw and after layout invalidation, adds its
+    interactive widgets to the event bus, and redraws only the areas of
+    invalidated widgets.
+    """
+    def __init__(self, size:tuple, children:list[Widget]=None,
+                 bus:EventBus=None) -> None:
+        """Create UI root
+
+        Args:
+            size (tuple): (width, height) of the area, usually the screen size.
+            children (list[Widget], optional): Top-level widgets. Defaults to None.
+            bus (EventBus, optional): Event bus to register widgets with.
+                Defaults to None.
+        """
+        self.bus = bus
+        self.needs_layout = True
+        self.dirty_rects:list[pygame.Rect] = []
+        super().__init__(children, size)
+
+    def layout_changed(self) -> None:
+        self.needs_layout = True
+
+    def mark_dirty(self, rect:pygame.Rect) -> None:
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def arrange(self, rect:pygame.Rect) -> None:
+        # Top-level widgets all get the whole area, panels anchor inside it
+        self.rect = pygame.Rect(rect)
+        for child in self.children:
+            child.arrange(self.rect)
+        self.dirty = True
+
+    def resize(self, size:tuple) -> None:
+        """Change the UI area, laying out again"""
+        self.size = tuple(size)
+        self.invalidate_layout()
+
+    def handle_window(self, size:tuple) -> bool:
+        """Follow this frame's window events from the bus: lay out again when
+        the screen changed size, redraw everything when it was exposed
+
+        Args:
+            size (tuple): Current (width, height) of the screen.
+
+        Returns:
+            bool: The window was resized or exposed, so whatever is drawn
+                under the tree has to be drawn again too
+        """
+        if not self.bus or not self.bus.exposed:
+            return False
+        if tuple(size) != self.size:
+            self.resize(size)
+        else:
+            self.mark_dirty(self.rect)
+        return True
+
+    def layout(self) -> None:
+        """Measure and arrange the whole tree, then register interactive widgets"""
+        self.measured = None
+        self.arrange(pygame.Rect((0,0), self.size))
+        for widget in self.walk():
+            widget.dirty = True
+        self.needs_layout = False
+        profiler.count("ui layouts")
+
+        if self.bus:
+            for widget in self.walk():
+                if getattr(widget, "interactive", False):
+                    self.bus.remove(widget)
+                    self.bus.add(widget)
+            self.bus.update_hover()
+
+    def detach(self) -> None:
+        """Remove the tree's widgets from the event bus"""
+        if self.bus:
+            for widget in self.walk():
+                self.bus.remove(widget)
+
+    def draw_tree(self, screen:pygame.Surface,
+                  background:pygame.Surface=None) -> list[pygame.Rect]:
+        """Draw the parts of the tree that changed since the last call
+
+        Args:
+            screen (pygame.Surface): Surface to draw on.
+            background (pygame.Surface, optional): Clean copy of the screen, blitted
+                under redrawn areas. Defaults to None.
+
+        Returns:
+            list[pygame.Rect]: Dirty rects, empty when nothing changed
+        """
+        if self.needs_layout:
+            self.layout()
+            self.dirty_rects = [self.rect.copy()]
+
+        if not self.dirty_rects:
+            return []
+
+        # Top-level widgets are blitted straight from their caches, the
+        # root has no surface of its own
+        rects = [rect.clip(self.rect) for rect in self.dirty_rects]
+        self.dirty_rects = []
+        for rect in rects:
+            if background:
+                screen.blit(background, rect, rect)
+            for child in self.children:
+                area = rect.clip(child.rect)
+                if area:
+                    screen.blit(child.render(), area, area.move(-child.rect.x, -child.rect.y))
+        return rects
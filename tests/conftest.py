@@ -0,0 +1,95 @@
+"""Shared test setup: headless pygame with a display surface for `convert_alpha`,
+and builders for the objects most tests start from"""
+import os
+import sys
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame # pylint: disable=wrong-import-position
+from src.animation import Animation, Animator, get_sheet # pylint: disable=wrong-import-position
+from src.button import Button # pylint: disable=wrong-import-position
+from src.level import Level # pylint: disable=wrong-import-position
+from src.player import PLAYER_FRAMES # pylint: disable=wrong-import-position
+from src.tilemap import TileMap # pylint: disable=wrong-import-position
+
+# Button options shared by button tests, overridden per test
+BUTTON_OPTIONS = dict(x=10, y=20, width=40, height=30, button_color=(50, 50, 50),
+                      button_highlighted_color=(90, 90, 90), text_color=(255, 255, 255))
+
+
+@pytest.fixture(autouse=True, scope="session")
+def display():
+    """Dummy 1x1 display, with asset paths resolved from the repository root"""
+    os.chdir(ROOT)
+    pygame.display.init()
+    pygame.font.init()
+    yield pygame.display.set_mode((1, 1))
+    pygame.quit()
+
+@pytest.fixture
+def make_surface():
+    """Build a transparent surface, filled with seeded random pixels if `seed` is given"""
+    def make(size:tuple, seed:int=None) -> pygame.Surface:
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        if seed is not None:
+            pixels = np.random.default_rng(seed).integers(0, 256, (*size, 4), np.uint8)
+            pygame.surfarray.pixels3d(surface)[:] = pixels[..., :3]
+            pygame.surfarray.pixels_alpha(surface)[:] = pixels[..., 3]
+        return surface
+    return make
+
+@pytest.fixture
+def make_sprite():
+    """Build a bare sprite with only a `rect`"""
+    def make(rect:tuple) -> pygame.sprite.Sprite:
+        item = pygame.sprite.Sprite()
+        item.rect = pygame.Rect(rect)
+        return item
+    return make
+
+@pytest.fixture
+def make_button():
+    """Build a 40x30 `Button` at (10, 20), or a button of another `kind` such as
+    `ButtonWidget`, `options` override `BUTTON_OPTIONS`"""
+    def make(kind:type=Button, **options) -> Button:
+        return kind(**{**BUTTON_OPTIONS, **options})
+    return make
+
+@pytest.fixture
+def make_tilemap():
+    """Build a `TileMap` from a grid of tile codes, 10px tiles by default"""
+    def make(tiles, tile_size:int=10, origin:tuple=(0, 0)) -> TileMap:
+        return TileMap(np.asarray(tiles, np.uint8), tile_size, origin)
+    return make
+
+@pytest.fixture
+def make_level(make_tilemap):
+    """Build a `Level` from a grid of tile codes"""
+    def make(tiles, tile_size:int=10, origin:tuple=(0, 0), **options) -> Level:
+        return Level(make_tilemap(tiles, tile_size, origin), **options)
+    return make
+
+@pytest.fixture
+def make_animator():
+    """Build an `Animator` over the player sheet, with a looping `move` and a
+    held `jump` animation unless `animations` are given"""
+    def make(**animations) -> Animator:
+        sheet = get_sheet(PLAYER_FRAMES, scale_factor=2)
+        return Animator(sheet, animations or {
+            "move": Animation([0, 1, 2], 0.1),
+            "jump": Animation([5], 1, loop=False),
+        })
+    return make
+
+@pytest.fixture
+def make_results():
+    """Build benchmark results with one size per case, p99 twice the p50"""
+    def make(**p50s) -> dict:
+        return {"results": {name: {"100": {"p50": p50, "p99": p50*2}}
+                            for name, p50 in p50s.items()}}
+    return make
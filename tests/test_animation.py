@@ -0,0 +1,40 @@
+"""Shared animation sheets and the Animator"""
+import pygame
+from src.animation import Animation, get_sheet
+from src.player import PLAYER_FRAMES
+
+
+def test_sheet_is_shared_and_pre_flipped():
+    sheet = get_sheet(PLAYER_FRAMES, scale_factor=2)
+    assert get_sheet(PLAYER_FRAMES, scale_factor=2) is sheet
+    assert len(sheet) == 6
+    assert sheet.size == (50, 32)
+    for index in range(len(sheet)):
+        expected = pygame.transform.flip(sheet.get_frame(index), True, False)
+        assert (pygame.image.tobytes(sheet.get_frame(index, flipped=True), "RGBA")
+                == pygame.image.tobytes(expected, "RGBA"))
+
+def test_frames_advance_by_time_and_loop(make_animator):
+    animator = make_animator()
+    animator.update(0.25)
+    assert animator.frame == 2
+    animator.update(0.1)
+    assert animator.frame == 0
+
+def test_non_looping_animation_holds_its_last_frame(make_animator):
+    animator = make_animator(once=Animation([1, 3], 0.1, loop=False))
+    animator.update(5)
+    assert animator.frame == 3
+
+def test_play_restarts_only_on_change(make_animator):
+    animator = make_animator()
+    animator.update(0.15)
+    animator.play("move")
+    assert animator.frame == 1
+    animator.play("jump")
+    assert animator.frame == 5 and animator.time == 0
+
+def test_image_follows_facing(make_animator):
+    animator = make_animator()
+    animator.flipped = True
+    assert animator.image is animator.sheet.get_frame(0, flipped=True)
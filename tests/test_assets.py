@@ -0,0 +1,48 @@
+"""Shared, reference-counted asset cache"""
+from src.assets import AssetManager, assets, get_key
+from src.animation import get_sheet, release_sheet, sheets
+from src.level import Level, TILE_IMAGES
+
+DIRT = "assets/images/dirt.png"
+
+
+def test_load_shares_one_surface_per_key():
+    cache = AssetManager()
+    first = cache.load(DIRT, (36, 36))
+    assert cache.load(DIRT, (36, 36)) is first
+    assert first.get_size() == (36, 36)
+    assert cache.load(DIRT) is not first
+    assert len(cache) == 2
+
+def test_release_frees_at_zero_references():
+    cache = AssetManager()
+    cache.load(DIRT, scale_factor=2)
+    cache.load(DIRT, scale_factor=2)
+    key = get_key(DIRT, scale_factor=2)
+
+    cache.release(DIRT, scale_factor=2)
+    assert key in cache.surfaces
+    cache.release(DIRT, scale_factor=2)
+    assert key not in cache.surfaces
+    cache.release(DIRT, scale_factor=2) # unknown keys are ignored
+
+def test_level_release_drops_its_texture_references():
+    key = get_key(next(iter(TILE_IMAGES.values())), (36, 36))
+    before = assets.references.get(key, 0)
+
+    level = Level("level.txt")
+    assert assets.references[key] == before+1
+    level.release()
+    level.release() # only the first call releases
+    assert assets.references.get(key, 0) == before
+
+def test_sheet_releases_images_with_its_last_user():
+    paths = [DIRT]
+    first = get_sheet(paths, scale_factor=3)
+    assert get_sheet(paths, scale_factor=3) is first
+
+    release_sheet(paths, scale_factor=3)
+    assert (tuple(paths), 3) in sheets
+    release_sheet(paths, scale_factor=3)
+    assert (tuple(paths), 3) not in sheets
+    assert get_key(DIRT, scale_factor=3) not in assets
@@ -0,0 +1,101 @@
+"""Atlas packing, batched drawing, saved atlases and atlas-backed asset loads"""
+import os
+import numpy as np
+import pygame
+import pytest
+from pygame import Rect
+from src.assets import AssetManager
+from src.atlas import Atlas, get_atlas, is_stale, load_atlas, pack, save_atlas
+from src.loader import AssetLoader
+
+
+@pytest.fixture
+def write_images(make_surface):
+    """Save three seeded images to a directory, returning their paths"""
+    def write(directory) -> list[str]:
+        paths = []
+        for index, size in enumerate([(10, 10), (7, 7), (25, 16)]):
+            path = str(directory/f"image{index}.png")
+            pygame.image.save(make_surface(size, index), path)
+            paths.append(path.replace(os.sep, "/"))
+        return paths
+    return write
+
+def pixels(surface:pygame.Surface) -> np.ndarray:
+    return np.dstack((pygame.surfarray.array3d(surface), pygame.surfarray.array_alpha(surface)))
+
+
+def test_pack_has_no_overlaps_and_fits_pages():
+    sizes = {index: (5+index*7 % 40, 5+index*11 % 30) for index in range(60)}
+    positions, pages = pack(sizes, max_size=128)
+    assert len(pages) > 1
+
+    rects = {key: (page, Rect(x, y, *sizes[key])) for key, (page, x, y) in positions.items()}
+    for key, (page, rect) in rects.items():
+        assert rect.right <= pages[page][0] <= 128 and rect.bottom <= pages[page][1] <= 128
+        for other, (other_page, other_rect) in rects.items():
+            if other != key and other_page == page:
+                assert not rect.colliderect(other_rect)
+
+def test_pack_rejects_images_larger_than_a_page():
+    with pytest.raises(ValueError):
+        pack({"big": (300, 10)}, max_size=256)
+
+def test_blits_match_separate_blits(make_surface):
+    surfaces = {index: make_surface((6+index, 9), index) for index in range(12)}
+    atlas = Atlas.from_surfaces(surfaces, max_size=32)
+    items = [(index, (index*7, index*3)) for index in surfaces]
+
+    batched, separate = pygame.Surface((120, 60)), pygame.Surface((120, 60))
+    assert atlas.blits(batched, items) == len(atlas.pages)
+    for key, position in items:
+        separate.blit(surfaces[key], position)
+    assert np.array_equal(pixels(batched), pixels(separate))
+
+def test_save_load_round_trip_and_staleness(make_surface, write_images, tmp_path):
+    images, saved = tmp_path/"images", tmp_path/"atlas"
+    images.mkdir()
+    paths = write_images(images)
+    assert is_stale(str(images), str(saved))
+
+    atlas = get_atlas(str(images), str(saved))
+    assert not is_stale(str(images), str(saved))
+    loaded = load_atlas(str(saved))
+    assert set(loaded.regions) == set(paths)
+    for path in paths:
+        assert np.array_equal(pixels(loaded.subsurface(path)), pixels(atlas.subsurface(path)))
+        assert np.array_equal(pixels(loaded.subsurface(path)), pixels(pygame.image.load(path)))
+
+    os.utime(paths[0], (0, 0))
+    assert is_stale(str(images), str(saved))
+    save_atlas(atlas, str(saved), paths)
+    pygame.image.save(make_surface((3, 3), 9), str(images/"new.png"))
+    assert is_stale(str(images), str(saved))
+
+def test_asset_loads_read_from_the_atlas(write_images, tmp_path):
+    paths = write_images(tmp_path)
+    plain, packed = AssetManager(), AssetManager()
+    packed.use_atlas(get_atlas(str(tmp_path)))
+
+    unscaled = packed.load(paths[2])
+    assert unscaled.get_parent() is packed.atlas.pages[0] # shares the page's pixels
+    assert np.array_equal(pixels(unscaled), pixels(plain.load(paths[2])))
+    assert np.array_equal(pixels(packed.load(paths[0], (36, 36))),
+                          pixels(plain.load(paths[0], (36, 36))))
+    assert np.array_equal(pixels(packed.load(paths[1], scale_factor=2)),
+                          pixels(plain.load(paths[1], scale_factor=2)))
+
+def test_loader_uses_atlas_pages(write_images, tmp_path):
+    paths = write_images(tmp_path)
+    cache = AssetManager()
+    cache.use_atlas(get_atlas(str(tmp_path)))
+    loader = AssetLoader(cache=cache)
+    try:
+        unscaled = loader.load_image(paths[0])
+        assert unscaled.done() # no decoding to wait for
+        scaled = loader.load_image(paths[0], scale_factor=2)
+        loader.wait()
+        assert scaled.result().get_size() == (20, 20)
+        assert cache.references[(paths[0], None, None)] == 1
+    finally:
+        loader.shutdown()
@@ -0,0 +1,44 @@
+"""Autotile neighbor masks and incremental updates"""
+import numpy as np
+from src.autotile import (DIRT, EAST, GRASS, GRASS_LEFT, GRASS_RIGHT, NORTH, SOUTH, WEST,
+                          autotile, autotile_cell, get_neighbor_masks)
+from src.tilemap import EMPTY
+
+
+def test_neighbor_masks():
+    solid = np.array([[0, 1, 0],
+                      [1, 1, 1],
+                      [0, 1, 0]], bool)
+    masks = get_neighbor_masks(solid)
+    assert masks[1, 1] == NORTH | EAST | SOUTH | WEST
+    assert masks[0, 1] == SOUTH
+    assert masks[1, 0] == EAST
+    assert masks[0, 0] == EAST | SOUTH
+    assert get_neighbor_masks(solid, border_solid=True)[0, 1] == NORTH | SOUTH
+
+def test_platform_gets_grass_top_corners_and_dirt():
+    tiles = np.zeros((4, 5), np.uint8)
+    tiles[1:3, 1:4] = DIRT
+    tiled = autotile(tiles)
+    assert tiled[1].tolist() == [EMPTY, GRASS_LEFT, GRASS, GRASS_RIGHT, EMPTY]
+    assert tiled[2].tolist() == [EMPTY, DIRT, DIRT, DIRT, EMPTY]
+    assert not tiled[0].any() and not tiled[3].any()
+
+def test_single_block_is_grass():
+    tiles = np.zeros((3, 3), np.uint8)
+    tiles[1, 1] = DIRT
+    assert autotile(tiles)[1, 1] == GRASS
+
+def test_incremental_updates_match_a_full_pass():
+    generator = np.random.default_rng(4)
+    tiles = autotile(np.where(generator.random((12, 15)) < 0.4, DIRT, EMPTY).astype(np.uint8))
+
+    for _ in range(300):
+        row, column = generator.integers(0, 12), generator.integers(0, 15)
+        tiles[row, column] = EMPTY if tiles[row, column] else DIRT
+        before = tiles.copy()
+        changed = autotile_cell(tiles, row, column)
+
+        assert np.array_equal(tiles, autotile(tiles))
+        expected = {tuple(cell) for cell in np.argwhere(before != tiles).tolist()}
+        assert set(changed) == expected
@@ -0,0 +1,48 @@
+"""Benchmark statistics, regression and budget checks"""
+import pytest
+import benchmark
+from src.animation import sheets
+from src.assets import assets, get_key
+from src.level import TILE_IMAGES
+
+
+def test_percentile_interpolates_sorted_samples():
+    samples = [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert benchmark.percentile(samples, 0) == 1.0
+    assert benchmark.percentile(samples, 0.5) == 3.0
+    assert benchmark.percentile(samples, 0.9) == pytest.approx(4.6)
+    assert benchmark.percentile(samples, 1) == 5.0
+
+def test_measure_reports_every_sample():
+    calls = []
+    stats = benchmark.measure(lambda: calls.append(1), repeat=7, warmup=2)
+    assert len(calls) == 9
+    assert stats["samples"] == 7
+    assert stats["min"] <= stats["p50"] <= stats["p99"] <= stats["max"]
+
+def test_compare_flags_slowdowns_past_the_threshold(make_results):
+    baseline = make_results(level=10.0, font=10.0, button=10.0)
+    results = make_results(level=10.5, font=12.0, button=8.0, player=99.0)
+    assert benchmark.compare(results, baseline, 0.10) == ["font[100] p50 +20.0%"]
+
+def test_budgets_check_p99(make_results):
+    results = make_results(particles=10.0, font=1.0)
+    assert benchmark.check_budgets(results, {"particles": 16.6, "font": 5.0}) == [
+        "particles[100] p99 20.000 ms > 16.6 ms"]
+
+def test_every_case_runs_once(tmp_path):
+    for function, sizes in benchmark.CASES.values():
+        case = function(sizes[0], str(tmp_path))
+        timed, cleanup = case if isinstance(case, tuple) else (case, None)
+        timed()
+        if cleanup:
+            cleanup()
+
+def test_level_cases_release_what_they_build(tmp_path):
+    key = get_key(next(iter(TILE_IMAGES.values())), (36, 36))
+    before = assets.references.get(key, 0)
+    sheets_before = set(sheets)
+
+    benchmark.run(["level", "player"], repeat=2, sizes={"level": [16], "player": [16]})
+    assert assets.references.get(key, 0) == before
+    assert set(sheets) == sheets_before
@@ -0,0 +1,93 @@
+"""Button state surfaces, hit mask and dirty-rect drawing"""
+import pygame
+import pytest
+
+
+@pytest.fixture
+def mouse(monkeypatch):
+    """Fake pointer, moved by setting `mouse.position` and `mouse.down`"""
+    class Mouse:
+        position = (0, 0)
+        down = False
+    monkeypatch.setattr(pygame.mouse, "get_pos", lambda: Mouse.position)
+    monkeypatch.setattr(pygame.mouse, "get_pressed",
+                        lambda *_, **__: (Mouse.down, False, False))
+    return Mouse
+
+
+def test_update_draws_only_on_change(make_button, mouse):
+    button = make_button()
+    screen = pygame.Surface((100, 100))
+    assert button.update(screen) == pygame.Rect(10, 20, 40, 30)
+    assert button.update(screen) is None
+
+    mouse.position = (20, 30)
+    assert button.update(screen) == pygame.Rect(10, 20, 40, 30)
+    assert screen.get_at((20, 30))[:3] == (90, 90, 90)
+    assert button.update(screen) is None
+
+    button.mark_dirty()
+    assert button.update(screen) is not None
+
+def test_anchored_button_follows_the_screen(make_button, mouse):
+    button = make_button(anchor='bottomright')
+    screen = pygame.Surface((100, 100))
+    button.place(screen.get_rect())
+    assert button.update(screen) == pygame.Rect(60, 70, 40, 30)
+
+    screen = pygame.Surface((200, 100))
+    button.place(screen.get_rect())
+    assert button.update(screen) == pygame.Rect(160, 70, 40, 30)
+    button.place(screen.get_rect())
+    assert button.update(screen) is None # placing at the same spot keeps it clean
+
+def test_update_does_not_place_the_button(make_button, mouse, monkeypatch):
+    button = make_button(anchor='bottomright')
+    button.place(pygame.Rect(0, 0, 100, 100))
+    monkeypatch.setattr(button, "place", lambda area: pytest.fail("placed on update"))
+    assert button.update(pygame.Surface((200, 100))) == pygame.Rect(60, 70, 40, 30)
+
+def test_state_surfaces_are_built_once(make_button, mouse):
+    button = make_button(text="Play")
+    surfaces = dict(button.surfaces)
+    mouse.position, mouse.down = (20, 30), True
+    button.update(pygame.Surface((100, 100)))
+    assert button.state == 'selected'
+    assert button.surfaces == surfaces
+    assert button.button is surfaces['selected']
+
+    button.set_text("Quit")
+    assert button.surfaces['normal'] is not surfaces['normal']
+
+def test_mask_follows_rounded_corners(make_button):
+    button = make_button(button_border_radius=10)
+    assert button.rect == pygame.Rect(10, 20, 40, 30)
+    assert button.mask.get_at((20, 15))
+    assert not button.mask.get_at((0, 0)) # cut corner
+
+def test_draw_returns_dirty_rect_only_on_change(make_button):
+    button = make_button()
+    screen = pygame.Surface((100, 100))
+    assert button.draw(screen) == pygame.Rect(10, 20, 40, 30)
+    assert button.draw(screen) is None
+
+    button.on_enter()
+    assert button.draw(screen) == pygame.Rect(10, 20, 40, 30)
+    assert screen.get_at((20, 30))[:3] == (90, 90, 90)
+
+def test_hit_follows_rounded_corners(make_button):
+    button = make_button(button_border_radius=10)
+    assert button.hit((30, 35))
+    assert not button.hit((10, 20)) # cut corner
+    assert not button.hit((5, 5))
+
+def test_click_fires_callback_only_when_released_inside(make_button):
+    clicks = []
+    button = make_button(callback=lambda: clicks.append(1))
+    button.on_press()
+    button.on_release(False)
+    assert not clicks and button.state == 'normal'
+
+    button.on_press()
+    button.on_release(True)
+    assert clicks == [1] and button.state == 'highlighted'
@@ -0,0 +1,49 @@
+"""Swept AABB collision"""
+import numpy as np
+import pytest
+from pygame import FRect, Rect
+from src.collisions import move_and_collide, sweep_aabb
+from src.level import Level
+
+
+@pytest.fixture
+def level(make_level) -> Level:
+    """10px tiles: a floor on row 5 and a one tile thick wall at column 8"""
+    tiles = np.zeros((8, 12), np.uint8)
+    tiles[5, :] = ord("D")
+    tiles[:5, 8] = ord("D")
+    return make_level(tiles)
+
+
+def test_sweep_finds_time_and_normal():
+    hit = sweep_aabb(FRect(0, 0, 10, 10), (20, 0), Rect(15, 0, 10, 10))
+    assert hit == (pytest.approx(0.25), (-1, 0))
+    hit = sweep_aabb(FRect(0, 0, 10, 10), (0, -40), Rect(0, -30, 10, 10))
+    assert hit == (pytest.approx(0.5), (0, 1))
+
+def test_sweep_misses():
+    assert sweep_aabb(FRect(0, 0, 10, 10), (20, 0), Rect(15, 20, 10, 10)) is None
+    assert sweep_aabb(FRect(0, 0, 10, 10), (4, 0), Rect(15, 0, 10, 10)) is None
+    assert sweep_aabb(FRect(0, 0, 10, 10), (-20, 0), Rect(15, 0, 10, 10)) is None
+
+def test_starting_overlap_is_ignored():
+    assert sweep_aabb(FRect(0, 0, 10, 10), (5, 0), Rect(5, 0, 10, 10)) is None
+
+def test_fast_movement_does_not_tunnel(level):
+    rect = FRect(10, 10, 8, 8)
+    contacts = move_and_collide(rect, (500, 0), level)
+    assert rect.right == 80
+    assert contacts[0].normal == (-1, 0)
+    assert contacts[0].sprite.rect.topleft == (80, 10)
+
+def test_slides_along_the_floor(level):
+    rect = FRect(10, 30, 8, 8)
+    contacts = move_and_collide(rect, (20, 40), level)
+    assert rect.bottom == 50
+    assert rect.x == pytest.approx(30)
+    assert [contact.normal for contact in contacts] == [(0, -1)]
+
+def test_free_movement_has_no_contacts(level):
+    rect = FRect(10, 10, 8, 8)
+    assert move_and_collide(rect, (5, 5), level) == []
+    assert rect.topleft == (15, 15)
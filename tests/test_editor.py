@@ -0,0 +1,157 @@
+"""Level editor: history, painting, partial redraws and file round trips"""
+import numpy as np
+import pygame
+import pytest
+from src.editor import Editor, History
+from src.tilemap import EMPTY, TileMap, load_tilemap
+
+@pytest.fixture
+def editor(tmp_path):
+    editor = Editor(pygame.Surface((480, 300)), path=str(tmp_path/"level.txt"),
+                    new_size=(20, 10))
+    editor.open()
+    editor.ui = editor.build_ui()
+    return editor
+
+
+def test_history_limits_and_redo():
+    history = History(limit=2)
+    history.push([])
+    assert not history.undo_stack
+
+    for stroke in ([(1, 1, 0, 68)], [(2, 1, 0, 68)], [(3, 1, 0, 68)]):
+        history.push(stroke)
+    assert len(history.undo_stack) == 2
+    assert history.undo() == [(3, 1, 0, 68)]
+    assert history.redo() == [(3, 1, 0, 68)]
+
+    history.undo()
+    history.push([(4, 1, 0, 68)])
+    assert history.redo() is None
+
+def test_is_editable_excludes_the_text_frame(editor):
+    width, height = editor.level.tilemap.width, editor.level.tilemap.height
+    assert editor.is_editable(1, 1)
+    assert editor.is_editable(width-3, height-2)
+    assert not editor.is_editable(0, 1)
+    assert not editor.is_editable(width-2, 1)
+    assert not editor.is_editable(1, height-1)
+
+def test_undo_and_redo_restore_autotiled_strokes(editor):
+    editor.level.autotiled = True
+    before = editor.level.tiles.copy()
+    editor.paint_line((2, 5), (8, 5), ord("D"))
+    editor.end_stroke()
+    editor.paint(5, 4, ord("D"))
+    editor.end_stroke()
+    after = editor.level.tiles.copy()
+
+    editor.undo()
+    editor.undo()
+    assert np.array_equal(editor.level.tiles, before)
+    editor.redo()
+    editor.redo()
+    assert np.array_equal(editor.level.tiles, after)
+
+def test_save_and_open_round_trip(editor):
+    editor.paint(3, 2, ord("G"))
+    editor.paint(7, 8, ord("D"))
+    editor.end_stroke()
+    tiles = editor.level.tiles.copy()
+    editor.save()
+    assert not editor.modified
+
+    assert np.array_equal(load_tilemap(editor.path).tiles, tiles)
+    editor.open()
+    assert np.array_equal(editor.level.tiles, tiles)
+
+def test_new_asks_before_dropping_edits(editor):
+    editor.paint(3, 2, ord("G"))
+    editor.end_stroke()
+
+    editor.confirm(editor.new, "New")
+    assert editor.level.get_tile(3, 2) == ord("G")
+    assert editor.buttons["New"].button.text == "Sure?"
+    assert editor.history.undo_stack
+
+    editor.confirm(editor.new, "New")
+    assert editor.level.get_tile(3, 2) == EMPTY
+    assert editor.buttons["New"].button.text == "New"
+
+def test_edits_cancel_a_pending_confirmation(editor):
+    editor.paint(3, 2, ord("G"))
+    editor.end_stroke()
+    editor.confirm(editor.new, "New")
+    editor.paint(4, 2, ord("G"))
+    editor.end_stroke()
+
+    editor.confirm(editor.new, "New") # asks again
+    assert editor.level.get_tile(4, 2) == ord("G")
+
+def test_unmodified_map_is_replaced_at_once(editor):
+    editor.level.set_tile(3, 2, ord("G"))
+    editor.confirm(editor.new, "New")
+    assert editor.level.get_tile(3, 2) == EMPTY
+
+def test_hover_and_paint_redraw_only_their_cells(editor):
+    editor.draw_changes()
+    editor.hover_cell = (2, 2)
+    editor.update(0)
+    editor.draw_changes()
+
+    editor.bus.mouse_position = (editor.view_rect.x+100, editor.view_rect.y+100)
+    editor.update(0)
+    editor.paint(4, 3, ord("D"))
+    rects = editor.draw_changes()
+    tile_size = editor.level.tile_size
+    assert all(rect.width <= tile_size and rect.height <= tile_size or rect.bottom > 250
+               for rect in rects)
+
+    partial = editor.view.copy()
+    editor.draw_view()
+    assert np.array_equal(pygame.surfarray.array3d(partial),
+                          pygame.surfarray.array3d(editor.view))
+
+def test_pan_redraws_the_whole_view(editor):
+    editor.draw_changes()
+    editor.camera.rect.move_ip(10.5, 0)
+    editor.view_changed = True
+    assert editor.draw_changes() == [editor.view_rect]
+
+def test_new_map_size():
+    tilemap = TileMap(np.zeros((12, 23), np.uint8), 36, (-36, -36))
+    editor = Editor(pygame.Surface((480, 300)), new_size=(20, 10))
+    editor.set_tilemap(tilemap)
+    editor.new()
+    assert editor.level.tilemap.tiles.shape == (12, 23)
+
+def test_clicks_on_widgets_do_not_paint(editor):
+    cell_position = (editor.view_rect.x+100, editor.view_rect.y+100)
+    editor.bus.mouse_position = cell_position
+    editor.bus.mouse_buttons = [True, False, False]
+    editor.bus.pressed = editor.buttons["Save"] # dragged off a button onto the map
+    editor.update(0)
+    assert not editor.modified
+
+    editor.bus.pressed = None
+    editor.update(0)
+    assert editor.modified
+
+def test_close_asks_before_dropping_edits(editor):
+    editor.running = True
+    editor.paint(3, 2, ord("G"))
+    editor.end_stroke()
+
+    escape = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE, mod=0)
+    editor.handle_event(escape)
+    assert editor.running
+    assert editor.buttons["x"].button.text == "Sure?"
+    editor.buttons["x"].button.callback()
+    assert not editor.running
+
+def test_run_releases_the_level(editor, monkeypatch):
+    level = editor.level
+    escape = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE, mod=0)
+    monkeypatch.setattr(editor.bus, "poll", lambda: [escape])
+    editor.run()
+    assert not level.textures and editor.level is None
@@ -0,0 +1,113 @@
+"""Event bus: input state, widget dispatch and window events"""
+import pygame
+from pygame import Rect
+from src.events import DEFAULT_EVENTS, EventBus
+
+
+class Target:
+    """Widget recording its handler calls"""
+    def __init__(self, rect:tuple) -> None:
+        self.rect = Rect(rect)
+        self.calls = []
+
+    def on_enter(self):
+        self.calls.append("enter")
+
+    def on_leave(self):
+        self.calls.append("leave")
+
+    def on_press(self):
+        self.calls.append("press")
+
+    def on_release(self, inside):
+        self.calls.append(("release", inside))
+
+
+def post(event_type:int, **attributes) -> None:
+    pygame.event.post(pygame.event.Event(event_type, **attributes))
+
+def motion(position:tuple) -> None:
+    post(pygame.MOUSEMOTION, pos=position, rel=(0, 0), buttons=(0, 0, 0))
+
+def click(position:tuple, event_type:int) -> None:
+    post(event_type, pos=position, button=1)
+
+
+def test_keys_and_focus_loss():
+    bus = EventBus()
+    pygame.event.clear()
+    post(pygame.KEYDOWN, key=pygame.K_a, mod=0)
+    post(pygame.KEYDOWN, key=pygame.K_d, mod=0)
+    post(pygame.KEYUP, key=pygame.K_a, mod=0)
+    bus.poll()
+    assert bus.keys == {pygame.K_d}
+
+    post(pygame.WINDOWFOCUSLOST)
+    bus.poll()
+    assert not bus.keys
+
+def test_dispatch_enter_press_release_leave():
+    bus = EventBus()
+    target = Target((10, 10, 50, 50))
+    bus.add(target)
+    pygame.event.clear()
+
+    motion((20, 20))
+    click((20, 20), pygame.MOUSEBUTTONDOWN)
+    click((25, 25), pygame.MOUSEBUTTONUP)
+    motion((200, 200))
+    bus.poll()
+    assert target.calls == ["enter", "press", ("release", True), "leave"]
+
+def test_release_outside_does_not_count():
+    bus = EventBus()
+    target = Target((10, 10, 50, 50))
+    bus.add(target)
+    pygame.event.clear()
+
+    click((20, 20), pygame.MOUSEBUTTONDOWN)
+    click((200, 200), pygame.MOUSEBUTTONUP)
+    bus.poll()
+    assert ("release", False) in target.calls
+    assert not bus.mouse_buttons[0]
+
+def test_widget_at_prefers_the_last_added_and_respects_hit():
+    bus = EventBus()
+    below, above = Target((0, 0, 100, 100)), Target((40, 40, 20, 20))
+    bus.add(below)
+    bus.add(above)
+    assert bus.widget_at((50, 50)) is above
+    assert bus.widget_at((10, 10)) is below
+
+    above.hit = lambda position: False
+    assert bus.widget_at((50, 50)) is below
+
+    bus.remove(below)
+    assert bus.widget_at((10, 10)) is None
+
+def test_window_events_are_allowed_by_default():
+    for event_type in (pygame.VIDEORESIZE, pygame.WINDOWRESIZED, pygame.WINDOWEXPOSED,
+                       pygame.WINDOWFOCUSGAINED, pygame.WINDOWFOCUSLOST):
+        assert event_type in DEFAULT_EVENTS
+
+    bus = EventBus()
+    bus.allow()
+    try:
+        assert not pygame.event.get_blocked(pygame.WINDOWRESIZED)
+        assert pygame.event.get_blocked(pygame.JOYAXISMOTION)
+    finally:
+        pygame.event.set_allowed(None)
+
+def test_resize_and_expose_last_one_frame():
+    bus = EventBus()
+    pygame.event.clear()
+    post(pygame.WINDOWRESIZED, x=800, y=600)
+    bus.poll()
+    assert bus.resized == (800, 600)
+    assert bus.exposed
+
+    post(pygame.WINDOWEXPOSED)
+    bus.poll()
+    assert bus.resized is None and bus.exposed
+    bus.poll()
+    assert not bus.exposed
@@ -0,0 +1,37 @@
+"""Shared glyph tables and the rendered-text cache"""
+from src.font import CHARACTER_MAP, Font, TextCache, get_glyphs, get_surface_bytes
+
+
+def test_glyph_table_is_parsed_once_per_font():
+    assert Font().characters is Font().characters
+    assert Font().characters is get_glyphs('assets/font.png')
+    assert set(Font().characters) == set(CHARACTER_MAP)
+
+def test_render_is_cached_per_text_size_and_color():
+    font = Font(cache=TextCache())
+    text = font.render("Hello", size_factor=2, text_color=(255, 0, 0))
+    assert font.render("Hello", size_factor=2, text_color=(255, 0, 0)) is text
+    assert font.render("Hello", size_factor=2, text_color=(0, 255, 0)) is not text
+    assert font.render("Hello", size_factor=3).get_height() > text.get_height()
+    assert len(font.cache) == 3
+
+def test_space_advances_without_a_glyph():
+    font = Font(cache=TextCache())
+    assert font.render("A A").get_width() > font.render("AA").get_width()
+
+def test_cache_evicts_least_recently_used_past_its_budget(make_surface):
+    size = get_surface_bytes(make_surface((10, 10)))
+    cache = TextCache(max_bytes=2*size)
+    cache.put("a", make_surface((10, 10)))
+    cache.put("b", make_surface((10, 10)))
+    cache.get("a")
+    cache.put("c", make_surface((10, 10)))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.used_bytes == 2*size
+
+def test_cache_skips_surfaces_over_its_budget(make_surface):
+    cache = TextCache(max_bytes=100)
+    cache.put("big", make_surface((100, 10)))
+    assert len(cache) == 0 and cache.used_bytes == 0
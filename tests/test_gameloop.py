@@ -0,0 +1,40 @@
+"""Fixed-timestep loop driver"""
+import pytest
+from src import gameloop
+from src.gameloop import GameLoop
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake `perf_counter`, advanced by setting `clock.now`"""
+    class Clock:
+        now = 100.0
+    monkeypatch.setattr(gameloop.time, "perf_counter", lambda: Clock.now)
+    return Clock
+
+
+def test_steps_and_alpha_follow_elapsed_time(clock):
+    loop = GameLoop(step=0.01)
+    clock.now += 0.035
+    assert loop.advance() == 3
+    assert loop.alpha == pytest.approx(0.5)
+
+    clock.now += 0.006 # leftover 0.005 + 0.006
+    assert loop.advance() == 1
+    assert loop.alpha == pytest.approx(0.1)
+
+def test_total_steps_match_total_time(clock):
+    loop = GameLoop(step=1/120, max_steps=100)
+    steps = 0
+    for _ in range(600):
+        clock.now += 1/144
+        steps += loop.advance()
+    assert steps + loop.alpha == pytest.approx(600/144*120)
+
+def test_spiral_of_death_is_capped(clock):
+    loop = GameLoop(step=0.01, max_steps=5)
+    clock.now += 1.0
+    assert loop.advance() == 5
+    assert loop.alpha == 0
+    clock.now += 0.01
+    assert loop.advance() == 1
@@ -0,0 +1,58 @@
+"""Action bits, keyboard reading and input recordings"""
+from collections import defaultdict
+import pygame
+import pytest
+from src.inputs import (DOWN, LEFT, RIGHT, UP, InputRecorder, InputReplay,
+                        get_actions, read_keyboard)
+from src.player import Player
+
+
+def test_get_actions_combines_names():
+    assert get_actions("") == 0
+    assert get_actions("dw") == RIGHT | UP
+    assert get_actions("wsad") == UP | DOWN | LEFT | RIGHT
+
+def test_read_keyboard_polls_held_keys(monkeypatch):
+    pressed = defaultdict(bool, {pygame.K_d: True, pygame.K_s: True, pygame.K_SPACE: True})
+    monkeypatch.setattr(pygame.key, "get_pressed", lambda: pressed)
+    assert read_keyboard() == RIGHT | DOWN
+
+def test_read_keyboard_from_held_keys_and_pressed_state():
+    assert read_keyboard({pygame.K_a, pygame.K_w, pygame.K_SPACE}) == LEFT | UP
+    assert read_keyboard(set()) == 0
+
+    pressed = defaultdict(bool, {pygame.K_d: True, pygame.K_s: True})
+    assert read_keyboard(pressed=pressed) == RIGHT | DOWN
+
+def test_recording_round_trip(tmp_path):
+    path = str(tmp_path/"input.rec")
+    ticks = [0, RIGHT, RIGHT | UP, LEFT, 0]
+    with InputRecorder(path, 1/60) as recorder:
+        for actions in ticks:
+            recorder.record(actions)
+    assert recorder.ticks == len(ticks)
+
+    replay = InputReplay(path)
+    assert replay.step == 1/60
+    assert len(replay) == len(ticks)
+    assert [replay.poll() for _ in ticks] == ticks
+    assert replay.finished
+    assert replay.poll() == 0
+
+def test_replay_rejects_other_files(tmp_path):
+    path = tmp_path/"level.txt"
+    path.write_bytes(b"[\n]")
+    with pytest.raises(ValueError):
+        InputReplay(str(path))
+
+def test_player_reads_the_keyboard_once_per_tick(monkeypatch):
+    calls = []
+    def get_pressed():
+        calls.append(1)
+        return defaultdict(bool, {pygame.K_d: True})
+    monkeypatch.setattr(pygame.key, "get_pressed", get_pressed)
+
+    player = Player()
+    player.input()
+    assert len(calls) == 1
+    assert player.direction.x == 1
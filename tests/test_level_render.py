@@ -0,0 +1,78 @@
+"""Chunked, camera-culled level rendering"""
+import numpy as np
+import pygame
+import pytest
+from src.camera import Camera
+from src.level import TILE_IMAGES, Level, tile_atlases
+
+
+@pytest.fixture
+def tiles() -> np.ndarray:
+    tiles = np.zeros((40, 60), dtype=np.uint8)
+    tiles[5, 3:20] = ord("D")
+    tiles[30:33, 40] = ord("G")
+    return tiles
+
+def draw_tiles(level:Level, size:tuple, offset:tuple) -> pygame.Surface:
+    """Reference render: every tile blitted on its own"""
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    for row, column in zip(*np.nonzero(level.tiles)):
+        x, y = level.get_tile_position(column, row)
+        surface.blit(level.textures[int(level.tiles[row, column])],
+                     (x-offset[0], y-offset[1]))
+    return surface
+
+
+def test_render_matches_drawing_every_tile(make_level, tiles):
+    level = make_level(tiles, chunk_size=4)
+    for position in ((0, 0), (-25, 13), (170, 240)):
+        camera = Camera(320, 200, position)
+        screen = pygame.Surface(camera.rect.size, pygame.SRCALPHA)
+        level.render(screen, camera)
+        expected = draw_tiles(level, camera.rect.size, position)
+        assert np.array_equal(pygame.surfarray.pixels_alpha(screen),
+                              pygame.surfarray.pixels_alpha(expected))
+        assert np.array_equal(pygame.surfarray.pixels3d(screen),
+                              pygame.surfarray.pixels3d(expected))
+
+def test_only_visible_non_empty_chunks_are_baked(make_level, tiles):
+    level = make_level(tiles, chunk_size=4)
+    level.render(pygame.Surface((80, 80)), Camera(80, 80, (0, 0)))
+    # Row 5 is in chunk row 1, columns 3-19 span chunk columns 0-1
+    assert set(level.chunks) == {(0, 1), (1, 1)}
+
+def test_cache_grows_to_fit_the_view(make_level, tiles):
+    level = make_level(tiles, chunk_size=4, max_chunks=2)
+    camera = Camera(600, 400)
+    level.render(pygame.Surface(camera.rect.size), camera)
+    assert level.max_chunks >= 15*10
+    baked = dict(level.chunks)
+
+    level.render(pygame.Surface(camera.rect.size), camera)
+    assert all(level.chunks[key] is chunk for key, chunk in baked.items())
+
+def test_least_recently_used_chunk_is_evicted(make_level, tiles):
+    level = make_level(tiles, chunk_size=4, max_chunks=2)
+    for key in ((0, 1), (1, 1), (4, 1)):
+        level.get_chunk(*key)
+    assert list(level.chunks) == [(1, 1), (4, 1)]
+
+def test_set_tile_rebakes_only_its_chunk(make_level, tiles):
+    level = make_level(tiles, chunk_size=4, max_chunks=256)
+    level.render(pygame.Surface((600, 400)), Camera(600, 400))
+    untouched = level.chunks[(0, 1)]
+
+    level.set_tile(40, 31, 0)
+    assert (10, 7) not in level.chunks
+    assert level.chunks[(0, 1)] is untouched
+
+def test_levels_share_one_tile_atlas(make_level, tiles):
+    first = make_level(tiles, tile_size=13)
+    second = make_level(tiles, tile_size=13)
+    assert second.atlas is first.atlas
+    assert make_level(tiles, tile_size=14).atlas is not first.atlas
+
+    first.release()
+    assert (tuple(TILE_IMAGES.items()), 13) in tile_atlases
+    second.release()
+    assert (tuple(TILE_IMAGES.items()), 13) not in tile_atlases
@@ -0,0 +1,39 @@
+"""Light textures, shadows and the light map"""
+import numpy as np
+import pygame
+from src.lighting import Light, LightMap, get_light_texture, project
+
+
+def test_light_texture_fades_from_the_center():
+    texture = get_light_texture(10, falloff=1, color=(255, 128, 0))
+    assert get_light_texture(10, falloff=1, color=(255, 128, 0)) is texture
+    assert texture.get_size() == (20, 20)
+    center = texture.get_at((10, 10))
+    assert center.r > 220 and center.b == 0
+    assert texture.get_at((0, 0))[:3] == (0, 0, 0)
+    assert 0 < texture.get_at((15, 10)).r < center.r
+
+def test_project_pushes_points_away():
+    assert project((10, 0), pygame.Vector2(0, 0), 5) == (15, 0)
+    assert project((0, 0), pygame.Vector2(0, 0), 5) == (0, 0)
+
+def test_only_exposed_edges_facing_the_light_cast_shadows(make_level):
+    tiles = np.zeros((5, 5), np.uint8)
+    tiles[2, 2:4] = ord("D") # two tiles side by side
+    level = make_level(tiles)
+    lights = LightMap((50, 50), level=level)
+
+    # Light above: only the two top edges face it
+    polygons = lights.get_shadow_polygons(Light((25, 0), radius=100))
+    assert sorted(polygon[:2] for polygon in polygons) == [
+        [(20, 20), (30, 20)], [(30, 20), (40, 20)]]
+
+def test_render_multiplies_ambient_and_lights_onto_the_screen():
+    lights = LightMap((64, 64), scale=4, ambient=(0, 0, 0))
+    lights.add(Light((32, 32), radius=16, casts_shadows=False))
+    screen = pygame.Surface((64, 64))
+    screen.fill((200, 200, 200))
+    lights.render(screen)
+
+    assert screen.get_at((0, 0))[:3] == (0, 0, 0)
+    assert screen.get_at((32, 32)).r > 100
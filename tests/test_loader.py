@@ -0,0 +1,53 @@
+"""Background asset loader"""
+import pytest
+from src.assets import AssetManager, get_key
+from src.loader import AssetLoader
+
+DIRT = "assets/images/dirt.png"
+
+
+@pytest.fixture
+def loader():
+    loader = AssetLoader(max_workers=2, cache=AssetManager())
+    yield loader
+    loader.shutdown()
+
+
+def test_images_finish_on_the_main_thread(loader):
+    future = loader.load_image(DIRT, (20, 20))
+    assert not future.done() and loader.pending == 1
+    loader.wait()
+    assert future.result().get_size() == (20, 20)
+    assert future.result() is loader.cache.surfaces[get_key(DIRT, (20, 20))]
+    assert loader.progress == 1.0
+
+def test_concurrent_requests_share_one_load(loader):
+    first = loader.load_image(DIRT, scale_factor=2)
+    second = loader.load_image(DIRT, scale_factor=2)
+    assert first is second and loader.total == 1
+    loader.wait()
+    assert loader.cache.references[get_key(DIRT, scale_factor=2)] == 2
+    assert not loader.loading
+
+def test_cached_requests_take_a_reference(loader):
+    loader.load_image(DIRT)
+    loader.wait()
+    cached = loader.load_image(DIRT)
+    assert cached.done()
+    assert loader.cache.references[get_key(DIRT)] == 2
+
+    loader.cache.release(DIRT)
+    loader.cache.release(DIRT)
+    assert get_key(DIRT) not in loader.cache
+
+def test_failed_loads_report_and_can_be_retried(loader):
+    future = loader.load_image("assets/images/missing.png")
+    loader.wait()
+    with pytest.raises(Exception):
+        future.result()
+    assert loader.load_image("assets/images/missing.png") is not future
+
+def test_tilemaps_load_in_the_background(loader):
+    future = loader.load_tilemap("level.txt")
+    loader.wait()
+    assert future.result().tiles.any()
@@ -0,0 +1,41 @@
+"""Outline generation and the outline cache"""
+import pygame
+from src.lighting import OutlineCache, get_outline
+
+
+def make_image() -> pygame.Surface:
+    surface = pygame.Surface((12, 8), pygame.SRCALPHA)
+    pygame.draw.rect(surface, (200, 30, 30), (1, 1, 6, 6))
+    return surface
+
+
+def test_outline_traces_the_shape_in_its_color():
+    outline = get_outline(make_image(), (0, 255, 0, 255))
+    assert outline.get_at((1, 1)) == (0, 255, 0, 255)
+    assert outline.get_at((6, 3)) == (0, 255, 0, 255)
+    assert outline.get_at((3, 3)).a == 0
+    assert outline.get_bounding_rect() == pygame.Rect(1, 1, 6, 6)
+
+def test_identical_content_shares_one_outline():
+    cache = OutlineCache()
+    first, second = make_image(), make_image()
+    assert cache.get(first) is cache.get(second)
+    assert cache.get(first, color=(255, 0, 0)) is not cache.get(first)
+    assert len(cache) == 2
+
+def test_flipped_outline_is_the_flipped_outline():
+    cache = OutlineCache()
+    image = make_image()
+    flipped = cache.get(image, flip_x=True)
+    assert flipped.get_bounding_rect() == pygame.Rect(5, 1, 6, 6)
+    assert cache.build([image])[0][(True, False)] is flipped
+
+def test_invalidate_picks_up_new_pixels():
+    cache = OutlineCache()
+    image = make_image()
+    before = cache.get(image)
+    image.fill((0, 0, 0, 0))
+    assert cache.get(image) is before # remembered by identity
+
+    cache.invalidate(image)
+    assert cache.get(image).get_bounding_rect().size == (0, 0)
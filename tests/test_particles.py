@@ -0,0 +1,50 @@
+"""NumPy-backed particle system"""
+import numpy as np
+import pygame
+from src.particles import Particles
+
+
+def test_emit_stops_at_capacity():
+    particles = Particles(capacity=10)
+    particles.emit((0, 0), 7)
+    particles.emit((0, 0), 7)
+    assert len(particles) == 10
+
+def test_dead_particles_are_compacted_to_the_front():
+    particles = Particles(radius_range=(5, 5), shrink_rate=0)
+    particles.emit((0, 0), 3, lifetime=1)
+    particles.emit((50, 50), 2, lifetime=3)
+    particles.update(2)
+    assert len(particles) == 2
+    assert np.all(particles.lifetimes[:2] == np.float32(1))
+
+def test_particles_shrink_away():
+    particles = Particles(radius_range=(3, 3), shrink_rate=1, jitter=0)
+    particles.emit((0, 0), 4)
+    particles.update(1.5)
+    assert len(particles) == 4
+    assert np.allclose(particles.radii[:4], 1.5)
+    particles.update(1)
+    assert len(particles) == 0
+
+def test_zero_shrink_rate_lives_forever():
+    particles = Particles(shrink_rate=0)
+    particles.emit((0, 0), 5)
+    assert np.all(np.isinf(particles.lifetimes[:5]))
+    particles.update(1000)
+    assert len(particles) == 5
+
+def test_zero_lifetime_is_not_the_default():
+    particles = Particles()
+    particles.emit((0, 0), 5, lifetime=0)
+    particles.update(0.01)
+    assert len(particles) == 0
+
+def test_render_draws_each_particle_centered():
+    particles = Particles(radius_range=(4, 4), color=(255, 0, 0))
+    particles.emit((20, 30), 1)
+    particles.velocities[:1] = 0
+    screen = pygame.Surface((60, 60))
+    particles.render(screen, offset=(5, 5))
+    assert screen.get_at((15, 25))[:3] == (255, 0, 0)
+    assert screen.get_at((30, 40))[:3] == (0, 0, 0)
@@ -0,0 +1,85 @@
+"""Frame profiler and its overlay"""
+import csv
+import json
+import pygame
+from src.profiler import Profiler, ProfilerOverlay
+
+
+def test_sections_and_counts_average_over_the_window():
+    profiler = Profiler(window=2)
+    for frame in range(3):
+        profiler.begin_frame()
+        profiler.add_time("update", 0.0, 0.001*(frame+1))
+        profiler.add_time("update", 0.0, 0.001)
+        profiler.count("particles", 10*frame)
+        profiler.end_frame()
+
+    times, counts = profiler.averages()
+    assert len(profiler.frames) == 2
+    assert abs(times["update"] - 3.5) < 1e-9 # (3+1 + 2+1)/2 ms
+    assert counts == {"particles": 15}
+
+def test_frames_stay_bounded_without_begin_frame():
+    profiler = Profiler(max_events=8, max_names=4)
+    for index in range(100):
+        with profiler.section("draw"):
+            pass
+        profiler.count(f"counter {index}")
+    assert len(profiler.events) == 8
+    assert len(profiler.counts) == 4
+
+    profiler.end_frame() # also starts the next frame
+    assert not profiler.events and not profiler.counts and not profiler.times
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    profiler.begin_frame()
+    with profiler.section("update"):
+        profiler.count("buttons")
+    profiler.end_frame()
+    assert not profiler.frames and not profiler.counts
+
+def test_dumps(tmp_path):
+    profiler = Profiler()
+    profiler.begin_frame()
+    with profiler.section("level"):
+        profiler.count("chunks drawn", 4)
+    profiler.end_frame()
+
+    profiler.dump_csv(str(tmp_path/"profile.csv"))
+    with open(tmp_path/"profile.csv", encoding="utf-8") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["frame_ms", "level_ms", "chunks drawn"]
+    assert rows[1][2] == "4"
+
+    profiler.dump_chrome_trace(str(tmp_path/"profile.json"))
+    with open(tmp_path/"profile.json", encoding="utf-8") as file:
+        names = [event["name"] for event in json.load(file)["traceEvents"]]
+    assert names == ["frame", "level", "chunks drawn"]
+
+def test_overlay_refreshes_every_few_frames():
+    profiler = Profiler()
+    profiler.begin_frame()
+    profiler.count("particles", 3)
+    profiler.end_frame()
+
+    overlay = ProfilerOverlay(profiler, refresh_frames=2)
+    screen = pygame.Surface((400, 200))
+    overlay.draw(screen)
+    lines = overlay.lines
+    assert len(lines) == 2 # frame time and the counter
+    overlay.draw(screen)
+    assert overlay.lines is lines
+    overlay.draw(screen)
+    assert overlay.lines is not lines
+
+def test_overlay_skips_characters_without_glyphs():
+    profiler = Profiler()
+    profiler.begin_frame()
+    profiler.count("naïve {counter} ~ ok", 2)
+    profiler.end_frame()
+
+    overlay = ProfilerOverlay(profiler)
+    overlay.draw(pygame.Surface((400, 200)))
+    assert len(overlay.lines) == 2
+    assert overlay.printable("a{b}~c é") == "abc "
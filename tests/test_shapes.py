@@ -0,0 +1,96 @@
+"""Structure-of-arrays shape store and its sprite views"""
+import numpy as np
+import pygame
+import pytest
+from src.shapes import RECTANGLE, Circle, Rectangle, ShapeStore
+
+
+def test_update_moves_every_shape():
+    store = ShapeStore(capacity=2)
+    for index in range(5): # grows past capacity
+        store.add(RECTANGLE, (4, 4), position=(index, 0), direction=(0, 1), speed=10)
+    store.update(0.5)
+    assert np.array_equal(store.positions[:5], [[index, 5] for index in range(5)])
+
+def test_remove_keeps_other_views_on_their_rows():
+    store = ShapeStore()
+    first, second, third = (Rectangle((2, 2), store=store) for _ in range(3))
+    third.position = (30, 30)
+
+    first.destroy()
+    assert len(store) == 2
+    assert third.index == 0 and third.position == (30, 30)
+    second.position = (5, 5)
+    assert third.position == (30, 30)
+
+def test_destroyed_view_can_not_corrupt_other_rows():
+    store = ShapeStore()
+    first, second = Rectangle(store=store), Rectangle(store=store)
+    second.position = (7, 7)
+    first.destroy()
+    first.destroy()
+
+    assert len(store) == 1 and second.position == (7, 7)
+    with pytest.raises(RuntimeError):
+        first.update(1)
+    with pytest.raises(RuntimeError):
+        first.position = (0, 0)
+
+def test_sprite_group_api_is_not_shadowed():
+    store = ShapeStore()
+    group, other = pygame.sprite.Group(), pygame.sprite.Group()
+    shape = Circle(3, store=store)
+    group.add(shape)
+    other.add(shape)
+
+    shape.remove(group)
+    assert len(store) == 1 and shape.alive()
+    other.remove(shape) # left its last group, the row is kept
+    assert len(store) == 1 and not shape.alive() and shape.index == 0
+
+def test_shape_moves_between_groups():
+    store = ShapeStore()
+    first, second = pygame.sprite.Group(), pygame.sprite.Group()
+    shape = Rectangle((4, 4), (255, 0, 0), store=store)
+    shape.position = (2, 2)
+
+    first.add(shape)
+    first.remove(shape)
+    second.add(shape)
+    screen = pygame.Surface((10, 10))
+    second.draw(screen)
+    assert screen.get_at((3, 3))[:3] == (255, 0, 0)
+
+    second.empty()
+    first.add(shape)
+    assert shape.position == (2, 2) and len(store) == 1
+
+def test_kill_frees_the_row():
+    store = ShapeStore()
+    shape = Rectangle(store=store)
+    pygame.sprite.Group(shape)
+    shape.kill()
+    assert len(store) == 0 and not store.views
+
+def test_rect_and_center_setters_move_the_shape():
+    shape = Rectangle((10, 20), store=ShapeStore())
+    shape.center = (50, 50)
+    assert shape.rect == pygame.FRect(45, 40, 10, 20)
+    shape.rect = pygame.FRect(1, 2, 99, 99)
+    assert shape.rect == pygame.FRect(1, 2, 10, 20)
+
+    copy = shape.position
+    copy.x = 100
+    assert shape.position.x == 1 # reads are copies
+
+def test_draw_blits_shared_images():
+    store = ShapeStore()
+    red = Rectangle((4, 4), (255, 0, 0), store=store)
+    Rectangle((4, 4), (255, 0, 0), store=store).position = (10, 0)
+    assert store.images[0] is store.images[1]
+
+    screen = pygame.Surface((20, 10))
+    red.position = (2, 2)
+    store.draw(screen)
+    assert screen.get_at((3, 3))[:3] == (255, 0, 0)
+    assert screen.get_at((11, 1))[:3] == (255, 0, 0)
@@ -0,0 +1,56 @@
+"""Headless simulation runs, scripts and recorded input"""
+import numpy as np
+import pytest
+from src.inputs import LEFT, RIGHT, UP, InputReplay
+from src.simulation import iter_script, random_script, read_script, run_simulation
+from src.tilemap import write_level
+
+
+@pytest.fixture
+def level_path(make_tilemap, tmp_path):
+    tiles = np.zeros((20, 60), np.uint8)
+    tiles[12:, :] = ord("D")
+    tiles[11, 20:24] = ord("G")
+    path = tmp_path/"level.lvl"
+    write_level(str(path), make_tilemap(tiles, tile_size=36))
+    return str(path)
+
+def test_iter_script_expands_segments():
+    assert list(iter_script([(2, "d"), (1, "dw"), (2, "")])) == [
+        RIGHT, RIGHT, RIGHT | UP, 0, 0]
+
+def test_read_script_skips_comments_and_blank_lines(tmp_path):
+    path = tmp_path/"script.txt"
+    path.write_text("# warm up\n120 d\n\n30 dw\n60\n", encoding="utf-8")
+    assert read_script(str(path)) == [(120, "d"), (30, "dw"), (60, "")]
+
+def test_random_script_is_seeded_and_exact():
+    script = random_script(3, 1000)
+    assert script == random_script(3, 1000)
+    assert script != random_script(4, 1000)
+    assert sum(steps for steps, _ in script) == 1000
+    assert all(set(keys) <= set("wsad") for _, keys in script)
+
+def test_runs_are_deterministic(level_path):
+    script = random_script(1, 600)
+    first = run_simulation(level_path, script)
+    second = run_simulation(level_path, script)
+    assert first["steps"] == 600
+    assert first["position"] == second["position"]
+    assert first["overlaps"] == second["overlaps"]
+
+def test_recorded_run_replays_identically(level_path, tmp_path):
+    record = str(tmp_path/"run.rec")
+    script = [(90, "d"), (20, "dw"), (90, "a")]
+    recorded = run_simulation(level_path, script, record=record)
+
+    replay = InputReplay(record)
+    assert len(replay) == 200
+    assert replay.ticks[0] == RIGHT and replay.ticks[-1] == LEFT
+    replayed = run_simulation(level_path, ticks=replay.ticks, step=replay.step)
+    assert replayed["position"] == recorded["position"]
+
+def test_player_lands_on_the_floor(level_path):
+    run = run_simulation(level_path, [(240, "")], start=(300, 100))
+    assert run["fell_out"] == 0
+    assert run["overlaps"] == 0
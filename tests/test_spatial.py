@@ -0,0 +1,56 @@
+"""Uniform-grid spatial index"""
+import random
+from pygame import Rect
+from src.spatial import SpatialGrid
+
+
+def test_query_matches_brute_force(make_sprite):
+    generator = random.Random(2)
+    items = [make_sprite((generator.randint(-200, 200), generator.randint(-200, 200),
+                          generator.randint(1, 90), generator.randint(1, 90)))
+             for _ in range(300)]
+    grid = SpatialGrid(36)
+    for item in items:
+        grid.insert(item)
+
+    for _ in range(100):
+        area = Rect(generator.randint(-250, 250), generator.randint(-250, 250),
+                    generator.randint(1, 120), generator.randint(1, 120))
+        expected = {id(item) for item in items if area.colliderect(item.rect)}
+        found = grid.query(area)
+        assert len(found) == len(expected)
+        assert {id(item) for item in found} == expected
+
+def test_sprite_spanning_cells_is_listed_once(make_sprite):
+    grid = SpatialGrid(10)
+    wide = make_sprite((0, 0, 45, 25))
+    grid.insert(wide)
+    assert grid.query(Rect(-5, -5, 60, 40)) == [wide]
+
+def test_many_overlapping_sprites_keep_insertion_order(make_sprite):
+    grid = SpatialGrid(10)
+    items = [make_sprite((index % 7, index % 5, 60, 60)) for index in range(500)]
+    for item in items:
+        grid.insert(item)
+    assert grid.query(Rect(0, 0, 70, 70)) == items
+
+def test_remove_empties_every_cell(make_sprite):
+    grid = SpatialGrid(10)
+    item, other = make_sprite((5, 5, 20, 20)), make_sprite((0, 0, 5, 5))
+    grid.insert(item)
+    grid.insert(other)
+
+    grid.remove(item)
+    assert list(grid.cells) == [(0, 0)]
+    assert grid.query(Rect(0, 0, 40, 40)) == [other]
+
+def test_remove_with_old_rect_after_moving(make_sprite):
+    grid = SpatialGrid(10)
+    item = make_sprite((0, 0, 5, 5))
+    grid.insert(item)
+    old_rect = Rect(item.rect)
+    item.rect.topleft = (100, 100)
+
+    grid.remove(item, old_rect)
+    assert not grid.cells
+    assert grid.query(Rect(0, 0, 200, 200)) == []
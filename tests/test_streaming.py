@@ -0,0 +1,82 @@
+"""Region streaming around the camera"""
+import numpy as np
+import pygame
+import pytest
+from src.camera import Camera
+from src.level import Level
+from src.loader import AssetLoader
+from src.streaming import StreamingLevel, split_level
+from src.tilemap import TileMap
+
+
+@pytest.fixture
+def tilemap(make_tilemap) -> TileMap:
+    tiles = np.zeros((20, 50), np.uint8)
+    tiles[15, :] = ord("D")
+    tiles[3:6, 40] = ord("G")
+    return make_tilemap(tiles, origin=(-30, 0))
+
+def stream(world:StreamingLevel, camera:Camera) -> None:
+    """Update until every requested region is built"""
+    world.update(camera)
+    world.loader.wait()
+    world.update(camera)
+
+
+def test_split_skips_empty_regions(tilemap, tmp_path):
+    written = split_level(tilemap, str(tmp_path), region_size=8)
+    assert written == len(list(tmp_path.glob("*.lvl")))
+    assert not (tmp_path/"0_0.lvl").exists() # no tiles in rows 0-7, columns 3-10
+
+def test_streamed_queries_match_the_whole_level(tilemap, tmp_path):
+    split_level(tilemap, str(tmp_path), region_size=8)
+    loader = AssetLoader(max_workers=1)
+    world = StreamingLevel(str(tmp_path), radius=5, max_regions=64, loader=loader)
+    stream(world, Camera(200, 200, (0, 0)))
+    level = Level(tilemap)
+
+    for area in (pygame.Rect(0, 140, 300, 20), pygame.Rect(360, 20, 20, 50)):
+        assert (sorted(tuple(tile.rect) for tile in world.query(area))
+                == sorted(tuple(tile.rect) for tile in level.query(area)))
+    loader.shutdown()
+
+def test_regions_are_evicted_when_over_budget(make_tilemap):
+    loader = AssetLoader(max_workers=1)
+    generated = []
+
+    def generator(region_x:int, region_y:int) -> TileMap:
+        generated.append((region_x, region_y))
+        return make_tilemap(np.full((4, 4), ord("D")), origin=(region_x*40, region_y*40))
+
+    world = StreamingLevel(generator=generator, radius=0, max_regions=2,
+                           region_size=4, tile_size=10, loader=loader)
+    stream(world, Camera(10, 10, (0, 0)))
+    stream(world, Camera(10, 10, (200, 0)))
+    stream(world, Camera(10, 10, (400, 0)))
+
+    assert len(world.regions) == 2
+    assert (0, 0) not in world.regions
+    assert generated == [(0, 0), (5, 0), (10, 0)]
+    loader.shutdown()
+
+def test_failed_region_is_logged_and_requested_again(make_tilemap, caplog):
+    loader = AssetLoader(max_workers=1)
+    attempts = []
+
+    def generator(region_x:int, region_y:int) -> TileMap:
+        attempts.append((region_x, region_y))
+        if len(attempts) == 1:
+            raise OSError("disk error")
+        return make_tilemap(np.full((4, 4), ord("D")), origin=(region_x*40, region_y*40))
+
+    world = StreamingLevel(generator=generator, radius=0, region_size=4,
+                           tile_size=10, loader=loader)
+    world.update(Camera(10, 10, (0, 0)))
+    loader.wait()
+    assert not world.requested and (0, 0) not in world.regions
+    assert "failed to load region (0, 0)" in caplog.text
+
+    stream(world, Camera(10, 10, (0, 0)))
+    assert attempts == [(0, 0), (0, 0)]
+    assert world.regions[(0, 0)] is not None
+    loader.shutdown()
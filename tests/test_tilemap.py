@@ -0,0 +1,61 @@
+"""Text and binary (LVL1) level formats and tile queries"""
+import numpy as np
+import pygame
+import pytest
+from src.level import Tile
+from src.tilemap import (HEADER, TileMap, compile_level, is_binary_level, load_tilemap,
+                         read_level, read_text_level, write_level)
+
+
+def test_text_level_cells_are_map_characters(tmp_path):
+    path = tmp_path/"level.txt"
+    path.write_text('[\n"  D ",\n"GG x",\n]')
+    tilemap = read_text_level(str(path), tile_size=10)
+
+    assert tilemap.origin == (-10, -10)
+    assert tilemap.tiles[1, 3] == ord("D")
+    assert tilemap.tiles[2, 1] == tilemap.tiles[2, 2] == ord("G")
+    assert np.count_nonzero(tilemap.tiles) == 3 # `x` and quotes are not tiles
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_binary_level_round_trip(tmp_path, memory_map):
+    tiles = np.random.default_rng(1).choice(
+        np.array([0, ord("D"), ord("G")], np.uint8), (17, 23))
+    write_level(str(tmp_path/"level.lvl"), TileMap(tiles, 24, (-48, 96)))
+
+    tilemap = read_level(str(tmp_path/"level.lvl"), memory_map)
+    assert (tilemap.tile_size, tilemap.origin) == (24, (-48, 96))
+    assert np.array_equal(tilemap.tiles, tiles)
+    assert (tmp_path/"level.lvl").stat().st_size == HEADER.size + tiles.size
+
+def test_compiled_level_matches_its_text_source(tmp_path):
+    compile_level("level.txt", str(tmp_path/"level.lvl"))
+    assert is_binary_level(str(tmp_path/"level.lvl"))
+    assert not is_binary_level("level.txt")
+
+    binary = load_tilemap(str(tmp_path/"level.lvl"))
+    text = load_tilemap("level.txt")
+    assert np.array_equal(binary.tiles, text.tiles)
+    assert binary.origin == text.origin
+
+def test_read_level_rejects_other_files(tmp_path):
+    (tmp_path/"bad.lvl").write_bytes(b"nope")
+    with pytest.raises(ValueError):
+        read_level(str(tmp_path/"bad.lvl"))
+
+def test_query_returns_tiles_under_a_rect(make_level):
+    tiles = np.zeros((4, 4), np.uint8)
+    tiles[1, 2] = ord("D")
+    level = make_level(tiles)
+
+    assert level.query(pygame.Rect(15, 5, 10, 10)) == [Tile(ord("D"), pygame.Rect(20, 10, 10, 10))]
+    assert level.query(pygame.Rect(0, 0, 20, 10)) == [] # touching edges only
+    assert len(level) == 0 # tiles are not sprites
+
+def test_draw_draws_tiles_at_world_positions(make_level):
+    tiles = np.zeros((4, 4), np.uint8)
+    tiles[1, 2] = ord("D")
+    level = make_level(tiles)
+    screen = pygame.Surface((40, 40), pygame.SRCALPHA)
+    level.draw(screen)
+    assert screen.get_bounding_rect() == pygame.Rect(20, 10, 10, 10)
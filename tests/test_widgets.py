@@ -0,0 +1,109 @@
+"""Widget tree: layout, cached rendering, dirty rects and window events"""
+import pygame
+from src.editor import Editor
+from src.events import EventBus
+from src.widgets import UI, ButtonWidget, HStack, Label, Panel, VStack, Widget
+
+
+def test_stacks_and_panels_lay_out():
+    first, second = Widget(size=(40, 20)), Widget(size=(60, 10))
+    column = VStack([first, second], spacing=5, padding=2)
+    row = HStack([Widget(size=(10, 10)), Widget(size=(10, 30))], spacing=0)
+    ui = UI((300, 200), [Panel([column], anchor='bottomright', offset=(-10, -10)),
+                         Panel([row])])
+    ui.layout()
+
+    assert column.measure() == (64, 39)
+    assert column.rect.bottomright == (290, 190)
+    assert second.rect.topleft == (column.rect.x+2, first.rect.bottom+5)
+    assert row.rect.size == (20, 30)
+
+def test_measure_is_cached_until_invalidated():
+    label = Label("abc")
+    calls = []
+    get_size = label.get_size
+    label.get_size = lambda: calls.append(1) or get_size()
+
+    label.measure()
+    label.measure()
+    assert len(calls) == 1
+    label.set_text("abcdef")
+    label.measure()
+    assert len(calls) == 2
+
+def test_draw_tree_redraws_only_invalidated_widgets(make_button):
+    screen = pygame.Surface((300, 200))
+    button = make_button(ButtonWidget)
+    ui = UI((300, 200), [Panel([Label("title")]),
+                         Panel([button], anchor='bottomright')])
+
+    assert ui.draw_tree(screen) == [pygame.Rect(0, 0, 300, 200)]
+    assert ui.draw_tree(screen) == []
+
+    button.invalidate()
+    assert ui.draw_tree(screen) == [button.rect]
+    assert ui.draw_tree(screen) == []
+
+def test_text_change_lays_out_again(make_button):
+    button = make_button(ButtonWidget, text="ok")
+    ui = UI((300, 200), [Panel([button])])
+    ui.draw_tree(pygame.Surface((300, 200)))
+
+    button.set_text("ok") # unchanged, nothing to do
+    assert not ui.needs_layout
+    button.set_text("longer text")
+    assert ui.needs_layout
+
+def test_resize_lays_out_for_the_new_size(make_button):
+    exit_panel = Panel([make_button(ButtonWidget, text="x")], anchor='topright')
+    ui = UI((300, 200), [exit_panel])
+    ui.draw_tree(pygame.Surface((300, 200)))
+
+    ui.resize((400, 250))
+    assert ui.draw_tree(pygame.Surface((400, 250))) == [pygame.Rect(0, 0, 400, 250)]
+    assert exit_panel.rect.topright == (400, 0)
+
+def test_resize_event_lays_out_for_the_new_size(make_button):
+    bus = EventBus()
+    exit_panel = Panel([make_button(ButtonWidget, text="x")], anchor='topright')
+    ui = UI((300, 200), [exit_panel], bus=bus)
+    ui.draw_tree(pygame.Surface((300, 200)))
+
+    assert not ui.handle_window((400, 250)) # no window event this frame
+
+    bus.exposed, bus.resized = True, (400, 250)
+    assert ui.handle_window((400, 250))
+    assert ui.draw_tree(pygame.Surface((400, 250))) == [pygame.Rect(0, 0, 400, 250)]
+    assert exit_panel.rect.topright == (400, 0)
+
+    bus.resized = None # exposed only: same layout, everything redrawn
+    assert ui.handle_window((400, 250))
+    assert not ui.needs_layout
+    assert ui.draw_tree(pygame.Surface((400, 250))) == [pygame.Rect(0, 0, 400, 250)]
+
+def test_editor_view_follows_the_screen_size(tmp_path):
+    editor = Editor(pygame.Surface((480, 300)), path=str(tmp_path/"level.txt"))
+    editor.open()
+    editor.draw_changes()
+
+    editor.screen = pygame.Surface((640, 400))
+    editor.layout_view()
+    assert editor.view.get_size() == (520, 400)
+    assert editor.camera.rect.size == (520, 400)
+    assert editor.draw_changes() == [editor.view_rect]
+
+def test_editor_frame_composes_the_view_under_the_ui(tmp_path):
+    screen = pygame.Surface((480, 300))
+    editor = Editor(screen, path=str(tmp_path/"level.txt"))
+    editor.open()
+    editor.ui = editor.build_ui()
+
+    for rect in editor.draw_changes():
+        editor.ui.mark_dirty(rect)
+    editor.ui.draw_tree(screen, editor.canvas)
+
+    # Away from the widgets the screen shows the canvas
+    point = (editor.view_rect.centerx, editor.view_rect.centery)
+    assert screen.get_at(point) == editor.canvas.get_at(point)
+    exit_button = editor.ui.children[-1].children[0]
+    assert screen.get_at(exit_button.rect.center) != editor.canvas.get_at(exit_button.rect.center)